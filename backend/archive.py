@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+from db import create_connection
+
+# Hot/cold split for Work_Request. Completed, Cancelled and Expired requests
+# older than ARCHIVE_AFTER_DAYS move to Work_Request_History (their feedback to
+# Feedback_History) so the Pending/Accepted scans only traverse live rows.
+# Notifications of archived requests are dropped by the ON DELETE CASCADE.
+
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 180))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 1000))
+ARCHIVE_PAUSE_SECONDS = float(os.getenv('ARCHIVE_PAUSE_SECONDS', 0.05))
+
+CLOSED_STATUSES = ('Completed', 'Cancelled', 'Expired')
+
+WORK_REQUEST_COLUMNS = ("request_id, user_id, worker_id, skill_type_id, description, request_date, status, "
+                        "location, city, pincode, door_no, street_name, area, worker_arrival_time, "
+                        "user_confirmation_status, amount, completed_date, created_at")
+FEEDBACK_COLUMNS = "feedback_id, request_id, comments, rating"
+
+
+def wants_history(args):
+    return str(args.get('include_history', '')).lower() in ('1', 'true', 'yes')
+
+
+def work_requests_table(include_history=False):
+    """FROM-clause source for work requests, optionally including archived rows."""
+    if not include_history:
+        return "Work_Request"
+    return (f"(SELECT {WORK_REQUEST_COLUMNS} FROM Work_Request "
+            f"UNION ALL SELECT {WORK_REQUEST_COLUMNS} FROM Work_Request_History)")
+
+
+def feedback_table(include_history=False):
+    if not include_history:
+        return "Feedback"
+    return f"(SELECT {FEEDBACK_COLUMNS} FROM Feedback UNION ALL SELECT {FEEDBACK_COLUMNS} FROM Feedback_History)"
+
+
+def archive_batch(connection, cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move one batch of closed requests older than `cutoff`. Returns rows moved."""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"""SELECT request_id FROM Work_Request
+                           WHERE status IN ({','.join(['%s'] * len(CLOSED_STATUSES))}) AND request_date < %s
+                           AND (completed_date IS NULL OR completed_date < %s)
+                           ORDER BY request_id LIMIT %s""",
+                       (*CLOSED_STATUSES, cutoff, cutoff, batch_size))
+        ids = [row['request_id'] for row in cursor.fetchall()]
+        if not ids:
+            return 0
+        placeholders = ','.join(['%s'] * len(ids))
+        cursor.execute(f"""INSERT INTO Work_Request_History ({WORK_REQUEST_COLUMNS}, archived_at)
+                           SELECT {WORK_REQUEST_COLUMNS}, NOW() FROM Work_Request
+                           WHERE request_id IN ({placeholders})""", tuple(ids))
+        cursor.execute(f"""INSERT INTO Feedback_History ({FEEDBACK_COLUMNS}, archived_at)
+                           SELECT {FEEDBACK_COLUMNS}, NOW() FROM Feedback
+                           WHERE request_id IN ({placeholders})""", tuple(ids))
+        cursor.execute(f"DELETE FROM Work_Request WHERE request_id IN ({placeholders})", tuple(ids))
+        connection.commit()
+        return len(ids)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def archive_closed_requests(days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, pause=ARCHIVE_PAUSE_SECONDS):
+    """Archive every eligible request in batches, one transaction per batch."""
+    cutoff = date.today() - timedelta(days=days)
+    connection = create_connection()
+    if connection is None:
+        raise RuntimeError("Database connection failed")
+    moved = 0
+    try:
+        while True:
+            count = archive_batch(connection, cutoff, batch_size)
+            moved += count
+            if count < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    finally:
+        connection.close()
+    return moved
+
+
+class ArchiveRunner:
+    """Runs archive_closed_requests on a background thread, one run at a time per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.last_run = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = threading.Thread(target=self._run, args=(days, batch_size), name='archiver', daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self, days, batch_size):
+        started = time.time()
+        try:
+            moved = archive_closed_requests(days, batch_size)
+            self.last_run = {'days': days, 'archived': moved, 'error': None}
+        except Exception as e:
+            self.last_run = {'days': days, 'archived': None, 'error': str(e)}
+            print(f"Archive run failed: {e}")
+        self.last_run['duration_seconds'] = round(time.time() - started, 3)
+
+
+archiver = ArchiveRunner()
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else ARCHIVE_AFTER_DAYS
+    print(f"Archiving closed work requests older than {days} days...")
+    print(f"Archived {archive_closed_requests(days)} work requests")
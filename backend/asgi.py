@@ -0,0 +1,340 @@
+import asyncio
+import io
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from app import INIT_DB, app as flask_app, ensure_db, start_background_threads
+import archive
+from blueprints.common import WORKER_LOGIN_QUERY
+from blueprints.notifications import USER_NOTIFICATIONS_QUERY, WORKER_NOTIFICATIONS_QUERY
+from blueprints.work_requests import user_work_requests_query, worker_work_requests_query
+import db_async
+from db import DatabaseUnavailable
+import notifications
+import streams
+
+# Asyncio serving mode: an ASGI app for uvicorn (or any ASGI server).
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port $PORT --workers 4
+#
+# The dashboards' polling reads (skill types, the user and worker request lists
+# and notifications) and the notification streams are served here on the
+# event loop with db_async's pool, so requests waiting on MySQL cost a
+# coroutine rather than a worker. Every other route, and any method other
+# than GET, goes to the Flask app on a pool of ASGI_WSGI_THREADS threads, so
+# the API is the same in both modes. Native routes read from the primary and
+# do not take part in query budgets.
+
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 16))
+
+ROUTES = []
+
+
+def route(pattern):
+    """Serve GET `pattern` (a regex over the path; groups are int ids) on the event loop."""
+    def register(handler):
+        ROUTES.append((re.compile(f"^{pattern}$"), handler))
+        return handler
+    return register
+
+
+class Request:
+    def __init__(self, scope, receive, send):
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.path = scope['path']
+        self.args = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+
+    def locale(self):
+        return notifications.request_locale(self.args.get('lang') or self.headers.get('accept-language'))
+
+
+def encode(body):
+    # Flask's JSON provider, so both modes send the same bytes for dates and decimals
+    return flask_app.json.dumps(body, separators=(',', ':'))
+
+
+async def send_json(request, body, status, headers=()):
+    payload = f"{encode(body)}\n".encode()
+    await request.send({'type': 'http.response.start', 'status': status,
+                        'headers': [(b'content-type', b'application/json'),
+                                    (b'content-length', str(len(payload)).encode()),
+                                    (b'access-control-allow-origin', b'*'), *headers]})
+    await request.send({'type': 'http.response.body', 'body': payload})
+
+
+@route(r'/api/skill-types')
+async def get_skill_types(request):
+    async with db_async.cursor() as cursor:
+        try:
+            await cursor.execute("SELECT * FROM Skill_Type")
+            return await cursor.fetchall(), 200
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+
+@route(r'/api/work-requests/user/(\d+)')
+async def get_user_work_requests(request, user_id):
+    include_history = archive.wants_history(request.args)
+    async with db_async.cursor() as cursor:
+        try:
+            await cursor.execute(user_work_requests_query(include_history), (user_id,))
+            return await cursor.fetchall(), 200
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+
+@route(r'/api/work-requests/worker/(\d+)')
+async def get_worker_work_requests(request, worker_id):
+    include_history = archive.wants_history(request.args)
+    async with db_async.cursor() as cursor:
+        try:
+            await cursor.execute(WORKER_LOGIN_QUERY, (worker_id,))
+            if not await cursor.fetchone():
+                return {'error': 'Worker not found'}, 404
+            await cursor.execute(worker_work_requests_query(include_history), (worker_id,))
+            return await cursor.fetchall(), 200
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+
+@route(r'/api/notifications/user/(\d+)')
+async def get_user_notifications(request, user_id):
+    async with db_async.cursor() as cursor:
+        try:
+            await cursor.execute(USER_NOTIFICATIONS_QUERY, (user_id,))
+            return await notifications.render_async(cursor, await cursor.fetchall(), request.locale()), 200
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+
+@route(r'/api/notifications/worker/(\d+)')
+async def get_worker_notifications(request, worker_id):
+    async with db_async.cursor() as cursor:
+        try:
+            await cursor.execute(WORKER_LOGIN_QUERY, (worker_id,))
+            if not await cursor.fetchone():
+                return {'error': 'Worker not found'}, 404
+            await cursor.execute(WORKER_NOTIFICATIONS_QUERY, (worker_id,))
+            return await notifications.render_async(cursor, await cursor.fetchall(), request.locale()), 200
+        except Exception as e:
+            return {'error': str(e)}, 500
+
+
+@route(r'/api/notifications/user/(\d+)/stream')
+async def stream_user_notifications(request, user_id):
+    return await stream_notifications(request, 'user', user_id)
+
+
+@route(r'/api/notifications/worker/(\d+)/stream')
+async def stream_worker_notifications(request, worker_id):
+    # Streams are keyed by the worker id the requests carry, not the login id in the URL
+    async with db_async.cursor() as cursor:
+        await cursor.execute("""SELECT sw.worker_id FROM Skill_Worker sw
+                                JOIN Login l ON l.login_id = sw.login_id
+                                WHERE sw.login_id = %s AND l.role = 'Worker' AND l.deleted_at IS NULL""",
+                             (worker_id,))
+        worker = await cursor.fetchone()
+    if not worker:
+        return {'error': 'Worker not found'}, 404
+    return await stream_notifications(request, 'worker', worker['worker_id'])
+
+
+async def stream_notifications(request, scope, scope_id):
+    """text/event-stream of `notification` events until the client goes away."""
+    try:
+        since = int(request.headers.get('last-event-id') or request.args.get('since') or 0)
+    except ValueError:
+        return {'error': 'Last-Event-ID must be a Change_Log sequence number'}, 400
+    stream = streams.hub.open(scope, scope_id, request.locale())
+    if stream is None:
+        return {'error': 'Too many open notification streams', 'retry_after': 5}, 503
+    disconnected = asyncio.get_running_loop().create_task(wait_for_disconnect(request, stream))
+    try:
+        await request.send({'type': 'http.response.start', 'status': 200,
+                            'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+                                        (b'x-accel-buffering', b'no'), (b'access-control-allow-origin', b'*')]})
+        await request.send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+        try:
+            pending = await streams.hub.backlog(stream, since) if since else []
+        except DatabaseUnavailable:
+            # Too late for a 503; the client reloads its list instead
+            pending = [streams.RESET]
+        while True:
+            if pending:
+                event = pending.pop(0)
+            else:
+                try:
+                    event = await asyncio.wait_for(stream.queue.get(), streams.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # A comment line keeps proxies from closing an idle connection
+                    await request.send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+                    continue
+            if event is None:
+                break
+            if event == streams.RESET:
+                message = 'event: reset\ndata: {}\n\n'
+            else:
+                seq, notification = event
+                # The backlog and the live queue can overlap
+                if seq <= stream.last_seq:
+                    continue
+                stream.last_seq = seq
+                message = f"id: {seq}\nevent: notification\ndata: {encode(notification)}\n\n"
+            await request.send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+    finally:
+        streams.hub.close(stream)
+        disconnected.cancel()
+    return None
+
+
+async def wait_for_disconnect(request, stream):
+    while (await request.receive())['type'] != 'http.disconnect':
+        pass
+    # Wakes the stream's loop, which then returns
+    while True:
+        try:
+            stream.queue.put_nowait(None)
+            return
+        except asyncio.QueueFull:
+            stream.queue.get_nowait()
+
+
+_wsgi_threads = ThreadPoolExecutor(max_workers=ASGI_WSGI_THREADS, thread_name_prefix='wsgi')
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f"HTTP_{name}"
+        value = value.decode('latin-1')
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+async def call_flask(scope, receive, send):
+    """Run the Flask app for one request on the WSGI thread pool, streaming its body back."""
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    environ = wsgi_environ(scope, body)
+    loop = asyncio.get_running_loop()
+
+    def sync_send(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    def run():
+        response = []
+
+        def start_response(status, headers, exc_info=None):
+            response[:] = [int(status.split(' ', 1)[0]),
+                           [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]]
+
+        def start():
+            sync_send({'type': 'http.response.start', 'status': response[0], 'headers': response[1]})
+
+        result = flask_app(environ, start_response)
+        try:
+            started = False
+            for chunk in result:
+                if not chunk:
+                    continue
+                if not started:
+                    start()
+                    started = True
+                sync_send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                start()
+            sync_send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    await loop.run_in_executor(_wsgi_threads, run)
+
+
+_started = None
+
+
+async def ensure_started():
+    """Per-process startup: the schema (INIT_DB=lazy), the background threads and the pool."""
+    global _started
+    if _started is None or (_started.done() and _started.exception() is not None):
+        _started = asyncio.get_running_loop().create_task(_start())
+    await asyncio.shield(_started)
+
+
+async def _start():
+    if INIT_DB == 'lazy':
+        await asyncio.get_running_loop().run_in_executor(_wsgi_threads, ensure_db)
+    start_background_threads()
+    await db_async.start()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await ensure_started()
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await db_async.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    await ensure_started()
+    if scope['method'] == 'GET':
+        for pattern, handler in ROUTES:
+            match = pattern.match(scope['path'])
+            if match:
+                request = Request(scope, receive, send)
+                try:
+                    result = await handler(request, *(int(group) for group in match.groups()))
+                except DatabaseUnavailable as e:
+                    # Same response as the Flask app's handler
+                    return await send_json(request, {'error': 'Database temporarily unavailable',
+                                                     'retry_after': e.retry_after}, 503,
+                                           [(b'retry-after', str(e.retry_after).encode())])
+                if result is not None:
+                    await send_json(request, *result)
+                return
+    await call_flask(scope, receive, send)
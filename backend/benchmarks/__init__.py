@@ -0,0 +1,6 @@
+# Load-test and benchmark suite for the SkillHive backend.
+#
+#   python -m benchmarks seed --size 100k --backend sqlite
+#   python -m benchmarks run --requests 5000 --concurrency 16 --baseline benchmarks/baseline.json
+#   python -m benchmarks startup --backend sqlite --repeat 10
+#   python -m benchmarks modes --concurrency 64 --idle-streams 2000
@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import sys
+
+from benchmarks import load_test, modes, report, seed, startup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='SkillHive load test and benchmarks')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = sub.add_parser('seed', help='Seed a database with synthetic data')
+    seed_parser.add_argument('--backend', choices=['mysql', 'sqlite'], default=os.getenv('DB_BACKEND', 'mysql'))
+    seed_parser.add_argument('--size', choices=sorted(seed.SIZES), default='10k')
+    seed_parser.add_argument('--work-requests', type=int)
+    seed_parser.add_argument('--users', type=int)
+    seed_parser.add_argument('--workers', type=int)
+    seed_parser.add_argument('--notifications', type=int)
+    seed_parser.add_argument('--seed', type=int, default=42)
+    seed_parser.add_argument('--batch-size', type=int, default=5000)
+    seed_parser.add_argument('--manifest', default='bench_manifest.json')
+
+    run_parser = sub.add_parser('run', help='Replay the endpoint mix and report latencies')
+    run_parser.add_argument('--manifest', default='bench_manifest.json')
+    run_parser.add_argument('--base-url', help='Target a running server instead of the in-process app')
+    run_parser.add_argument('--backend', choices=['mysql', 'sqlite'],
+                            help='DB_BACKEND for the in-process app (default: the manifest backend)')
+    run_parser.add_argument('--requests', type=int, default=2000)
+    run_parser.add_argument('--concurrency', type=int, default=8)
+    run_parser.add_argument('--warmup', type=int, default=100)
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--baseline', help='JSON baseline to compare against')
+    run_parser.add_argument('--save-baseline', action='store_true', help='Write this run to --baseline')
+    run_parser.add_argument('--tolerance', type=float, default=0.2)
+    run_parser.add_argument('--output', help='Write this run as JSON')
+
+    startup_parser = sub.add_parser('startup', help='Time cold starts of the app with each INIT_DB mode')
+    startup_parser.add_argument('--backend', choices=['mysql', 'sqlite'], help='DB_BACKEND for the app')
+    startup_parser.add_argument('--modes', nargs='+', choices=['eager', 'lazy', 'off'], default=['eager', 'lazy'])
+    startup_parser.add_argument('--path', default='/api/skill-types', help='The first request after startup')
+    startup_parser.add_argument('--repeat', type=int, default=5)
+    startup_parser.add_argument('--output', help='Write the results as JSON')
+
+    modes_parser = sub.add_parser('modes', help='Compare gunicorn (sync) and uvicorn (async) on the endpoint mix')
+    modes_parser.add_argument('--manifest', default='bench_manifest.json')
+    modes_parser.add_argument('--backend', choices=['mysql', 'sqlite'],
+                              help='DB_BACKEND for the servers (default: the manifest backend)')
+    modes_parser.add_argument('--modes', nargs='+', choices=sorted(modes.SERVERS), default=['sync', 'async'])
+    modes_parser.add_argument('--requests', type=int, default=2000)
+    modes_parser.add_argument('--concurrency', type=int, default=64)
+    modes_parser.add_argument('--warmup', type=int, default=100)
+    modes_parser.add_argument('--workers', type=int, default=2, help='Server processes in both modes')
+    modes_parser.add_argument('--threads', type=int, default=4, help='Threads per gunicorn worker')
+    modes_parser.add_argument('--idle-streams', type=int, default=0,
+                              help='Notification streams to hold open during the async run')
+    modes_parser.add_argument('--reads-only', action='store_true',
+                              help='Replay only the GET endpoints, so both runs see the same data')
+    modes_parser.add_argument('--port', type=int, default=5100)
+    modes_parser.add_argument('--seed', type=int, default=42)
+    modes_parser.add_argument('--output', help='Write the results as JSON')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'seed':
+        seed.seed_database(args.backend, args.size, args.manifest, rng_seed=args.seed,
+                           batch_size=args.batch_size, work_requests=args.work_requests,
+                           users=args.users, workers=args.workers, notifications=args.notifications)
+        return 0
+
+    if args.command == 'startup':
+        results = startup.run(args.modes, args.path, args.repeat, args.backend)
+        startup.print_report(results, args.path)
+        if args.output:
+            startup.save(results, vars(args), args.output)
+        return 0
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    if args.command == 'modes':
+        results = modes.run(manifest, args)
+        modes.print_report(results)
+        if args.output:
+            modes.save(results, vars(args), args.output)
+        return 0
+
+    plan = load_test.build_plan(manifest, args.requests + args.warmup, rng_seed=args.seed)
+    if args.base_url:
+        transport = load_test.HttpTransport(args.base_url)
+    else:
+        # db.py reads DB_BACKEND when the app is first imported
+        os.environ['DB_BACKEND'] = args.backend or manifest.get('backend', 'mysql')
+        transport = load_test.InProcessTransport()
+    samples, elapsed = load_test.run(transport, plan, args.concurrency, args.warmup)
+    summary = report.summarize(samples, elapsed)
+    summary['config'] = {'requests': args.requests, 'concurrency': args.concurrency,
+                         'seed': args.seed, 'backend': args.backend or manifest.get('backend'),
+                         'volumes': manifest.get('volumes')}
+    report.print_report(summary)
+
+    if args.output:
+        report.save_baseline(summary, args.output)
+    if args.baseline and args.save_baseline:
+        report.save_baseline(summary, args.baseline)
+    elif args.baseline:
+        regressions = report.compare(summary, report.load_baseline(args.baseline), args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
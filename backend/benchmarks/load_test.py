@@ -0,0 +1,141 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+
+def _pick(rng, id_range):
+    return rng.randint(id_range[0], id_range[1])
+
+
+def _pick_listed(rng, ids, fallback_range):
+    return rng.choice(ids) if ids else _pick(rng, fallback_range)
+
+
+# Endpoint mix modelled on the dashboards' polling pattern: reads dominate,
+# with a steady trickle of new requests and state transitions.
+# Each entry: (endpoint label, weight, builder(rng, manifest) -> (method, path, body))
+ENDPOINT_MIX = [
+    ('GET /api/work-requests/user/<id>', 18,
+     lambda rng, m: ('GET', f"/api/work-requests/user/{_pick(rng, m['user_ids'])}", None)),
+    ('GET /api/notifications/user/<id>', 10,
+     lambda rng, m: ('GET', f"/api/notifications/user/{_pick(rng, m['user_ids'])}", None)),
+    ('GET /api/users/<id>', 6,
+     lambda rng, m: ('GET', f"/api/users/{_pick(rng, m['user_ids'])}", None)),
+    ('GET /api/workers/<id>', 8,
+     lambda rng, m: ('GET', f"/api/workers/{_pick(rng, m['worker_login_ids'])}", None)),
+    ('GET /api/work-requests/available/<id>', 14,
+     lambda rng, m: ('GET', f"/api/work-requests/available/{_pick(rng, m['worker_login_ids'])}", None)),
+    ('GET /api/work-requests/worker/<id>', 10,
+     lambda rng, m: ('GET', f"/api/work-requests/worker/{_pick(rng, m['worker_login_ids'])}", None)),
+    ('GET /api/notifications/worker/<id>', 5,
+     lambda rng, m: ('GET', f"/api/notifications/worker/{_pick(rng, m['worker_login_ids'])}", None)),
+    ('GET /api/skill-types', 8,
+     lambda rng, m: ('GET', '/api/skill-types', None)),
+    ('POST /api/work-requests', 6,
+     lambda rng, m: ('POST', '/api/work-requests', {
+         'user_id': _pick(rng, m['user_ids']),
+         'skill_type_id': rng.choice(m['skill_type_ids']),
+         'description': 'Benchmark request',
+         'request_date': date.today().isoformat(),
+         'location': 'Anna Nagar, Chennai', 'city': 'Chennai', 'pincode': '600040',
+         'door_no': '12', 'street_name': 'Main Road', 'area': 'Anna Nagar',
+     })),
+    ('POST /api/work-requests/<id>/accept', 3,
+     lambda rng, m: ('POST', f"/api/work-requests/{_pick_listed(rng, m['pending_request_ids'], m['request_ids'])}/accept",
+                     {'workerId': _pick(rng, m['worker_login_ids']), 'timeSlot': 'Morning', 'arrivalTime': '10:30'})),
+    ('POST /api/work-requests/<id>/complete', 2,
+     lambda rng, m: ('POST', f"/api/work-requests/{_pick_listed(rng, m['accepted_request_ids'], m['request_ids'])}/complete",
+                     {'workerId': _pick(rng, m['worker_login_ids']), 'amount': rng.randint(200, 2000)})),
+    ('PUT /api/workers/<id>/status', 3,
+     lambda rng, m: ('PUT', f"/api/workers/{_pick(rng, m['worker_login_ids'])}/status",
+                     {'status': rng.choice(['Available', 'Busy'])})),
+    ('POST /api/feedback', 2,
+     lambda rng, m: ('POST', '/api/feedback',
+                     {'request_id': _pick(rng, m['request_ids']), 'comments': 'Benchmark', 'rating': rng.randint(1, 5)})),
+    ('GET /api/feedback/worker/<id>', 3,
+     lambda rng, m: ('GET', f"/api/feedback/worker/{_pick(rng, m['worker_login_ids'])}", None)),
+    ('GET /api/admin/workers', 1,
+     lambda rng, m: ('GET', '/api/admin/workers', None)),
+    ('GET /api/admin/work-requests', 1,
+     lambda rng, m: ('GET', '/api/admin/work-requests', None)),
+]
+
+
+def build_plan(manifest, total_requests, rng_seed=42, mix=None):
+    """Deterministic list of (label, method, path, body) to replay."""
+    mix = mix or ENDPOINT_MIX
+    rng = random.Random(rng_seed)
+    labels = [entry[0] for entry in mix]
+    weights = [entry[1] for entry in mix]
+    builders = {entry[0]: entry[2] for entry in mix}
+    plan = []
+    for label in rng.choices(labels, weights, k=total_requests):
+        method, path, body = builders[label](rng, manifest)
+        plan.append((label, method, path, body))
+    return plan
+
+
+class HttpTransport:
+    """Sends requests to a running server, e.g. gunicorn on localhost."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def send(self, method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+        except (urllib.error.URLError, OSError):
+            return None
+
+
+class InProcessTransport:
+    """Drives the Flask app directly through its test client (one per thread)."""
+
+    def __init__(self):
+        from app import app
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, method, path, body):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        return response.status_code
+
+
+def run(transport, plan, concurrency=8, warmup=0):
+    """Replay `plan` with `concurrency` threads. Returns ({label: [(ms, status)]}, elapsed)."""
+    for label, method, path, body in plan[:warmup]:
+        transport.send(method, path, body)
+    plan = plan[warmup:]
+
+    samples = {}
+    lock = threading.Lock()
+
+    def execute(item):
+        label, method, path, body = item
+        start = time.perf_counter()
+        status = transport.send(method, path, body)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with lock:
+            samples.setdefault(label, []).append((elapsed_ms, status))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(execute, plan))
+    return samples, time.perf_counter() - start
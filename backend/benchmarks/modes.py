@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks import load_test, report
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The two ways of serving the app; gunicorn also reads gunicorn.conf.py
+SERVERS = {
+    'sync': ['-m', 'gunicorn', 'app:app', '--bind', '127.0.0.1:{port}', '--workers', '{workers}',
+             '--threads', '{threads}'],
+    'async': ['-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', '{port}', '--workers', '{workers}',
+              '--log-level', 'warning'],
+}
+
+READ_MIX = [entry for entry in load_test.ENDPOINT_MIX if entry[0].startswith('GET ')]
+
+
+def start_server(mode, port, workers, threads, backend):
+    args = [arg.format(port=port, workers=workers, threads=threads) for arg in SERVERS[mode]]
+    env = dict(os.environ, DB_BACKEND=backend, PORT=str(port))
+    return subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env=env)
+
+
+def wait_until_ready(base_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout}s")
+
+
+def tree_rss_kb(pid):
+    """Resident memory of a process and its children in KB, or None off Linux."""
+    total, pending = 0, [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f"/proc/{current}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+    except (OSError, StopIteration):
+        return None if total == 0 else total
+    return total
+
+
+def raise_open_file_limit(needed):
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+class IdleStreams:
+    """Holds `count` notification streams open (spread over the seeded users) on a background loop."""
+
+    def __init__(self, port, user_ids, count):
+        self.port = port
+        self.user_ids = user_ids
+        self.count = count
+        self.opened = 0
+        self._loop = asyncio.new_event_loop()
+        self._writers = []
+        self._thread = threading.Thread(target=self._loop.run_forever, name='idle-streams', daemon=True)
+        self._thread.start()
+
+    async def _open_one(self, index):
+        low, high = self.user_ids
+        user_id = low + index % (high - low + 1)
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(f"GET /api/notifications/user/{user_id}/stream HTTP/1.1\r\nHost: localhost\r\n"
+                     f"Accept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+        # The first event (retry:) means the server is holding the stream
+        while b'retry:' not in await reader.readline():
+            pass
+        self._writers.append(writer)
+
+    async def _open_all(self, batch=200):
+        for start in range(0, self.count, batch):
+            results = await asyncio.gather(*(self._open_one(index) for index in
+                                             range(start, min(start + batch, self.count))), return_exceptions=True)
+            self.opened += sum(1 for result in results if not isinstance(result, BaseException))
+
+    def open(self):
+        asyncio.run_coroutine_threadsafe(self._open_all(), self._loop).result()
+        return self.opened
+
+    def close(self):
+        async def close_all():
+            for writer in self._writers:
+                writer.close()
+        asyncio.run_coroutine_threadsafe(close_all(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def run_mode(mode, manifest, args, backend):
+    """Serve with `mode`, optionally hold idle streams, replay the plan. Returns the summary."""
+    port = args.port + (1 if mode == 'async' else 0)
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(mode, port, args.workers, args.threads, backend)
+    streams = None
+    try:
+        wait_until_ready(base_url)
+        memory = {'idle_kb': tree_rss_kb(server.pid)}
+        if args.idle_streams and mode == 'async':
+            streams = IdleStreams(port, manifest['user_ids'], args.idle_streams)
+            memory['streams'] = streams.open()
+            memory['with_streams_kb'] = tree_rss_kb(server.pid)
+            if memory['idle_kb'] and memory['with_streams_kb'] and memory['streams']:
+                memory['kb_per_stream'] = round((memory['with_streams_kb'] - memory['idle_kb']) / memory['streams'], 1)
+        # Same seed, so both modes replay the same requests
+        plan = load_test.build_plan(manifest, args.requests + args.warmup, rng_seed=args.seed,
+                                    mix=READ_MIX if args.reads_only else None)
+        samples, elapsed = load_test.run(load_test.HttpTransport(base_url), plan, args.concurrency, args.warmup)
+        summary = report.summarize(samples, elapsed)
+        memory['after_run_kb'] = tree_rss_kb(server.pid)
+        summary['server'] = memory
+        return summary
+    finally:
+        if streams is not None:
+            streams.close()
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def run(manifest, args):
+    backend = args.backend or manifest.get('backend', 'mysql')
+    raise_open_file_limit(args.idle_streams + args.concurrency + 1024)
+    return {mode: run_mode(mode, manifest, args, backend) for mode in args.modes}
+
+
+def print_report(results):
+    modes = list(results)
+    endpoints = sorted({endpoint for summary in results.values() for endpoint in summary['endpoints']})
+    header = ''.join(f"{f'{mode} p50':>11}{f'{mode} p95':>11}{f'{mode} err':>10}" for mode in modes)
+    print(f"\n{'endpoint':<44}{header}")
+    for endpoint in endpoints:
+        line = f"{endpoint:<44}"
+        for mode in modes:
+            stats = results[mode]['endpoints'].get(endpoint)
+            line += (f"{stats['p50_ms']:>11.2f}{stats['p95_ms']:>11.2f}{stats['errors']:>10}" if stats
+                     else f"{'-':>11}{'-':>11}{'-':>10}")
+        print(line)
+    print()
+    for mode, summary in results.items():
+        memory = summary['server']
+        line = (f"{mode:<6} {summary['total_requests']} requests in {summary['elapsed_seconds']}s "
+                f"({summary['throughput_rps']} req/s)")
+        if memory.get('idle_kb'):
+            line += f", server RSS {memory['idle_kb'] / 1024:.1f} MB idle"
+        if memory.get('streams'):
+            line += (f", {memory['with_streams_kb'] / 1024:.1f} MB holding {memory['streams']} streams "
+                     f"({memory.get('kb_per_stream')} KB each)")
+        print(line)
+
+
+def save(results, config, path):
+    with open(path, 'w') as f:
+        json.dump({'config': config, 'modes': results}, f, indent=2, sort_keys=True)
+    print(f"\nResults written to {path}")
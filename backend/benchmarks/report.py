@@ -0,0 +1,74 @@
+import json
+import math
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, elapsed_seconds):
+    """Turn {endpoint: [(latency_ms, status_code), ...]} into per-endpoint stats."""
+    results = {}
+    for endpoint, endpoint_samples in sorted(samples.items()):
+        latencies = sorted(ms for ms, _ in endpoint_samples)
+        errors = sum(1 for _, status in endpoint_samples if status is None or status >= 500)
+        results[endpoint] = {
+            'count': len(latencies),
+            'errors': errors,
+            'throughput_rps': round(len(latencies) / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+        }
+    total = sum(len(s) for s in samples.values())
+    return {
+        'elapsed_seconds': round(elapsed_seconds, 3),
+        'total_requests': total,
+        'throughput_rps': round(total / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+        'endpoints': results,
+    }
+
+
+def print_report(summary):
+    print(f"\n{'endpoint':<52} {'count':>7} {'err':>5} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for endpoint, stats in summary['endpoints'].items():
+        print(f"{endpoint:<52} {stats['count']:>7} {stats['errors']:>5} {stats['throughput_rps']:>9.1f} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+    print(f"\n{summary['total_requests']} requests in {summary['elapsed_seconds']}s "
+          f"({summary['throughput_rps']} req/s)")
+
+
+def save_baseline(summary, path):
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2, sort_keys=True)
+    print(f"Baseline written to {path}")
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(summary, baseline, tolerance=0.2, min_ms=1.0):
+    """Return a list of regressions against a baseline run.
+
+    A p95/p99 latency counts as regressed when it is more than `tolerance`
+    (fractional) above the baseline and at least `min_ms` slower in absolute
+    terms, so sub-millisecond noise does not fail a run.
+    """
+    regressions = []
+    for endpoint, stats in summary['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(endpoint)
+        if not before:
+            continue
+        for key in ('p95_ms', 'p99_ms'):
+            old, new = before[key], stats[key]
+            if new > old * (1 + tolerance) and new - old >= min_ms:
+                regressions.append(f"{endpoint} {key}: {old:.2f} -> {new:.2f}")
+        if stats['errors'] > before['errors']:
+            regressions.append(f"{endpoint} errors: {before['errors']} -> {stats['errors']}")
+    return regressions
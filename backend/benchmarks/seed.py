@@ -0,0 +1,231 @@
+import hashlib
+import json
+import random
+from datetime import date, timedelta
+
+# Preset volumes, keyed by number of work requests
+SIZES = {
+    '10k': {'work_requests': 10_000, 'users': 2_000, 'workers': 1_000},
+    '100k': {'work_requests': 100_000, 'users': 20_000, 'workers': 10_000},
+    '1m': {'work_requests': 1_000_000, 'users': 100_000, 'workers': 40_000},
+}
+
+SKILL_NAMES = ["Plumber", "Electrician", "Carpenter", "Driver", "Mechanic", "Cleaner", "Painter", "Technician"]
+CITIES = ["Chennai", "Coimbatore", "Madurai", "Salem", "Trichy", "Erode", "Vellore", "Tirunelveli"]
+AREAS = ["Anna Nagar", "T Nagar", "Adyar", "Velachery", "Guindy", "Tambaram", "Porur", "Mylapore"]
+STREETS = ["Main Road", "Gandhi Street", "Nehru Street", "Church Road", "Temple Street", "Lake View Road"]
+FIRST_NAMES = ["Arun", "Priya", "Karthik", "Divya", "Suresh", "Meena", "Vijay", "Lakshmi", "Ravi", "Anitha"]
+LAST_NAMES = ["Kumar", "Raj", "Devi", "Subramanian", "Natarajan", "Krishnan", "Murugan", "Selvam"]
+DESCRIPTIONS = [
+    "Kitchen sink is leaking and needs a new washer",
+    "Ceiling fan stopped working after the power cut",
+    "Need two wardrobe doors re-hinged and polished",
+    "Drive the car to the service centre and back",
+    "Bike engine makes a noise when starting in the morning",
+    "Deep cleaning for a two bedroom apartment",
+    "Repaint the living room walls and the front door",
+    "Washing machine drains slowly and shows an error code",
+]
+# Status mix for seeded work requests: mostly closed, a realistic open backlog
+STATUS_WEIGHTS = [('Pending', 20), ('Accepted', 15), ('Completed', 55), ('Cancelled', 10)]
+
+PASSWORD_HASH = hashlib.sha256('password'.encode()).hexdigest()
+
+
+def get_backend(name):
+    """Return (module, placeholder) for the 'mysql' or 'sqlite' backend."""
+    if name == 'sqlite':
+        import db_sqlite
+        return db_sqlite, '?'
+    import db_mysql
+    return db_mysql, '%s'
+
+
+def _next_id(cursor, table, column):
+    cursor.execute(f"SELECT MAX({column}) AS max_id FROM {table}")
+    row = cursor.fetchone()
+    return (row['max_id'] or 0) + 1
+
+
+def _insert_batches(connection, cursor, sql, rows, batch_size):
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cursor.executemany(sql, batch)
+            connection.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        connection.commit()
+        total += len(batch)
+    return total
+
+
+def _ensure_skill_types(connection, cursor, ph):
+    cursor.execute("SELECT skill_type_id, skill_name FROM Skill_Type")
+    existing = {row['skill_name']: row['skill_type_id'] for row in cursor.fetchall()}
+    missing = [(name,) for name in SKILL_NAMES if name not in existing]
+    if missing:
+        cursor.executemany(f"INSERT INTO Skill_Type (skill_name) VALUES ({ph})", missing)
+        connection.commit()
+    cursor.execute("SELECT skill_type_id FROM Skill_Type")
+    return [row['skill_type_id'] for row in cursor.fetchall()]
+
+
+def seed(connection, ph, work_requests, users, workers, notifications=None, rng_seed=42, batch_size=5000):
+    """Insert a synthetic data set and return a manifest of the generated id ranges.
+
+    Ids are assigned explicitly (after the current MAX) so the manifest is exact and
+    the same seed always yields the same data set on an empty database.
+    """
+    rng = random.Random(rng_seed)
+    notifications = work_requests if notifications is None else notifications
+    cursor = connection.cursor()
+    try:
+        skill_ids = _ensure_skill_types(connection, cursor, ph)
+        first_login = _next_id(cursor, 'Login', 'login_id')
+        first_user = _next_id(cursor, 'User', 'user_id')
+        first_worker = _next_id(cursor, 'Skill_Worker', 'worker_id')
+        first_request = _next_id(cursor, 'Work_Request', 'request_id')
+        tag = f"{rng_seed}_{first_login}"
+
+        # Logins: users first, then workers
+        def login_rows():
+            for i in range(users):
+                yield (first_login + i, f"bench_u{tag}_{i}", PASSWORD_HASH, 'User')
+            for i in range(workers):
+                yield (first_login + users + i, f"bench_w{tag}_{i}", PASSWORD_HASH, 'Worker')
+        _insert_batches(connection, cursor,
+                        f"INSERT INTO Login (login_id, username, password, role) VALUES ({ph}, {ph}, {ph}, {ph})",
+                        login_rows(), batch_size)
+        print(f"Seeded {users + workers} logins")
+
+        def user_rows():
+            for i in range(users):
+                yield (first_user + i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                       f"bench_u{tag}_{i}@example.com", f"9{rng.randrange(10**9):09d}", None, first_login + i)
+        _insert_batches(connection, cursor,
+                        f"""INSERT INTO User (user_id, first_name, last_name, email, phone_number1, phone_number2, login_id)
+                            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})""",
+                        user_rows(), batch_size)
+        print(f"Seeded {users} users")
+
+        def worker_rows():
+            for i in range(workers):
+                yield (first_worker + i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), rng.choice(CITIES),
+                       f"600{rng.randrange(100):03d}", str(rng.randrange(1, 200)), rng.choice(STREETS),
+                       rng.choice(AREAS), rng.randrange(0, 25), rng.choice(['Available', 'Available', 'Busy']),
+                       f"9{rng.randrange(10**9):09d}", first_login + users + i)
+        _insert_batches(connection, cursor,
+                        f"""INSERT INTO Skill_Worker (worker_id, first_name, last_name, city, pincode, door_no,
+                            street_name, area, experience_years, available_status, phone_number1, login_id)
+                            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})""",
+                        worker_rows(), batch_size)
+        print(f"Seeded {workers} workers")
+
+        # 1-3 skills per worker; remember them so assignments stay skill-consistent
+        workers_by_skill = {skill_id: [] for skill_id in skill_ids}
+
+        def worker_skill_rows():
+            for i in range(workers):
+                for skill_id in rng.sample(skill_ids, rng.randint(1, min(3, len(skill_ids)))):
+                    workers_by_skill[skill_id].append(first_worker + i)
+                    yield (first_worker + i, skill_id)
+        worker_skills = _insert_batches(connection, cursor,
+                                        f"INSERT INTO Worker_Skills (worker_id, skill_type_id) VALUES ({ph}, {ph})",
+                                        worker_skill_rows(), batch_size)
+        print(f"Seeded {worker_skills} worker skills")
+
+        statuses = [status for status, _ in STATUS_WEIGHTS]
+        weights = [weight for _, weight in STATUS_WEIGHTS]
+        today = date.today()
+        completed_ids = []
+        request_status = {}
+
+        def work_request_rows():
+            for i in range(work_requests):
+                request_id = first_request + i
+                skill_id = rng.choice(skill_ids)
+                status = rng.choices(statuses, weights)[0]
+                worker_id = None
+                if status in ('Accepted', 'Completed') and workers_by_skill[skill_id]:
+                    worker_id = rng.choice(workers_by_skill[skill_id])
+                elif status in ('Accepted', 'Completed'):
+                    status = 'Pending'
+                if status == 'Completed':
+                    completed_ids.append(request_id)
+                if status in ('Pending', 'Accepted'):
+                    request_status[request_id] = status
+                city = rng.choice(CITIES)
+                area = rng.choice(AREAS)
+                yield (request_id, first_user + rng.randrange(users), worker_id, skill_id,
+                       rng.choice(DESCRIPTIONS), (today - timedelta(days=rng.randrange(365))).isoformat(),
+                       status, f"{area}, {city}", city, f"600{rng.randrange(100):03d}",
+                       str(rng.randrange(1, 200)), rng.choice(STREETS), area)
+        _insert_batches(connection, cursor,
+                        f"""INSERT INTO Work_Request (request_id, user_id, worker_id, skill_type_id, description,
+                            request_date, status, location, city, pincode, door_no, street_name, area)
+                            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})""",
+                        work_request_rows(), batch_size)
+        print(f"Seeded {work_requests} work requests")
+
+        def notification_rows():
+            for _ in range(notifications):
+                request_id = first_request + rng.randrange(work_requests)
+                yield (f"Update on work request #{request_id}",
+                       (today - timedelta(days=rng.randrange(365))).isoformat(),
+                       rng.choice(['Read', 'Unread']), request_id)
+        _insert_batches(connection, cursor,
+                        f"INSERT INTO Notification (message, date, status, request_id) VALUES ({ph}, {ph}, {ph}, {ph})",
+                        notification_rows(), batch_size)
+        print(f"Seeded {notifications} notifications")
+
+        def feedback_rows():
+            for request_id in completed_ids:
+                if rng.random() < 0.6:
+                    yield (request_id, "Good work", rng.randint(1, 5))
+        feedback = _insert_batches(connection, cursor,
+                                   f"INSERT INTO Feedback (request_id, comments, rating) VALUES ({ph}, {ph}, {ph})",
+                                   feedback_rows(), batch_size)
+        print(f"Seeded {feedback} feedback rows")
+
+        return {
+            'seed': rng_seed,
+            'skill_type_ids': skill_ids,
+            'user_ids': [first_user, first_user + users - 1],
+            'user_login_ids': [first_login, first_login + users - 1],
+            'worker_login_ids': [first_login + users, first_login + users + workers - 1],
+            'request_ids': [first_request, first_request + work_requests - 1],
+            'pending_request_ids': [rid for rid, s in request_status.items() if s == 'Pending'][:5000],
+            'accepted_request_ids': [rid for rid, s in request_status.items() if s == 'Accepted'][:5000],
+        }
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def seed_database(backend='mysql', size='10k', manifest_path='bench_manifest.json', rng_seed=42,
+                  batch_size=5000, **overrides):
+    """Create the schema if needed, seed it and write the manifest used by the load test."""
+    module, ph = get_backend(backend)
+    module.init_db()
+    volumes = dict(SIZES[size])
+    volumes.update({key: value for key, value in overrides.items() if value is not None})
+    connection = module.create_connection()
+    if connection is None:
+        raise RuntimeError("Database connection failed")
+    try:
+        manifest = seed(connection, ph, rng_seed=rng_seed, batch_size=batch_size, **volumes)
+    finally:
+        connection.close()
+    manifest['backend'] = backend
+    manifest['volumes'] = volumes
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+    print(f"Manifest written to {manifest_path}")
+    return manifest
@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.report import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter: import the app (which builds it with create_app()),
+# then send the same request twice through the test client
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+client = app.test_client()
+first = client.get(sys.argv[1])
+first_done = time.perf_counter()
+second = client.get(sys.argv[1])
+second_done = time.perf_counter()
+try:
+    import resource
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:  # Windows
+    max_rss_kb = 0
+print(json.dumps({'import_ms': (imported - started) * 1000, 'first_request_ms': (first_done - imported) * 1000,
+                  'second_request_ms': (second_done - first_done) * 1000, 'status': first.status_code,
+                  'modules': len(sys.modules), 'max_rss_kb': max_rss_kb}))
+"""
+
+PHASES = ('process_ms', 'import_ms', 'first_request_ms', 'second_request_ms')
+
+
+def measure(init_db, path, backend=None):
+    """One cold start with INIT_DB=`init_db`. Returns the child's timings plus process_ms."""
+    env = dict(os.environ, INIT_DB=init_db)
+    if backend:
+        env['DB_BACKEND'] = backend
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD, path], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True)
+    elapsed = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"INIT_DB={init_db} failed:\n{result.stderr}")
+    # Hooks and init_db may print; the timings are the last line
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample['process_ms'] = elapsed
+    return sample
+
+
+def run(modes, path, repeat=5, backend=None):
+    """{mode: stats} over `repeat` cold starts per mode, interleaved so drift hits every mode alike."""
+    samples = {mode: [] for mode in modes}
+    for _ in range(repeat):
+        for mode in modes:
+            samples[mode].append(measure(mode, path, backend))
+    results = {}
+    for mode, runs in samples.items():
+        stats = {}
+        for phase in PHASES:
+            values = sorted(run[phase] for run in runs)
+            stats[phase] = {'p50': round(percentile(values, 50), 1), 'min': round(values[0], 1),
+                            'max': round(values[-1], 1)}
+        stats['status'] = sorted({run['status'] for run in runs})
+        stats['modules'] = runs[-1]['modules']
+        stats['max_rss_kb'] = max(run['max_rss_kb'] for run in runs)
+        results[mode] = stats
+    return results
+
+
+def print_report(results, path):
+    print(f"\nCold start, first and second GET {path} (median ms of each phase)")
+    print(f"{'INIT_DB':<8} {'process':>9} {'import':>9} {'1st req':>9} {'2nd req':>9} {'modules':>8} {'rss MB':>7}")
+    for mode, stats in results.items():
+        print(f"{mode:<8} " + ' '.join(f"{stats[phase]['p50']:>9.1f}" for phase in PHASES) +
+              f" {stats['modules']:>8} {stats['max_rss_kb'] / 1024:>7.1f}")
+
+
+def save(results, config, path):
+    with open(path, 'w') as f:
+        json.dump({'config': config, 'modes': results}, f, indent=2, sort_keys=True)
+    print(f"\nResults written to {path}")
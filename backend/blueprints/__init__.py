@@ -0,0 +1,12 @@
+from blueprints import admin, auth, feedback, notifications, skill_types, system, users, work_requests, workers
+
+# The API routes, one blueprint per area. Blueprint names prefix the endpoint
+# names (e.g. 'users.get_user'); URLs are unchanged.
+
+BLUEPRINTS = (system.bp, auth.bp, users.bp, workers.bp, skill_types.bp, work_requests.bp, notifications.bp,
+              feedback.bp, admin.bp)
+
+
+def register_blueprints(app):
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
@@ -0,0 +1,452 @@
+from flask import Blueprint, Response, request, jsonify
+
+import archive
+import bulk
+import cache
+import changes
+from db import DIALECT, DatabaseUnavailable, create_connection, replicas
+import demand
+import export
+import invalidation
+import notifications
+import presence
+import purge
+import reports
+import scheduler
+import search
+
+# Admin dashboard: user and worker management, reports, exports, search, archival
+# and operational status.
+
+bp = Blueprint('admin', __name__)
+
+@bp.route('/api/admin/users', methods=['GET'])
+def get_all_users():
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT * FROM User WHERE deleted_at IS NULL")
+        users = cursor.fetchall()
+        return jsonify(users), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/users/<int:user_id>', methods=['DELETE'])
+def delete_user(user_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, get the login_id for this user
+        cursor.execute("SELECT login_id FROM User WHERE user_id = %s AND deleted_at IS NULL", (user_id,))
+        user = cursor.fetchone()
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        login_id = user['login_id']
+        
+        # Mark the account deleted so every read hides it straight away
+        cursor.execute("UPDATE User SET deleted_at = NOW() WHERE user_id = %s", (user_id,))
+        cursor.execute("UPDATE Login SET deleted_at = NOW() WHERE login_id = %s", (login_id,))
+        
+        # The background purger removes work requests, notifications, feedback,
+        # the user and the login record in small batches
+        job_id = purge.queue_purge(cursor, 'User', user_id, login_id)
+        changes.record(cursor, 'user', user_id, changes.DELETE, user_id=user_id)
+        
+        connection.commit()
+        cache.profile_cache.invalidate(cache.user_key(user_id))
+        purge.purger.wake()
+        return jsonify({'message': 'User deleted successfully', 'purge_job_id': job_id}), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/workers', methods=['GET'])
+def get_all_workers():
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # Get all workers with their login information
+        query = """SELECT sw.*, l.username, l.email FROM Skill_Worker sw 
+                   JOIN Login l ON sw.login_id = l.login_id
+                   WHERE sw.deleted_at IS NULL"""
+        cursor.execute(query)
+        workers = cursor.fetchall()
+        return jsonify(workers), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/workers/<int:worker_id>', methods=['DELETE'])
+def delete_worker(worker_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the worker exists
+        worker_query = "SELECT * FROM Skill_Worker WHERE login_id = %s AND deleted_at IS NULL"
+        cursor.execute(worker_query, (worker_id,))
+        worker = cursor.fetchone()
+        
+        if not worker:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        # Mark the account deleted so every read hides it straight away
+        cursor.execute("UPDATE Skill_Worker SET deleted_at = NOW() WHERE worker_id = %s", (worker['worker_id'],))
+        cursor.execute("UPDATE Login SET deleted_at = NOW() WHERE login_id = %s", (worker_id,))
+        
+        # The background purger removes skills, availability, assigned work requests
+        # (with their notifications and feedback), the worker and the login record
+        job_id = purge.queue_purge(cursor, 'Worker', worker['worker_id'], worker_id)
+        changes.record(cursor, 'worker', worker['worker_id'], changes.DELETE, worker_id=worker['worker_id'])
+        
+        connection.commit()
+        cache.profile_cache.invalidate(cache.worker_key(worker_id))
+        presence.table.forget(worker_id)
+        purge.purger.wake()
+        return jsonify({'message': 'Worker deleted successfully', 'purge_job_id': job_id}), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/cache', methods=['GET'])
+def get_cache_stats():
+    return jsonify({'profiles': cache.profile_cache.stats(), 'invalidation': invalidation.bus.stats()}), 200
+
+@bp.route('/api/admin/replicas', methods=['GET'])
+def get_replica_status():
+    return jsonify(replicas.stats()), 200
+
+@bp.route('/api/admin/demand', methods=['GET'])
+def get_demand():
+    skill_type_id = request.args.get('skill_type_id', type=int)
+    pincode = request.args.get('pincode') or None
+    try:
+        demand.model.ensure_fresh()
+        report = demand.demand_report(demand.model.snapshot(), skill_type_id, pincode,
+                                      request.args.get('top', demand.DEFAULT_TOP))
+        return jsonify(dict(report, model=demand.model.stats())), 200
+    except demand.DemandError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/admin/scheduler', methods=['GET'])
+def get_scheduler_status():
+    return jsonify(scheduler.scheduler.stats()), 200
+
+@bp.route('/api/admin/notification-templates', methods=['GET'])
+def get_notification_templates():
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        return jsonify(notifications.list_templates(cursor)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/notification-templates/<int:template_code>', methods=['PUT'])
+def update_notification_template(template_code):
+    data = request.get_json() or {}
+    locale = (data.get('locale') or notifications.DEFAULT_LOCALE).lower()
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        notifications.save_template(cursor, template_code, locale, data.get('body'))
+        connection.commit()
+        # Every process re-reads the locale's templates on its next render
+        notifications.template_cache.invalidate(f"locale:{locale}")
+        return jsonify({'message': 'Notification template updated successfully'}), 200
+    except notifications.TemplateError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/purge-jobs', methods=['GET'])
+def get_purge_jobs():
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT * FROM Purge_Job ORDER BY job_id DESC LIMIT 100")
+        jobs = cursor.fetchall()
+        return jsonify(jobs), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/purge-jobs/<int:job_id>', methods=['GET'])
+def get_purge_job(job_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        job = purge.get_job(cursor, job_id)
+        if job:
+            return jsonify(job), 200
+        else:
+            return jsonify({'error': 'Purge job not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+def read_csv_upload():
+    # Accept either a multipart upload named 'file' or a raw text/csv body
+    upload = request.files.get('file')
+    if upload is not None:
+        return upload.read()
+    return request.get_data() or None
+
+@bp.route('/api/admin/import/workers', methods=['POST'])
+def import_workers():
+    data = read_csv_upload()
+    if not data:
+        return jsonify({'error': 'CSV file is required'}), 400
+    batch_size = request.args.get('batch_size', bulk.DEFAULT_BATCH_SIZE, type=int)
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        result = bulk.import_workers_csv(connection, data, batch_size)
+        if result['imported']:
+            changes.record_refresh(connection, 'worker')
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        connection.close()
+
+@bp.route('/api/admin/import/skill-types', methods=['POST'])
+def import_skill_types():
+    data = read_csv_upload()
+    if not data:
+        return jsonify({'error': 'CSV file is required'}), 400
+    batch_size = request.args.get('batch_size', bulk.DEFAULT_BATCH_SIZE, type=int)
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        result = bulk.import_skill_types_csv(connection, data, batch_size)
+        if result['imported']:
+            changes.record_refresh(connection, 'skill_type')
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        connection.close()
+
+# Heavy reports run as background jobs: submit, then poll (?wait=seconds long-polls) and fetch the result
+@bp.route('/api/admin/reports', methods=['POST'])
+def submit_report():
+    data = request.get_json(silent=True) or {}
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        job, reused = reports.submit_report(connection, data.get('report'), data.get('params') or {})
+        job['status_url'] = f"/api/admin/reports/{job['job_id']}"
+        return jsonify(job), 200 if reused else 202
+    except reports.ReportError as e:
+        return jsonify({'error': str(e)}), 400
+    except reports.ReportBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '5'}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        connection.close()
+
+@bp.route('/api/admin/reports', methods=['GET'])
+def get_report_jobs():
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        return jsonify({'jobs': reports.list_jobs(cursor), 'pool': reports.runner.stats()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/reports/<int:job_id>', methods=['GET'])
+def get_report_job(job_id):
+    wait = request.args.get('wait', 0, type=float)
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        job = reports.wait_for_job(cursor, connection, job_id, wait)
+        if job:
+            return jsonify(job), 200
+        else:
+            return jsonify({'error': 'Report job not found or expired'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/reports/<int:job_id>/result', methods=['GET'])
+def get_report_result(job_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        job = reports.get_job(cursor, job_id, include_result=True)
+        if not job:
+            return jsonify({'error': 'Report job not found or expired'}), 404
+        if job['status'] != 'Done':
+            return jsonify({'error': f"Report job is {job['status']}", 'job': job}), 409
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+# CSV exports stream from a server-side cursor, so memory stays flat for any date range
+def csv_export(build_query, columns, filename):
+    try:
+        query, params = build_query(request.args)
+        chunk_size = request.args.get('chunk_size', export.CHUNK_SIZE, type=int)
+        chunks = export.stream_csv(query, params, columns, max(1, min(chunk_size, 10000)))
+    except export.ExportError as e:
+        return jsonify({'error': str(e)}), 400
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    if chunks is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    return Response(chunks, mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@bp.route('/api/admin/export/work-requests.csv', methods=['GET'])
+def export_work_requests():
+    return csv_export(export.work_requests_query, export.WORK_REQUEST_COLUMNS, 'work_requests.csv')
+
+@bp.route('/api/admin/export/feedback.csv', methods=['GET'])
+def export_feedback():
+    return csv_export(export.feedback_query, export.FEEDBACK_COLUMNS, 'feedback.csv')
+
+@bp.route('/api/admin/export/workers.csv', methods=['GET'])
+def export_workers():
+    return csv_export(export.workers_query, export.WORKER_COLUMNS, 'workers.csv')
+
+# Ranked full-text search with filters and cursor pagination
+def run_search(search_function):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        return jsonify(search_function(cursor, request.args, DIALECT)), 200
+    except search.SearchError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/search/work-requests', methods=['GET'])
+def search_work_requests():
+    return run_search(search.search_work_requests)
+
+@bp.route('/api/admin/search/workers', methods=['GET'])
+def search_workers():
+    return run_search(search.search_workers)
+
+@bp.route('/api/admin/archive', methods=['POST'])
+def start_archive():
+    data = request.get_json(silent=True) or {}
+    days = data.get('days', archive.ARCHIVE_AFTER_DAYS)
+    if not isinstance(days, int) or days < 1:
+        return jsonify({'error': 'days must be a positive whole number'}), 400
+    
+    if not archive.archiver.start(days):
+        return jsonify({'error': 'An archive run is already in progress'}), 409
+    return jsonify({'message': f'Archiving closed work requests older than {days} days'}), 202
+
+@bp.route('/api/admin/archive', methods=['GET'])
+def get_archive_status():
+    return jsonify({'running': archive.archiver.running, 'last_run': archive.archiver.last_run}), 200
+
+@bp.route('/api/admin/work-requests', methods=['GET'])
+def get_all_work_requests():
+    include_history = archive.wants_history(request.args)
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = f"""SELECT wr.*, st.skill_name, u.first_name as user_first_name, 
+                   u.last_name as user_last_name, sw.first_name as worker_first_name,
+                   sw.last_name as worker_last_name FROM {archive.work_requests_table(include_history)} wr
+                   LEFT JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+                   LEFT JOIN User u ON wr.user_id = u.user_id
+                   LEFT JOIN Skill_Worker sw ON wr.worker_id = sw.worker_id
+                   WHERE u.deleted_at IS NULL AND sw.deleted_at IS NULL
+                   ORDER BY wr.request_date DESC"""
+        cursor.execute(query)
+        work_requests = cursor.fetchall()
+        return jsonify(work_requests), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
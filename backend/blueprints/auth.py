@@ -0,0 +1,162 @@
+from flask import Blueprint, request, jsonify
+
+from blueprints.common import commit_idempotency_claim, idempotent
+import bulk
+import changes
+from db import create_connection
+from passwords import hash_password
+
+# Login and registration.
+
+bp = Blueprint('auth', __name__)
+
+# Hardcoded admin credentials
+ADMIN_USERNAME = "nithin"
+ADMIN_PASSWORD = "123456789"
+
+@bp.route('/api/login', methods=['POST'])
+def login():
+    data = request.get_json()
+    username = data.get('username')
+    password = data.get('password')
+    role = data.get('role')  # Get the role from the request
+    
+    # Check for hardcoded admin credentials only if role is Admin
+    if role == 'Admin' and username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
+        return jsonify({
+            'login_id': -1,  # Special ID for hardcoded admin
+            'username': username,
+            'role': 'Admin'
+        }), 200
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        hashed_password = hash_password(password)
+        query = "SELECT * FROM Login WHERE username = %s AND password = %s AND deleted_at IS NULL"
+        if role:
+            query = "SELECT * FROM Login WHERE username = %s AND password = %s AND role = %s AND deleted_at IS NULL"
+            cursor.execute(query, (username, hashed_password, role))
+        else:
+            cursor.execute(query, (username, hashed_password))
+        user = cursor.fetchone()
+        
+        if user:
+            return jsonify({
+                'login_id': user['login_id'],
+                'username': user['username'],
+                'role': user['role']
+            }), 200
+        else:
+            return jsonify({'error': 'Invalid credentials'}), 401
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/register/user', methods=['POST'])
+@idempotent
+def register_user():
+    data = request.get_json()
+    username = data.get('username')
+    password = data.get('password')
+    first_name = data.get('first_name')
+    last_name = data.get('last_name')
+    email = data.get('email')
+    phone_number1 = data.get('phone_number1')
+    phone_number2 = data.get('phone_number2')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # Check if username already exists
+        cursor.execute("SELECT * FROM Login WHERE username = %s", (username,))
+        if cursor.fetchone():
+            return jsonify({'error': 'Username already exists'}), 400
+        
+        # Create login entry
+        hashed_password = hash_password(password)
+        login_query = "INSERT INTO Login (username, password, role) VALUES (%s, %s, 'User')"
+        cursor.execute(login_query, (username, hashed_password))
+        login_id = cursor.lastrowid
+        
+        # Create user entry
+        user_query = """INSERT INTO User (first_name, last_name, email, phone_number1, phone_number2, login_id) 
+                        VALUES (%s, %s, %s, %s, %s, %s)"""
+        cursor.execute(user_query, (first_name, last_name, email, phone_number1, phone_number2, login_id))
+        user_id = cursor.lastrowid
+        changes.record(cursor, 'user', user_id, changes.INSERT, user_id=user_id)
+        
+        commit_idempotency_claim(cursor)
+        connection.commit()
+        return jsonify({'message': 'User registered successfully'}), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/register/worker', methods=['POST'])
+@idempotent
+def register_worker():
+    data = request.get_json()
+    username = data.get('username')
+    password = data.get('password')
+    first_name = data.get('first_name')
+    last_name = data.get('last_name')
+    address = data.get('address')
+    city = data.get('city')
+    pincode = data.get('pincode')
+    door_no = data.get('door_no')
+    street_name = data.get('street_name')
+    area = data.get('area')
+    experience_years = data.get('experience_years')
+    phone_number1 = data.get('phone_number1')
+    phone_number2 = data.get('phone_number2')
+    skill_ids = data.get('skill_ids', [])  # New field for worker skills
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # Check if username already exists
+        cursor.execute("SELECT * FROM Login WHERE username = %s", (username,))
+        if cursor.fetchone():
+            return jsonify({'error': 'Username already exists'}), 400
+        
+        # Create login entry
+        hashed_password = hash_password(password)
+        login_query = "INSERT INTO Login (username, password, role) VALUES (%s, %s, 'Worker')"
+        cursor.execute(login_query, (username, hashed_password))
+        login_id = cursor.lastrowid
+        
+        # Create worker entry
+        worker_query = """INSERT INTO Skill_Worker (first_name, last_name, address, city, pincode, door_no, 
+                          street_name, area, experience_years, phone_number1, phone_number2, login_id) 
+                          VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+        cursor.execute(worker_query, (first_name, last_name, address, city, pincode, door_no, 
+                                      street_name, area, experience_years, phone_number1, phone_number2, login_id))
+        worker_id = cursor.lastrowid
+        
+        # Insert worker skills in one multi-row statement
+        if skill_ids:
+            bulk.insert_worker_skills(cursor, worker_id, skill_ids)
+        changes.record(cursor, 'worker', worker_id, changes.INSERT, worker_id=worker_id)
+        
+        commit_idempotency_claim(cursor)
+        connection.commit()
+        return jsonify({'message': 'Worker registered successfully'}), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
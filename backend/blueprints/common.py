@@ -0,0 +1,83 @@
+import functools
+
+from flask import Response, g, request, jsonify, make_response
+
+from db import DatabaseUnavailable
+import idempotency
+import presence
+import recommend
+
+# Helpers shared by several blueprints.
+
+# Checks that a login id in the URL belongs to a live worker
+WORKER_LOGIN_QUERY = "SELECT * FROM Login WHERE login_id = %s AND role = 'Worker' AND deleted_at IS NULL"
+
+# Write endpoints accept an Idempotency-Key header: a retry with the same key and body
+# replays the stored response instead of running the write again
+def idempotent(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return view(*args, **kwargs)
+        try:
+            key = idempotency.key_hash(key, request.method, request.path)
+            outcome, stored = idempotency.claim(key, idempotency.body_hash(request.get_data()))
+        except idempotency.IdempotencyError as e:
+            return jsonify({'error': str(e)}), 400
+        except DatabaseUnavailable:
+            raise
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        
+        if outcome == idempotency.MISMATCH:
+            return jsonify({'error': 'Idempotency-Key was already used with a different request body'}), 422
+        if outcome == idempotency.IN_PROGRESS:
+            return jsonify({'error': 'A request with this Idempotency-Key is still in progress'}), 409, {'Retry-After': '1'}
+        if outcome == idempotency.COMMITTED:
+            # Retrying would write again; the client has to reload what it changed
+            return jsonify({'error': 'A request with this Idempotency-Key was applied but its response was lost'}), 409
+        if outcome == idempotency.REPLAY:
+            response = Response(stored['response_body'], status=stored['response_status'],
+                                content_type=stored['content_type'])
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+        
+        g.idempotency_key = key
+        g.idempotency_claim_lost = False
+        try:
+            response = make_response(view(*args, **kwargs))
+        except BaseException:
+            if not g.idempotency_claim_lost:
+                idempotency.release(key)
+            raise
+        if g.idempotency_claim_lost:
+            # The key belongs to the retry that took it over, and this write rolled back
+            return response
+        # Server errors roll back, so let the client retry them; anything else is the final answer
+        if response.status_code >= 500:
+            idempotency.release(key)
+        else:
+            idempotency.complete(key, response.status_code, response.get_data(as_text=True), response.content_type)
+        return response
+    return wrapper
+
+def commit_idempotency_claim(cursor):
+    """Call just before an @idempotent view commits its write, in the same transaction."""
+    key = g.get('idempotency_key')
+    if key is None:
+        return
+    try:
+        idempotency.commit_claim(cursor, key)
+    except idempotency.ClaimLost:
+        g.idempotency_claim_lost = True
+        raise
+
+def recommend_workers(cursor, skill_type_id, pincode, city, exclude=()):
+    """Top workers for a skill and location, with their profile fields."""
+    k = request.args.get('k', recommend.DEFAULT_K, type=int)
+    recommend.index.ensure_fresh()
+    recommendations, candidates = recommend.index.recommend(
+        skill_type_id, pincode, city, k, exclude, presence.table.online_worker_ids(skill_type_id))
+    return {'candidates': candidates, 'recommendations': recommend.worker_details(cursor, recommendations),
+            'score_ms': recommend.index.stats()['last_score_ms']}
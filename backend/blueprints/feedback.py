@@ -0,0 +1,122 @@
+from flask import Blueprint, request, jsonify
+
+import archive
+from blueprints.common import commit_idempotency_claim, idempotent
+import changes
+from db import create_connection
+import ratings
+
+# Feedback on completed work requests.
+
+bp = Blueprint('feedback', __name__)
+
+@bp.route('/api/feedback', methods=['POST'])
+@idempotent
+def submit_feedback():
+    data = request.get_json()
+    request_id = data.get('request_id')
+    comments = data.get('comments')
+    rating = data.get('rating')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = "INSERT INTO Feedback (request_id, comments, rating) VALUES (%s, %s, %s)"
+        cursor.execute(query, (request_id, comments, rating))
+        changes.record_for_request(cursor, 'feedback', cursor.lastrowid, changes.INSERT, request_id)
+        if rating is not None:
+            ratings.record_rating(cursor, request_id, rating)
+        commit_idempotency_claim(cursor)
+        connection.commit()
+        return jsonify({'message': 'Feedback submitted successfully'}), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/feedback/request/<int:request_id>', methods=['GET'])
+def get_feedback_for_request(request_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = "SELECT * FROM Feedback WHERE request_id = %s"
+        cursor.execute(query, (request_id,))
+        feedback = cursor.fetchone()
+        
+        # Feedback of archived requests lives in the history table
+        if not feedback:
+            cursor.execute("SELECT feedback_id, request_id, comments, rating FROM Feedback_History WHERE request_id = %s", (request_id,))
+            feedback = cursor.fetchone()
+        return jsonify(feedback), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/feedback/admin', methods=['GET'])
+def get_all_feedback():
+    include_history = archive.wants_history(request.args)
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = f"""SELECT f.*, wr.request_id, st.skill_name, u.first_name as user_name 
+                   FROM {archive.feedback_table(include_history)} f
+                   JOIN {archive.work_requests_table(include_history)} wr ON f.request_id = wr.request_id
+                   JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+                   JOIN User u ON wr.user_id = u.user_id
+                   WHERE u.deleted_at IS NULL
+                   ORDER BY f.feedback_id DESC"""
+        cursor.execute(query)
+        feedbacks = cursor.fetchall()
+        return jsonify(feedbacks), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/feedback/worker/<int:worker_id>', methods=['GET'])
+def get_worker_feedback(worker_id):
+    include_history = archive.wants_history(request.args)
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a worker
+        login_query = "SELECT * FROM Login WHERE login_id = %s AND role = 'Worker' AND deleted_at IS NULL"
+        cursor.execute(login_query, (worker_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        query = f"""SELECT f.*, wr.request_id, st.skill_name, u.first_name as user_first_name, 
+                   u.last_name as user_last_name
+                   FROM {archive.feedback_table(include_history)} f
+                   JOIN {archive.work_requests_table(include_history)} wr ON f.request_id = wr.request_id
+                   JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+                   JOIN User u ON wr.user_id = u.user_id
+                   JOIN Skill_Worker sw ON wr.worker_id = sw.worker_id
+                   WHERE sw.login_id = %s
+                   ORDER BY f.feedback_id DESC"""
+        cursor.execute(query, (worker_id,))
+        feedbacks = cursor.fetchall()
+        return jsonify(feedbacks), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
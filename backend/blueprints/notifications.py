@@ -0,0 +1,116 @@
+from flask import Blueprint, request, jsonify
+
+from blueprints.common import WORKER_LOGIN_QUERY
+import changes
+from db import create_connection
+import notifications
+
+# Notifications for users, workers and admins, rendered from their templates.
+
+bp = Blueprint('notifications', __name__)
+
+# Shared with the asyncio routes and notification streams in asgi.py
+NOTIFICATION_COLUMNS = f"n.*, wr.request_id, st.skill_name, {notifications.RENDER_COLUMNS}"
+NOTIFICATION_SOURCE = """Notification n
+                         JOIN Work_Request wr ON n.request_id = wr.request_id
+                         JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id"""
+USER_NOTIFICATIONS_QUERY = f"""SELECT {NOTIFICATION_COLUMNS} FROM {NOTIFICATION_SOURCE}
+                               WHERE wr.user_id = %s ORDER BY n.date DESC"""
+WORKER_NOTIFICATIONS_QUERY = f"""SELECT {NOTIFICATION_COLUMNS} FROM {NOTIFICATION_SOURCE}
+                                 WHERE wr.worker_id = (SELECT worker_id FROM Skill_Worker WHERE login_id = %s) 
+                                 ORDER BY n.date DESC"""
+
+def notification_locale():
+    return notifications.request_locale(request.args.get('lang') or request.headers.get('Accept-Language'))
+
+@bp.route('/api/notifications/user/<int:user_id>', methods=['GET'])
+def get_user_notifications(user_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        cursor.execute(USER_NOTIFICATIONS_QUERY, (user_id,))
+        rows = notifications.render(cursor, cursor.fetchall(), notification_locale())
+        return jsonify(rows), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/notifications/worker/<int:worker_id>', methods=['GET'])
+def get_worker_notifications(worker_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a worker
+        cursor.execute(WORKER_LOGIN_QUERY, (worker_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        cursor.execute(WORKER_NOTIFICATIONS_QUERY, (worker_id,))
+        rows = notifications.render(cursor, cursor.fetchall(), notification_locale())
+        return jsonify(rows), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/notifications/admin', methods=['GET'])
+def get_admin_notifications():
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = f"""SELECT n.*, wr.request_id, st.skill_name, u.first_name as user_first_name, 
+                   u.last_name as user_last_name, {notifications.RENDER_COLUMNS} FROM Notification n
+                   JOIN Work_Request wr ON n.request_id = wr.request_id
+                   JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+                   JOIN User u ON wr.user_id = u.user_id
+                   WHERE u.deleted_at IS NULL
+                   ORDER BY n.date DESC"""
+        cursor.execute(query)
+        rows = notifications.render(cursor, cursor.fetchall(), notification_locale())
+        return jsonify(rows), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/notifications/<int:notification_id>/read', methods=['PUT'])
+def mark_notification_as_read(notification_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = "UPDATE Notification SET status = 'Read' WHERE notification_id = %s"
+        cursor.execute(query, (notification_id,))
+        updated = cursor.rowcount
+        if updated > 0:
+            cursor.execute("SELECT request_id FROM Notification WHERE notification_id = %s", (notification_id,))
+            changes.record_for_request(cursor, 'notification', notification_id, changes.UPDATE,
+                                       cursor.fetchone()['request_id'])
+        connection.commit()
+        
+        if updated > 0:
+            return jsonify({'message': 'Notification marked as read'}), 200
+        else:
+            return jsonify({'error': 'Notification not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,97 @@
+from flask import Blueprint, request, jsonify
+
+import changes
+from db import create_connection
+
+# Skill types.
+
+bp = Blueprint('skill_types', __name__)
+
+@bp.route('/api/skill-types', methods=['GET'])
+def get_skill_types():
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT * FROM Skill_Type")
+        skill_types = cursor.fetchall()
+        return jsonify(skill_types), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/skill-types', methods=['POST'])
+def add_skill_type():
+    data = request.get_json()
+    skill_name = data.get('skill_name')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = "INSERT INTO Skill_Type (skill_name) VALUES (%s)"
+        cursor.execute(query, (skill_name,))
+        changes.record(cursor, 'skill_type', cursor.lastrowid, changes.INSERT)
+        
+        connection.commit()
+        return jsonify({'message': 'Skill type added successfully'}), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/skill-types/<int:skill_type_id>', methods=['PUT'])
+def update_skill_type(skill_type_id):
+    data = request.get_json()
+    skill_name = data.get('skill_name')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = "UPDATE Skill_Type SET skill_name = %s WHERE skill_type_id = %s"
+        cursor.execute(query, (skill_name, skill_type_id))
+        
+        if cursor.rowcount > 0:
+            changes.record(cursor, 'skill_type', skill_type_id, changes.UPDATE)
+            connection.commit()
+            return jsonify({'message': 'Skill type updated successfully'}), 200
+        else:
+            return jsonify({'error': 'Skill type not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/skill-types/<int:skill_type_id>', methods=['DELETE'])
+def delete_skill_type(skill_type_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = "DELETE FROM Skill_Type WHERE skill_type_id = %s"
+        cursor.execute(query, (skill_type_id,))
+        
+        if cursor.rowcount > 0:
+            changes.record(cursor, 'skill_type', skill_type_id, changes.DELETE)
+            connection.commit()
+            return jsonify({'message': 'Skill type deleted successfully'}), 200
+        else:
+            return jsonify({'error': 'Skill type not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,58 @@
+from flask import Blueprint, request, jsonify
+
+import changes
+from db import connection_slots, create_connection, primary_breaker, replicas
+
+# Health check and the change feed dashboards sync from.
+
+bp = Blueprint('system', __name__)
+
+@bp.route('/api/health', methods=['GET'])
+def health():
+    database = primary_breaker.stats()
+    status = {'closed': 'ok', 'half_open': 'degraded', 'open': 'unavailable'}[database['state']]
+    body = {'status': status, 'database': database, 'connections': connection_slots.stats(),
+            'replicas': replicas.stats()}
+    
+    # ?deep=1 also runs a query on the primary
+    if request.args.get('deep') and status != 'unavailable':
+        connection = create_connection(readonly=False)
+        if connection is None:
+            body['status'] = status = 'unavailable'
+        else:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+                connection.close()
+    
+    response = jsonify(body)
+    if status == 'unavailable':
+        response.headers['Retry-After'] = str(max(1, int(database['retry_after_seconds'] or 1)))
+        return response, 503
+    return response, 200
+
+# Change feed: what changed since the client's last sync, for one dashboard scope
+@bp.route('/api/changes', methods=['GET'])
+def get_changes():
+    since = request.args.get('since', type=int)
+    scope = request.args.get('scope', 'admin')
+    scope_id = request.args.get('id', type=int)
+    limit = request.args.get('limit', changes.DEFAULT_LIMIT, type=int)
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        return jsonify(changes.read_changes(cursor, since, scope, scope_id, limit)), 200
+    except changes.ChangeFeedError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,73 @@
+from flask import Blueprint, request, jsonify
+
+import cache
+import changes
+from db import create_connection
+
+# User profiles.
+
+bp = Blueprint('users', __name__)
+
+@bp.route('/api/users/<int:user_id>', methods=['GET'])
+def get_user(user_id):
+    found, user = cache.profile_cache.get(cache.user_key(user_id))
+    if found:
+        return jsonify(user), 200
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = "SELECT * FROM User WHERE user_id = %s AND deleted_at IS NULL"
+        cursor.execute(query, (user_id,))
+        user = cursor.fetchone()
+        
+        if user:
+            cache.profile_cache.set(cache.user_key(user_id), user)
+            return jsonify(user), 200
+        else:
+            return jsonify({'error': 'User not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/users/<int:user_id>', methods=['PUT'])
+def update_user(user_id):
+    data = request.get_json()
+    first_name = data.get('first_name')
+    last_name = data.get('last_name')
+    email = data.get('email')
+    phone_number1 = data.get('phone_number1')
+    phone_number2 = data.get('phone_number2')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the user exists
+        user_query = "SELECT * FROM User WHERE user_id = %s AND deleted_at IS NULL"
+        cursor.execute(user_query, (user_id,))
+        user = cursor.fetchone()
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        update_query = """UPDATE User SET first_name = %s, last_name = %s, email = %s, 
+                          phone_number1 = %s, phone_number2 = %s WHERE user_id = %s"""
+        cursor.execute(update_query, (first_name, last_name, email, phone_number1, phone_number2, user_id))
+        changes.record(cursor, 'user', user_id, changes.UPDATE, user_id=user_id)
+        connection.commit()
+        cache.profile_cache.invalidate(cache.user_key(user_id))
+        
+        return jsonify({'message': 'User updated successfully'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,481 @@
+from flask import Blueprint, request, jsonify
+
+import archive
+from blueprints.common import WORKER_LOGIN_QUERY, commit_idempotency_claim, idempotent, recommend_workers
+import changes
+from db import create_connection
+import notifications
+import presence
+
+# Work requests: creation, the user and worker lists, and the request lifecycle
+# (accept, decline, complete, cancel, arrival time).
+
+bp = Blueprint('work_requests', __name__)
+
+# The list queries are shared with the asyncio routes in asgi.py
+def user_work_requests_query(include_history):
+    # Archived (closed) requests are only included when asked for
+    return f"""SELECT wr.*, st.skill_name, 
+                      sw.first_name as worker_first_name, 
+                      sw.last_name as worker_last_name 
+               FROM {archive.work_requests_table(include_history)} wr 
+               JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id 
+               LEFT JOIN Skill_Worker sw ON wr.worker_id = sw.worker_id
+               WHERE wr.user_id = %s ORDER BY wr.request_date DESC"""
+
+def worker_work_requests_query(include_history):
+    return f"""SELECT wr.*, st.skill_name, u.first_name as user_first_name, 
+               u.last_name as user_last_name FROM {archive.work_requests_table(include_history)} wr
+               JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+               JOIN User u ON wr.user_id = u.user_id
+               WHERE wr.worker_id = (SELECT worker_id FROM Skill_Worker WHERE login_id = %s)
+               AND u.deleted_at IS NULL
+               ORDER BY wr.request_date DESC"""
+
+@bp.route('/api/work-requests', methods=['POST'])
+@idempotent
+def create_work_request():
+    data = request.get_json()
+    user_id = data.get('user_id')
+    skill_type_id = data.get('skill_type_id')
+    description = data.get('description')
+    request_date = data.get('request_date')
+    location = data.get('location')
+    city = data.get('city')
+    pincode = data.get('pincode')
+    door_no = data.get('door_no')
+    street_name = data.get('street_name')
+    area = data.get('area')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        query = """INSERT INTO Work_Request (user_id, skill_type_id, description, request_date, location, city, 
+                    pincode, door_no, street_name, area, worker_arrival_time, user_confirmation_status, created_at) 
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NULL, 'Pending', NOW())"""
+        cursor.execute(query, (user_id, skill_type_id, description, request_date, location, city, 
+                               pincode, door_no, street_name, area))
+        request_id = cursor.lastrowid
+        changes.record_for_request(cursor, 'work_request', request_id, changes.INSERT, request_id)
+        
+        commit_idempotency_claim(cursor)
+        connection.commit()
+        return jsonify({'message': 'Work request created successfully'}), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/work-requests/user/<int:user_id>', methods=['GET'])
+def get_user_work_requests(user_id):
+    include_history = archive.wants_history(request.args)
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        cursor.execute(user_work_requests_query(include_history), (user_id,))
+        work_requests = cursor.fetchall()
+        return jsonify(work_requests), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+# Transition responses carry the request as it appears in the worker's assigned and
+# available lists, plus how each list changed ('added', 'removed' or 'updated'), so the
+# dashboard can patch its lists instead of fetching both again
+def worker_transition_response(cursor, request_id, message, lists):
+    cursor.execute("""SELECT wr.*, st.skill_name, u.first_name as user_first_name,
+                      u.last_name as user_last_name FROM Work_Request wr
+                      JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+                      JOIN User u ON wr.user_id = u.user_id
+                      WHERE wr.request_id = %s""", (request_id,))
+    return jsonify({'message': message, 'work_request': cursor.fetchone(), 'lists': lists}), 200
+
+@bp.route('/api/work-requests/<int:request_id>/accept', methods=['POST'])
+@idempotent
+def accept_work_request(request_id):
+    data = request.get_json()
+    worker_id = data.get('workerId')
+    time_slot = data.get('timeSlot')  # New field for time slot
+    arrival_time = data.get('arrivalTime')  # New field for arrival time
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # The presence table vouches for the worker and their skills
+        entry = presence.table.get(worker_id)
+        if entry is None:
+            entry = presence.table.load(cursor, worker_id)
+            if entry is None:
+                return jsonify({'error': 'Worker not found'}), 404
+        presence.table.heartbeat(entry)
+        
+        # Check if the work request exists and is available
+        request_query = "SELECT * FROM Work_Request WHERE request_id = %s AND status = 'Pending' AND worker_id IS NULL"
+        cursor.execute(request_query, (request_id,))
+        work_request = cursor.fetchone()
+        
+        if not work_request:
+            return jsonify({'error': 'Work request not found or already assigned'}), 404
+        
+        # Check if the worker has the required skill for this request
+        if work_request['skill_type_id'] not in entry.skill_ids:
+            return jsonify({'error': 'Worker does not have the required skill for this request'}), 400
+        
+        # Assign the work request to the worker and set arrival time
+        assign_query = "UPDATE Work_Request SET worker_id = (SELECT worker_id FROM Skill_Worker WHERE login_id = %s), status = 'Accepted', worker_arrival_time = %s WHERE request_id = %s"
+        cursor.execute(assign_query, (worker_id, arrival_time, request_id))
+        changes.record_for_request(cursor, 'work_request', request_id, changes.UPDATE, request_id)
+        
+        # Create a notification for the user; the worker's phone number is filled in when it is read
+        notification_id = notifications.insert(cursor, request_id, notifications.REQUEST_ACCEPTED, time_slot, arrival_time,
+                                               entry.worker_id)
+        changes.record_for_request(cursor, 'notification', notification_id, changes.INSERT, request_id)
+        
+        commit_idempotency_claim(cursor)
+        connection.commit()
+        return worker_transition_response(cursor, request_id, 'Work request accepted successfully',
+                                          {'assigned': 'added', 'available': 'removed'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/work-requests/<int:request_id>/decline', methods=['POST'])
+def decline_work_request(request_id):
+    data = request.get_json()
+    worker_id = data.get('workerId')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a worker
+        login_query = "SELECT * FROM Login WHERE login_id = %s AND role = 'Worker' AND deleted_at IS NULL"
+        cursor.execute(login_query, (worker_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        # Check if the work request exists and is assigned to this worker
+        request_query = "SELECT * FROM Work_Request WHERE request_id = %s AND worker_id = (SELECT worker_id FROM Skill_Worker WHERE login_id = %s) AND status = 'Accepted'"
+        cursor.execute(request_query, (request_id, worker_id))
+        work_request = cursor.fetchone()
+        
+        if not work_request:
+            return jsonify({'error': 'Work request not found or not assigned to this worker'}), 404
+        
+        # Decline the work request (set worker_id to NULL and status back to Pending)
+        decline_query = "UPDATE Work_Request SET worker_id = NULL, status = 'Pending' WHERE request_id = %s"
+        cursor.execute(decline_query, (request_id,))
+        changes.record_for_request(cursor, 'work_request', request_id, changes.UPDATE, request_id, work_request['worker_id'])
+        
+        # Create a notification for the user
+        notification_id = notifications.insert(cursor, request_id, notifications.REQUEST_DECLINED,
+                                               work_request['worker_id'])
+        changes.record_for_request(cursor, 'notification', notification_id, changes.INSERT, request_id)
+        
+        connection.commit()
+        return worker_transition_response(cursor, request_id, 'Work request declined successfully',
+                                          {'assigned': 'removed', 'available': 'added'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/work-requests/<int:request_id>/complete', methods=['POST'])
+@idempotent
+def complete_work_request(request_id):
+    data = request.get_json()
+    worker_id = data.get('workerId')
+    amount = data.get('amount')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a worker
+        login_query = "SELECT * FROM Login WHERE login_id = %s AND role = 'Worker' AND deleted_at IS NULL"
+        cursor.execute(login_query, (worker_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        # Check if the work request exists and is assigned to this worker
+        request_query = "SELECT * FROM Work_Request WHERE request_id = %s AND worker_id = (SELECT worker_id FROM Skill_Worker WHERE login_id = %s) AND status = 'Accepted'"
+        cursor.execute(request_query, (request_id, worker_id))
+        work_request = cursor.fetchone()
+        
+        if not work_request:
+            return jsonify({'error': 'Work request not found or not assigned to this worker'}), 404
+        
+        # Complete the work request (set status to Completed and add amount)
+        complete_query = "UPDATE Work_Request SET status = 'Completed', amount = %s, completed_date = CURDATE() WHERE request_id = %s"
+        cursor.execute(complete_query, (amount, request_id))
+        changes.record_for_request(cursor, 'work_request', request_id, changes.UPDATE, request_id)
+        
+        # Create a notification for the user
+        notification_id = notifications.insert(cursor, request_id, notifications.REQUEST_COMPLETED,
+                                               work_request['worker_id'], amount or None)
+        changes.record_for_request(cursor, 'notification', notification_id, changes.INSERT, request_id)
+        
+        commit_idempotency_claim(cursor)
+        connection.commit()
+        return worker_transition_response(cursor, request_id, 'Work request completed successfully',
+                                          {'assigned': 'updated'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/work-requests/<int:request_id>/cancel', methods=['POST'])
+def cancel_work_request(request_id):
+    data = request.get_json()
+    user_id = data.get('userId')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a user
+        login_query = "SELECT * FROM Login WHERE login_id = %s AND role = 'User' AND deleted_at IS NULL"
+        cursor.execute(login_query, (user_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'User not found'}), 404
+        
+        # Check if the work request exists and belongs to this user
+        request_query = "SELECT * FROM Work_Request WHERE request_id = %s AND user_id = %s AND status IN ('Pending', 'Accepted')"
+        cursor.execute(request_query, (request_id, user_id))
+        work_request = cursor.fetchone()
+        
+        if not work_request:
+            return jsonify({'error': 'Work request not found or cannot be cancelled'}), 404
+        
+        # Cancel the work request (set status to Cancelled)
+        cancel_query = "UPDATE Work_Request SET status = 'Cancelled' WHERE request_id = %s"
+        cursor.execute(cancel_query, (request_id,))
+        changes.record_for_request(cursor, 'work_request', request_id, changes.UPDATE, request_id)
+        
+        # If the request was accepted, we need to notify the worker
+        if work_request['worker_id'] and work_request['status'] == 'Accepted':
+            # Create a notification for the worker
+            notification_id = notifications.insert(cursor, request_id, notifications.REQUEST_CANCELLED)
+            changes.record_for_request(cursor, 'notification', notification_id, changes.INSERT, request_id)
+        
+        connection.commit()
+        return jsonify({'message': 'Work request cancelled successfully'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/work-requests/worker/<int:worker_id>', methods=['GET'])
+def get_worker_work_requests(worker_id):
+    include_history = archive.wants_history(request.args)
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a worker
+        cursor.execute(WORKER_LOGIN_QUERY, (worker_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        cursor.execute(worker_work_requests_query(include_history), (worker_id,))
+        work_requests = cursor.fetchall()
+        return jsonify(work_requests), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/work-requests/<int:request_id>/recommendations', methods=['GET'])
+def get_request_recommendations(request_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        request_query = """SELECT request_id, skill_type_id, pincode, city, worker_id FROM Work_Request
+                           WHERE request_id = %s"""
+        cursor.execute(request_query, (request_id,))
+        work_request = cursor.fetchone()
+        
+        if not work_request:
+            return jsonify({'error': 'Work request not found'}), 404
+        
+        # The assigned worker is not suggested again
+        exclude = (work_request['worker_id'],) if work_request['worker_id'] else ()
+        result = recommend_workers(cursor, work_request['skill_type_id'], work_request['pincode'],
+                                   work_request['city'], exclude)
+        return jsonify(dict(result, request_id=request_id)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/work-requests/available/<int:worker_id>', methods=['GET'])
+def get_available_work_requests(worker_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # An online worker's skills are in the presence table, so only the request query runs
+        entry = presence.table.get(worker_id)
+        if entry is None:
+            entry = presence.table.load(cursor, worker_id)
+            if entry is None:
+                return jsonify({'error': 'Worker not found'}), 404
+        presence.table.heartbeat(entry)
+        
+        if not entry.skill_ids:
+            return jsonify([]), 200
+        
+        skill_ids = sorted(entry.skill_ids)
+        
+        # Get available work requests that match the worker's skills
+        # Available requests are those with status 'Pending' and no worker assigned yet
+        format_strings = ','.join(['%s'] * len(skill_ids))
+        query = f"""SELECT wr.*, st.skill_name, u.first_name as user_first_name, 
+                   u.last_name as user_last_name FROM Work_Request wr
+                   JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+                   JOIN User u ON wr.user_id = u.user_id
+                   WHERE wr.skill_type_id IN ({format_strings})
+                   AND wr.status = 'Pending'
+                   AND wr.worker_id IS NULL
+                   AND u.deleted_at IS NULL
+                   ORDER BY wr.request_date DESC"""
+        cursor.execute(query, tuple(skill_ids))
+        work_requests = cursor.fetchall()
+        return jsonify(work_requests), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/work-requests/<int:request_id>/set-arrival-time', methods=['POST'])
+def set_worker_arrival_time(request_id):
+    data = request.get_json()
+    worker_id = data.get('workerId')
+    arrival_time = data.get('arrivalTime')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a worker
+        login_query = "SELECT * FROM Login WHERE login_id = %s AND role = 'Worker' AND deleted_at IS NULL"
+        cursor.execute(login_query, (worker_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        # Check if the work request exists and is assigned to this worker
+        request_query = "SELECT * FROM Work_Request WHERE request_id = %s AND worker_id = (SELECT worker_id FROM Skill_Worker WHERE login_id = %s) AND status = 'Accepted'"
+        cursor.execute(request_query, (request_id, worker_id))
+        work_request = cursor.fetchone()
+        
+        if not work_request:
+            return jsonify({'error': 'Work request not found or not assigned to this worker'}), 404
+        
+        # Set the worker arrival time
+        update_query = "UPDATE Work_Request SET worker_arrival_time = %s WHERE request_id = %s"
+        cursor.execute(update_query, (arrival_time, request_id))
+        changes.record_for_request(cursor, 'work_request', request_id, changes.UPDATE, request_id)
+        
+        # Create a notification for the user
+        notification_id = notifications.insert(cursor, request_id, notifications.ARRIVAL_TIME_SET, arrival_time)
+        changes.record_for_request(cursor, 'notification', notification_id, changes.INSERT, request_id)
+        
+        connection.commit()
+        return worker_transition_response(cursor, request_id, 'Worker arrival time set successfully',
+                                          {'assigned': 'updated'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/work-requests/<int:request_id>/confirm-arrival', methods=['POST'])
+def confirm_worker_arrival(request_id):
+    data = request.get_json()
+    user_id = data.get('userId')
+    confirmation_status = data.get('confirmationStatus')  # 'Confirmed' or 'Rejected'
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a user
+        login_query = "SELECT * FROM Login WHERE login_id = %s AND role = 'User' AND deleted_at IS NULL"
+        cursor.execute(login_query, (user_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'User not found'}), 404
+        
+        # Check if the work request exists and belongs to this user
+        request_query = "SELECT * FROM Work_Request WHERE request_id = %s AND user_id = %s AND status = 'Accepted'"
+        cursor.execute(request_query, (request_id, user_id))
+        work_request = cursor.fetchone()
+        
+        if not work_request:
+            return jsonify({'error': 'Work request not found or not assigned to this user'}), 404
+        
+        # Update the user confirmation status
+        update_query = "UPDATE Work_Request SET user_confirmation_status = %s WHERE request_id = %s"
+        cursor.execute(update_query, (confirmation_status, request_id))
+        changes.record_for_request(cursor, 'work_request', request_id, changes.UPDATE, request_id)
+        
+        # Create a notification for the worker; the user's name is filled in when it is read
+        notification_id = notifications.insert(cursor, request_id, notifications.ARRIVAL_CONFIRMED,
+                                               confirmation_status.lower())
+        changes.record_for_request(cursor, 'notification', notification_id, changes.INSERT, request_id)
+        
+        connection.commit()
+        return jsonify({'message': f'Worker arrival time {confirmation_status.lower()} successfully'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
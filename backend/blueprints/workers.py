@@ -0,0 +1,298 @@
+from flask import Blueprint, request, jsonify
+
+from blueprints.common import recommend_workers
+import bulk
+import cache
+import changes
+from db import DIALECT, create_connection
+import presence
+import search
+
+# Worker profiles, skills, presence, the worker directory and recommendations.
+
+bp = Blueprint('workers', __name__)
+
+def with_presence(worker):
+    """The profile with the status this process last heard (it may not be written yet) and `online`."""
+    entry = presence.table.get(worker['login_id'])
+    if entry is None:
+        return dict(worker, online=False)
+    return dict(worker, available_status=entry.status, online=presence.table.is_online(entry))
+
+@bp.route('/api/workers/<int:worker_id>', methods=['GET'])
+def get_worker(worker_id):
+    # A cached profile also stands in for the Login role check
+    found, worker = cache.profile_cache.get(cache.worker_key(worker_id))
+    if found:
+        return jsonify(with_presence(worker)), 200
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, get the login record to verify it's a worker
+        login_query = "SELECT * FROM Login WHERE login_id = %s AND role = 'Worker' AND deleted_at IS NULL"
+        cursor.execute(login_query, (worker_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        # Then get the worker details
+        worker_query = "SELECT * FROM Skill_Worker WHERE login_id = %s"
+        cursor.execute(worker_query, (worker_id,))
+        worker = cursor.fetchone()
+        
+        if worker:
+            cache.profile_cache.set(cache.worker_key(worker_id), worker)
+            return jsonify(with_presence(worker)), 200
+        else:
+            return jsonify({'error': 'Worker details not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/workers/<int:worker_id>/skills', methods=['GET'])
+def get_worker_skills(worker_id):
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a worker
+        login_query = "SELECT * FROM Login WHERE login_id = %s AND role = 'Worker' AND deleted_at IS NULL"
+        cursor.execute(login_query, (worker_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        query = """SELECT st.skill_type_id, st.skill_name FROM Worker_Skills ws
+                   JOIN Skill_Type st ON ws.skill_type_id = st.skill_type_id
+                   WHERE ws.worker_id = (SELECT worker_id FROM Skill_Worker WHERE login_id = %s)"""
+        cursor.execute(query, (worker_id,))
+        skills = cursor.fetchall()
+        return jsonify(skills), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/workers/<int:worker_id>/availability', methods=['POST'])
+def update_availability(worker_id):
+    data = request.get_json()
+    # New fields for time slots
+    morning_start = data.get('morning_start', '09:30')
+    morning_end = data.get('morning_end', '12:00')
+    afternoon_start = data.get('afternoon_start', '13:00')
+    afternoon_end = data.get('afternoon_end', '18:00')
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # Check if worker exists by login_id
+        cursor.execute("SELECT worker_id FROM Skill_Worker WHERE login_id = %s AND deleted_at IS NULL", (worker_id,))
+        worker_result = cursor.fetchone()
+        if not worker_result:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        worker_db_id = worker_result['worker_id']
+        
+        # Insert availability with time slots
+        query = """INSERT INTO Worker_Availability (worker_id, request_details) VALUES (%s, %s)"""
+        request_details = f"Available: Morning {morning_start}-{morning_end}, Afternoon {afternoon_start}-{afternoon_end}"
+        cursor.execute(query, (worker_db_id, request_details))
+        changes.record(cursor, 'availability', cursor.lastrowid, changes.INSERT, worker_id=worker_db_id)
+        
+        connection.commit()
+        return jsonify({'message': 'Availability updated successfully'}), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/workers/search', methods=['GET'])
+def filter_workers():
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    # ?online=1 keeps only workers with a recent heartbeat, taken from the presence table
+    online_ids = None
+    if request.args.get('online', '').lower() in ('1', 'true', 'yes'):
+        online_ids = presence.table.online_worker_ids(request.args.get('skill_type_id', type=int))
+    
+    cursor = connection.cursor()
+    try:
+        page = search.filter_workers(cursor, request.args, online_ids, DIALECT)
+        for worker in page['results']:
+            worker['online'] = presence.table.is_online(presence.table.get(worker['login_id']))
+        return jsonify(page), 200
+    except search.SearchError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+def load_presence(worker_id):
+    """The worker's presence entry, read from the database the first time this process sees them."""
+    entry = presence.table.get(worker_id)
+    if entry is not None:
+        return entry
+    connection = create_connection()
+    if connection is None:
+        raise RuntimeError('Database connection failed')
+    cursor = connection.cursor()
+    try:
+        return presence.table.load(cursor, worker_id)
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/workers/<int:worker_id>/status', methods=['PUT'])
+def update_worker_status(worker_id):
+    data = request.get_json()
+    status = data.get('status')
+    
+    try:
+        presence.validate_status(status)
+        entry = load_presence(worker_id)
+        if entry is None:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        # Written to Skill_Worker by the presence flusher, which also records the change
+        presence.table.heartbeat(entry, status)
+        presence.flusher.wake()
+        return jsonify({'message': f'Worker status updated to {status}'}), 200
+    except presence.PresenceError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/workers/<int:worker_id>/heartbeat', methods=['POST'])
+def worker_heartbeat(worker_id):
+    data = request.get_json(silent=True) or {}
+    status = data.get('status')
+    
+    try:
+        if status is not None:
+            presence.validate_status(status)
+        entry = load_presence(worker_id)
+        if entry is None:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        previous_status = entry.status
+        presence.table.heartbeat(entry, status)
+        if entry.status != previous_status:
+            presence.flusher.wake()
+        return jsonify({'status': entry.status, 'online': True,
+                        'next_heartbeat_seconds': presence.HEARTBEAT_INTERVAL_SECONDS}), 200
+    except presence.PresenceError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/workers/online', methods=['GET'])
+def get_online_workers():
+    # Served from this process's presence table; no database reads
+    skill_type_id = request.args.get('skill_type_id', type=int)
+    status = request.args.get('status')
+    within = request.args.get('within', type=int)
+    workers = presence.table.online_workers(skill_type_id, status, within)
+    return jsonify({'workers': [entry.to_dict() for entry in workers], 'stats': presence.table.stats()}), 200
+
+@bp.route('/api/workers/recommend', methods=['GET'])
+def get_recommended_workers():
+    skill_type_id = request.args.get('skill_type_id', type=int)
+    if skill_type_id is None:
+        return jsonify({'error': 'skill_type_id is required'}), 400
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        result = recommend_workers(cursor, skill_type_id, request.args.get('pincode'), request.args.get('city'))
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/workers/<int:worker_id>', methods=['PUT'])
+def update_worker(worker_id):
+    data = request.get_json()
+    first_name = data.get('first_name')
+    last_name = data.get('last_name')
+    address = data.get('address')
+    city = data.get('city')
+    pincode = data.get('pincode')
+    door_no = data.get('door_no')
+    street_name = data.get('street_name')
+    area = data.get('area')
+    experience_years = data.get('experience_years')
+    phone_number1 = data.get('phone_number1')
+    phone_number2 = data.get('phone_number2')
+    skill_ids = data.get('skill_ids')  # New field for worker skills
+    
+    connection = create_connection()
+    if connection is None:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    cursor = connection.cursor()
+    try:
+        # First, verify the login record exists and is for a worker
+        login_query = "SELECT * FROM Login WHERE login_id = %s AND role = 'Worker' AND deleted_at IS NULL"
+        cursor.execute(login_query, (worker_id,))
+        login = cursor.fetchone()
+        
+        if not login:
+            return jsonify({'error': 'Worker not found'}), 404
+        
+        # Then update the worker details using login_id
+        update_query = """UPDATE Skill_Worker SET first_name = %s, last_name = %s, address = %s, 
+                          city = %s, pincode = %s, door_no = %s, street_name = %s, area = %s, 
+                          experience_years = %s, phone_number1 = %s, phone_number2 = %s 
+                          WHERE login_id = %s"""
+        cursor.execute(update_query, (first_name, last_name, address, city, pincode, door_no, 
+                                      street_name, area, experience_years, phone_number1, 
+                                      phone_number2, worker_id))
+        
+        # Check if any rows were affected
+        if cursor.rowcount == 0:
+            return jsonify({'error': 'Worker details not found'}), 404
+        
+        # Update worker skills if provided, writing only the added and removed ones
+        if skill_ids is not None:
+            # First get the actual worker_id from Skill_Worker table
+            cursor.execute("SELECT worker_id FROM Skill_Worker WHERE login_id = %s", (worker_id,))
+            worker_result = cursor.fetchone()
+            if worker_result:
+                bulk.sync_worker_skills(cursor, worker_result['worker_id'], skill_ids)
+        changes.record_for_worker(cursor, changes.UPDATE, worker_id)
+        
+        connection.commit()
+        cache.profile_cache.invalidate(cache.worker_key(worker_id))
+        # Accept and the available list check skills against the presence entry; reload it everywhere
+        presence.table.forget(worker_id)
+        
+        return jsonify({'message': 'Worker updated successfully'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,205 @@
+import csv
+import io
+
+from passwords import hash_password
+
+# Bulk write helpers: multi-row inserts via executemany (PyMySQL rewrites
+# INSERT ... VALUES executemany calls into a single multi-row statement) and
+# diff-based skill updates, plus batched CSV imports for admins.
+
+DEFAULT_BATCH_SIZE = 500
+
+WORKER_CSV_FIELDS = ['username', 'password', 'first_name', 'last_name', 'address', 'city', 'pincode',
+                     'door_no', 'street_name', 'area', 'experience_years', 'phone_number1',
+                     'phone_number2', 'skills']
+WORKER_REQUIRED_FIELDS = ['username', 'password', 'first_name', 'last_name']
+
+
+def _placeholders(values):
+    return ','.join(['%s'] * len(values))
+
+
+def insert_worker_skills(cursor, worker_id, skill_ids):
+    """Insert all skills for one worker in a single statement."""
+    rows = [(worker_id, skill_id) for skill_id in dict.fromkeys(skill_ids)]
+    if rows:
+        cursor.executemany("INSERT INTO Worker_Skills (worker_id, skill_type_id) VALUES (%s, %s)", rows)
+    return len(rows)
+
+
+def sync_worker_skills(cursor, worker_id, skill_ids):
+    """Write only the difference between a worker's stored skills and `skill_ids`.
+
+    Returns (added, removed) as sorted lists. Unchanged skill sets cost one SELECT.
+    """
+    cursor.execute("SELECT skill_type_id FROM Worker_Skills WHERE worker_id = %s", (worker_id,))
+    current = {row['skill_type_id'] for row in cursor.fetchall()}
+    wanted = {int(skill_id) for skill_id in skill_ids}
+    added = sorted(wanted - current)
+    removed = sorted(current - wanted)
+    if removed:
+        cursor.execute(f"DELETE FROM Worker_Skills WHERE worker_id = %s AND skill_type_id IN ({_placeholders(removed)})",
+                       (worker_id, *removed))
+    insert_worker_skills(cursor, worker_id, added)
+    return added, removed
+
+
+def insert_missing_skill_types(cursor, skill_names):
+    """Insert the names not already in Skill_Type. Returns the list of names added."""
+    names = [name.strip() for name in skill_names if name and name.strip()]
+    if not names:
+        return []
+    # Skill_Type is small; compare case-insensitively on every backend
+    cursor.execute("SELECT skill_name FROM Skill_Type")
+    existing = {row['skill_name'].lower() for row in cursor.fetchall()}
+    missing = []
+    for name in names:
+        if name.lower() not in existing:
+            existing.add(name.lower())
+            missing.append(name)
+    if missing:
+        cursor.executemany("INSERT INTO Skill_Type (skill_name) VALUES (%s)", [(name,) for name in missing])
+    return missing
+
+
+def _read_csv(file_obj):
+    if isinstance(file_obj, (bytes, str)):
+        text = file_obj.decode('utf-8-sig') if isinstance(file_obj, bytes) else file_obj
+        file_obj = io.StringIO(text)
+    return csv.DictReader(file_obj)
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_skill_types_csv(connection, file_obj, batch_size=DEFAULT_BATCH_SIZE):
+    """Import skill types from a CSV with a `skill_name` column, one transaction per batch."""
+    reader = _read_csv(file_obj)
+    cursor = connection.cursor()
+    added = []
+    errors = []
+    try:
+        for batch in _batches(reader, batch_size):
+            try:
+                added.extend(insert_missing_skill_types(cursor, [row.get('skill_name') for row in batch]))
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                errors.append(str(e))
+    finally:
+        cursor.close()
+    return {'imported': len(added), 'skill_names': added, 'errors': errors}
+
+
+def _worker_row_error(row, seen_usernames, skill_lookup):
+    missing = [field for field in WORKER_REQUIRED_FIELDS if not (row.get(field) or '').strip()]
+    if missing:
+        return f"Missing required fields: {', '.join(missing)}"
+    if row['username'] in seen_usernames:
+        return 'Duplicate username in file'
+    unknown = [name for name in _split_skills(row.get('skills')) if name.lower() not in skill_lookup]
+    if unknown:
+        return f"Unknown skills: {', '.join(unknown)}"
+    experience = (row.get('experience_years') or '').strip()
+    if experience and not experience.isdigit():
+        return 'experience_years must be a whole number'
+    return None
+
+
+def _split_skills(value):
+    return [name.strip() for name in (value or '').split(';') if name.strip()]
+
+
+def import_workers_csv(connection, file_obj, batch_size=DEFAULT_BATCH_SIZE):
+    """Import workers (Login + Skill_Worker + Worker_Skills) from CSV.
+
+    Columns follow WORKER_CSV_FIELDS; `skills` is a ';'-separated list of skill
+    names. Each batch runs in its own transaction with a fixed number of
+    statements regardless of batch size. Invalid rows are skipped and reported
+    with their line number.
+    """
+    reader = _read_csv(file_obj)
+    cursor = connection.cursor()
+    imported = 0
+    skipped = []
+    seen_usernames = set()
+    try:
+        cursor.execute("SELECT skill_type_id, skill_name FROM Skill_Type")
+        skill_lookup = {row['skill_name'].lower(): row['skill_type_id'] for row in cursor.fetchall()}
+
+        # csv line numbers: header is line 1
+        for batch in _batches(enumerate(reader, start=2), batch_size):
+            valid = []
+            for line, row in batch:
+                row = {key: (value.strip() if isinstance(value, str) else value) for key, value in row.items() if key}
+                error = _worker_row_error(row, seen_usernames, skill_lookup)
+                if error:
+                    skipped.append({'line': line, 'error': error})
+                    continue
+                seen_usernames.add(row['username'])
+                valid.append((line, row))
+            if not valid:
+                continue
+
+            try:
+                usernames = [row['username'] for _, row in valid]
+                cursor.execute(f"SELECT username FROM Login WHERE username IN ({_placeholders(usernames)})",
+                               tuple(usernames))
+                taken = {r['username'] for r in cursor.fetchall()}
+                for line, row in valid:
+                    if row['username'] in taken:
+                        skipped.append({'line': line, 'error': 'Username already exists'})
+                valid = [(line, row) for line, row in valid if row['username'] not in taken]
+                if not valid:
+                    continue
+                usernames = [row['username'] for _, row in valid]
+
+                # Every value is a placeholder, or PyMySQL falls back to one INSERT per row
+                cursor.executemany("INSERT INTO Login (username, password, role) VALUES (%s, %s, %s)",
+                                   [(row['username'], hash_password(row['password']), 'Worker')
+                                    for _, row in valid])
+                cursor.execute(f"SELECT login_id, username FROM Login WHERE username IN ({_placeholders(usernames)})",
+                               tuple(usernames))
+                login_ids = {r['username']: r['login_id'] for r in cursor.fetchall()}
+
+                cursor.executemany(
+                    """INSERT INTO Skill_Worker (first_name, last_name, address, city, pincode, door_no,
+                       street_name, area, experience_years, phone_number1, phone_number2, login_id)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                    [(row['first_name'], row['last_name'], row.get('address') or None, row.get('city') or None,
+                      row.get('pincode') or None, row.get('door_no') or None, row.get('street_name') or None,
+                      row.get('area') or None, int(row['experience_years']) if row.get('experience_years') else None,
+                      row.get('phone_number1') or None, row.get('phone_number2') or None,
+                      login_ids[row['username']]) for _, row in valid])
+
+                ids = list(login_ids.values())
+                cursor.execute(f"SELECT worker_id, login_id FROM Skill_Worker WHERE login_id IN ({_placeholders(ids)})",
+                               tuple(ids))
+                worker_ids = {r['login_id']: r['worker_id'] for r in cursor.fetchall()}
+
+                skill_rows = []
+                for _, row in valid:
+                    worker_id = worker_ids[login_ids[row['username']]]
+                    for name in dict.fromkeys(_split_skills(row.get('skills'))):
+                        skill_rows.append((worker_id, skill_lookup[name.lower()]))
+                if skill_rows:
+                    cursor.executemany("INSERT INTO Worker_Skills (worker_id, skill_type_id) VALUES (%s, %s)",
+                                       skill_rows)
+
+                connection.commit()
+                imported += len(valid)
+            except Exception as e:
+                connection.rollback()
+                for line, _ in valid:
+                    skipped.append({'line': line, 'error': str(e)})
+    finally:
+        cursor.close()
+    return {'imported': imported, 'skipped': skipped}
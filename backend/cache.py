@@ -0,0 +1,351 @@
+import json
+import os
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+# Read-through cache for profile reads (get_user, get_worker). Writers call
+# invalidate() after committing; invalidation.bus forwards that to the other
+# processes serving the app. CACHE_BACKEND selects the store:
+#   local - in-process LRU (default)
+#   kv    - external Redis-compatible server at CACHE_URL (see kv_server.py)
+#   none  - caching disabled
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'local').lower()
+CACHE_URL = os.getenv('CACHE_URL', 'localhost:6379')
+CACHE_TTL_SECONDS = float(os.getenv('CACHE_TTL_SECONDS', 300))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+# Socket timeout for the kv backend; a slow cache must not slow down reads
+CACHE_TIMEOUT_SECONDS = float(os.getenv('CACHE_TIMEOUT_SECONDS', 0.2))
+# Invalidations are tracked per bucket of keys, so a write only voids the
+# in-flight loads of keys in its own bucket
+GENERATION_BUCKETS = 1024
+# Misses a thread may have waiting for their set(); older ones are dropped
+MAX_PENDING_MISSES = 256
+
+
+def user_key(user_id):
+    return f"user:{user_id}"
+
+
+def worker_key(login_id):
+    return f"worker:{login_id}"
+
+
+class LocalBackend:
+    """Thread-safe LRU with per-entry expiry."""
+
+    name = 'local'
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheError(Exception):
+    pass
+
+
+class KVClient:
+    """Minimal RESP client with one connection per thread."""
+
+    def __init__(self, url=CACHE_URL, timeout=CACHE_TIMEOUT_SECONDS):
+        host, _, port = url.rpartition(':')
+        self.address = (host or 'localhost', int(port or 6379))
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.create_connection(self.address, timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._local.sock = sock
+            self._local.reader = sock.makefile('rb')
+        return sock, self._local.reader
+
+    def _reset(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+        self._local.reader = None
+
+    def execute(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        try:
+            sock, reader = self._connection()
+            sock.sendall(b''.join(parts))
+            return self._read_reply(reader)
+        except (OSError, CacheError) as e:
+            # Drop the connection so the next call starts from a clean stream
+            self._reset()
+            raise CacheError(str(e))
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise CacheError("Connection closed by cache server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            raise CacheError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            return None if count < 0 else [self._read_reply(reader) for _ in range(count)]
+        raise CacheError(f"Unexpected reply from cache server: {line!r}")
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _decode_value(obj):
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    if '__date__' in obj:
+        return date.fromisoformat(obj['__date__'])
+    if '__decimal__' in obj:
+        return Decimal(obj['__decimal__'])
+    return obj
+
+
+class KVBackend:
+    """Stores JSON values in a Redis-compatible server with SET ... PX expiry.
+
+    Dates and decimals round-trip with their types so cached rows serialize
+    exactly like rows read from the database.
+    """
+
+    name = 'kv'
+
+    def __init__(self, client=None, prefix='skillhive:'):
+        self.client = client or KVClient()
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.execute('GET', self.prefix + key)
+        if raw is None:
+            return False, None
+        return True, json.loads(raw, object_hook=_decode_value)
+
+    def set(self, key, value, ttl):
+        data = json.dumps(value, default=_encode_value)
+        self.client.execute('SET', self.prefix + key, data, 'PX', max(1, int(ttl * 1000)))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.execute('DEL', *[self.prefix + key for key in keys])
+
+    def clear(self):
+        # Only this cache's keys: the server may be shared, so never FLUSHDB
+        pattern = re.sub(r'([*?\[\]\\])', r'\\\1', self.prefix) + '*'
+        cursor = '0'
+        while True:
+            cursor, keys = self.client.execute('SCAN', cursor, 'MATCH', pattern, 'COUNT', 500)
+            if keys:
+                self.client.execute('DEL', *keys)
+            if int(cursor) == 0:
+                return
+
+
+class Cache:
+    """Read-through cache with hit/miss counters.
+
+    Backend failures are counted and treated as misses, so an unreachable cache
+    server degrades to plain database reads. Every invalidation bumps the
+    generation of its keys' buckets (clear() bumps them all); a value loaded
+    after a miss is only stored if its bucket was not invalidated in between,
+    so a slow reader cannot put back a stale row, while writes to other keys
+    do not stop it from filling the cache.
+    """
+
+    def __init__(self, backend, ttl=CACHE_TTL_SECONDS, name='cache'):
+        self.backend = backend
+        self.ttl = ttl
+        self.name = name
+        # Called as listener(name, keys) on local invalidations; keys is None for clear()
+        self.listeners = []
+        self._generations = [0] * GENERATION_BUCKETS
+        self._clears = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {'hits': 0, 'misses': 0, 'sets': 0, 'invalidations': 0, 'stale_sets': 0, 'errors': 0}
+
+    @property
+    def per_process(self):
+        """True when each process holds its own copy and needs peer invalidations."""
+        return isinstance(self.backend, LocalBackend)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, key):
+        if self.backend is None:
+            return False, None
+        try:
+            found, value = self.backend.get(key)
+        except Exception as e:
+            self._count('errors')
+            print(f"Cache read failed for {key}: {e}")
+            found, value = False, None
+        self._count('hits' if found else 'misses')
+        if not found:
+            pending = self._pending()
+            pending.pop(key, None)
+            pending[key] = self._generation(key)
+            # Misses never followed by set() (not found, errors) must not pile up
+            while len(pending) > MAX_PENDING_MISSES:
+                del pending[next(iter(pending))]
+        return found, value
+
+    def _pending(self):
+        if not hasattr(self._local, 'misses'):
+            self._local.misses = {}
+        return self._local.misses
+
+    def _generation(self, key):
+        return self._clears, self._generations[hash(key) % GENERATION_BUCKETS]
+
+    def set(self, key, value, ttl=None):
+        if self.backend is None:
+            return
+        missed_at = self._pending().pop(key, None)
+        if missed_at is not None and missed_at != self._generation(key):
+            self._count('stale_sets')
+            return
+        try:
+            self.backend.set(key, value, self.ttl if ttl is None else ttl)
+            self._count('sets')
+        except Exception as e:
+            self._count('errors')
+            print(f"Cache write failed for {key}: {e}")
+
+    def read_through(self, key, loader, ttl=None):
+        """Return the cached value for `key`, or call `loader()` and cache a non-None result."""
+        found, value = self.get(key)
+        if found:
+            return value
+        try:
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl)
+        finally:
+            self._pending().pop(key, None)
+        return value
+
+    def invalidate(self, *keys, broadcast=True):
+        if self.backend is None or not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._generations[hash(key) % GENERATION_BUCKETS] += 1
+        try:
+            self.backend.delete(*keys)
+            self._count('invalidations', len(keys))
+        except Exception as e:
+            self._count('errors')
+            print(f"Cache invalidation failed for {', '.join(keys)}: {e}")
+        if broadcast:
+            self._notify(list(keys))
+
+    def clear(self, broadcast=True):
+        if self.backend is None:
+            return
+        with self._lock:
+            self._clears += 1
+        try:
+            self.backend.clear()
+        except Exception as e:
+            self._count('errors')
+            print(f"Cache clear failed: {e}")
+        if broadcast:
+            self._notify(None)
+
+    def _notify(self, keys):
+        for listener in self.listeners:
+            try:
+                listener(self.name, keys)
+            except Exception as e:
+                print(f"Cache listener failed for {self.name}: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+        stats['backend'] = getattr(self.backend, 'name', 'none')
+        stats['ttl_seconds'] = self.ttl
+        if isinstance(self.backend, LocalBackend):
+            stats['entries'] = len(self.backend)
+        return stats
+
+
+def build_cache(name, backend=CACHE_BACKEND, ttl=CACHE_TTL_SECONDS):
+    if backend == 'none':
+        return Cache(None, ttl, name)
+    if backend == 'kv':
+        return Cache(KVBackend(prefix=f"skillhive:{name}:"), ttl, name)
+    if backend == 'local':
+        return Cache(LocalBackend(), ttl, name)
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+profile_cache = build_cache('profiles')
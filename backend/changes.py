@@ -0,0 +1,246 @@
+import os
+import threading
+import time
+
+from db import create_connection
+
+# Change feed for incremental dashboard sync. Every mutation appends a row to
+# Change_Log in the same transaction: (seq, entity, entity_id, op) plus the
+# user, worker and skill it concerns, which decide whose feed it appears in.
+# GET /api/changes?since=<seq> returns the rows after `since` for one scope,
+# so a dashboard refresh costs as much as the activity since the last one.
+# Rows older than CHANGE_LOG_RETENTION_HOURS are compacted away; a client
+# whose `since` predates the oldest kept row is told to reload in full.
+#
+# seq is allocated when a row is inserted, not when its transaction commits,
+# so seq 101 can still be invisible after 102 has committed. Readers only
+# advance to visible_seq: the last row before the first gap whose next row is
+# younger than CHANGE_LOG_GAP_SECONDS. An older gap is an insert that rolled
+# back.
+
+CHANGE_LOG_RETENTION_HOURS = int(os.getenv('CHANGE_LOG_RETENTION_HOURS', 24))
+CHANGE_LOG_COMPACT_SECONDS = float(os.getenv('CHANGE_LOG_COMPACT_SECONDS', 300))
+CHANGE_LOG_BATCH_SIZE = int(os.getenv('CHANGE_LOG_BATCH_SIZE', 1000))
+# Longer than any write transaction runs (the gunicorn timeout is 30s)
+CHANGE_LOG_GAP_SECONDS = int(os.getenv('CHANGE_LOG_GAP_SECONDS', 60))
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 2000
+
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+# Many rows changed at once (CSV import): reload the entity's lists
+REFRESH = 'refresh'
+
+SCOPES = ('user', 'worker', 'admin')
+
+
+class ChangeFeedError(ValueError):
+    pass
+
+
+LAST_SEQ_QUERY = "SELECT COALESCE(MAX(seq), 0) AS last_seq FROM Change_Log"
+
+# Parameters from visible_seq_params(since)
+VISIBLE_SEQ_QUERY = """SELECT COALESCE(MAX(seq), %s) AS visible_seq FROM Change_Log
+                       WHERE seq > %s AND seq < COALESCE(
+                           (SELECT MIN(c.seq) FROM Change_Log c
+                            WHERE c.seq > %s + 1 AND c.created_at > NOW() - INTERVAL %s SECOND
+                            AND NOT EXISTS (SELECT 1 FROM Change_Log p WHERE p.seq = c.seq - 1)),
+                           9223372036854775807)"""
+
+
+def visible_seq_params(since):
+    return (since, since, since, CHANGE_LOG_GAP_SECONDS)
+
+
+def start_seq(last_seq):
+    """Where a reader loading a snapshot looks for gaps from: any transaction still
+    running took its seq within the last CHANGE_LOG_BATCH_SIZE changes."""
+    return max(0, last_seq - CHANGE_LOG_BATCH_SIZE)
+
+
+def visible_seq(cursor, since=None):
+    """The highest seq a reader can move its cursor to after `since`.
+
+    Every change up to it that is ever going to commit has committed. With
+    since=None (a reader loading a snapshot) it starts from start_seq.
+    """
+    if since is None:
+        cursor.execute(LAST_SEQ_QUERY)
+        since = start_seq(cursor.fetchone()['last_seq'])
+    cursor.execute(VISIBLE_SEQ_QUERY, visible_seq_params(since))
+    return cursor.fetchone()['visible_seq']
+
+
+def record(cursor, entity, entity_id, op, user_id=None, worker_id=None, skill_type_id=None):
+    """Append a change in the caller's transaction.
+
+    Rows with no user, worker or skill are visible in every scope.
+    """
+    cursor.execute("""INSERT INTO Change_Log (entity, entity_id, op, user_id, worker_id, skill_type_id, created_at)
+                      VALUES (%s, %s, %s, %s, %s, %s, NOW())""",
+                   (entity, entity_id, op, user_id, worker_id, skill_type_id))
+
+
+def record_for_request(cursor, entity, entity_id, op, request_id, worker_id=None):
+    """Append a change to a work request or a row hanging off one (notification, feedback).
+
+    The audience is read from the request: its user, its assigned worker (or
+    `worker_id` when the caller just unassigned one) and its skill, so the
+    available lists of every worker with that skill see it too.
+    """
+    cursor.execute("""INSERT INTO Change_Log (entity, entity_id, op, user_id, worker_id, skill_type_id, created_at)
+                      SELECT %s, %s, %s, user_id, COALESCE(worker_id, %s), skill_type_id, NOW()
+                      FROM Work_Request WHERE request_id = %s""",
+                   (entity, entity_id, op, worker_id, request_id))
+
+
+def record_for_worker(cursor, op, login_id):
+    """Append a change to the worker with this login id."""
+    cursor.execute("""INSERT INTO Change_Log (entity, entity_id, op, user_id, worker_id, skill_type_id, created_at)
+                      SELECT 'worker', worker_id, %s, NULL, worker_id, NULL, NOW()
+                      FROM Skill_Worker WHERE login_id = %s""", (op, login_id))
+
+
+def record_refresh(connection, entity):
+    """Record a REFRESH of `entity` in its own transaction (after a bulk import)."""
+    cursor = connection.cursor()
+    try:
+        record(cursor, entity, None, REFRESH)
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def _scope_filter(cursor, scope, scope_id):
+    if scope == 'admin':
+        return '', ()
+    if scope_id is None:
+        raise ChangeFeedError(f"id is required for the {scope} scope")
+    public = "(user_id IS NULL AND worker_id IS NULL AND skill_type_id IS NULL)"
+    if scope == 'user':
+        return f"AND (user_id = %s OR {public})", (scope_id,)
+    # Worker ids in the API are login ids
+    cursor.execute("""SELECT sw.worker_id, ws.skill_type_id FROM Skill_Worker sw
+                      LEFT JOIN Worker_Skills ws ON ws.worker_id = sw.worker_id
+                      WHERE sw.login_id = %s AND sw.deleted_at IS NULL""", (scope_id,))
+    rows = cursor.fetchall()
+    if not rows:
+        raise ChangeFeedError("Worker not found")
+    skill_ids = [row['skill_type_id'] for row in rows if row['skill_type_id'] is not None]
+    condition = f"worker_id = %s OR {public}"
+    if skill_ids:
+        condition += f" OR skill_type_id IN ({','.join(['%s'] * len(skill_ids))})"
+    return f"AND ({condition})", (rows[0]['worker_id'], *skill_ids)
+
+
+def _collapse(rows):
+    """One entry per (entity, entity_id), at the position of its latest change.
+
+    A row inserted and then updated within the window is reported as an insert.
+    """
+    latest, first_op = {}, {}
+    for row in rows:
+        key = (row['entity'], row['entity_id'])
+        first_op.setdefault(key, row['op'])
+        latest[key] = row
+    changes = []
+    for key, row in sorted(latest.items(), key=lambda item: item[1]['seq']):
+        op = row['op']
+        if first_op[key] == INSERT and op == UPDATE:
+            op = INSERT
+        changes.append({'entity': row['entity'], 'id': row['entity_id'], 'op': op, 'version': row['seq']})
+    return changes
+
+
+def read_changes(cursor, since, scope, scope_id=None, limit=DEFAULT_LIMIT):
+    """Changes after `since` visible to `scope`.
+
+    Returns {'changes', 'cursor', 'has_more', 'reset'}. `cursor` is the `since`
+    for the next call. `reset` means changes after `since` were compacted, so
+    the client must reload its lists in full and continue from `cursor`.
+    """
+    if scope not in SCOPES:
+        raise ChangeFeedError(f"scope must be one of {', '.join(SCOPES)}")
+    if since is None or since < 0:
+        raise ChangeFeedError("since must be a non-negative sequence number")
+    limit = max(1, min(limit, MAX_LIMIT))
+    cursor.execute("SELECT MIN(seq) AS first_seq, MAX(seq) AS last_seq FROM Change_Log")
+    bounds = cursor.fetchone()
+    last_seq = bounds['last_seq'] or 0
+    if (bounds['first_seq'] is not None and since < bounds['first_seq'] - 1) or since > last_seq:
+        return {'changes': [], 'cursor': visible_seq(cursor), 'has_more': False, 'reset': True}
+    condition, params = _scope_filter(cursor, scope, scope_id)
+    until = visible_seq(cursor, since)
+    # seq is the primary key, so this reads only the rows written since the last call
+    cursor.execute(f"""SELECT seq, entity, entity_id, op FROM Change_Log
+                       WHERE seq > %s AND seq <= %s {condition} ORDER BY seq LIMIT %s""",
+                   (since, until, *params, limit + 1))
+    rows = cursor.fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_seq = rows[-1]['seq'] if has_more else until
+    return {'changes': _collapse(rows), 'cursor': next_seq, 'has_more': has_more, 'reset': False}
+
+
+def compact(connection, retention_hours=CHANGE_LOG_RETENTION_HOURS, batch_size=CHANGE_LOG_BATCH_SIZE):
+    """Delete changes older than the retention window in batches, always keeping the newest row.
+
+    Returns the number of rows removed.
+    """
+    cursor = connection.cursor()
+    removed = 0
+    try:
+        cursor.execute("SELECT MAX(seq) AS last_seq FROM Change_Log")
+        last_seq = cursor.fetchone()['last_seq']
+        if last_seq is None:
+            return 0
+        while True:
+            cursor.execute("""DELETE FROM Change_Log WHERE seq < %s AND created_at < NOW() - INTERVAL %s HOUR
+                              ORDER BY seq LIMIT %s""", (last_seq, retention_hours, batch_size))
+            deleted = cursor.rowcount
+            connection.commit()
+            removed += deleted
+            if deleted < batch_size:
+                return removed
+    finally:
+        cursor.close()
+
+
+class Compactor:
+    """Daemon thread compacting Change_Log every CHANGE_LOG_COMPACT_SECONDS. Restarted after fork."""
+
+    def __init__(self, interval=CHANGE_LOG_COMPACT_SECONDS):
+        self.interval = interval
+        self.last_run = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='change-log-compactor', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                connection = create_connection(readonly=False)
+                if connection is None:
+                    continue
+                try:
+                    self.last_run = {'removed': compact(connection), 'at': time.time()}
+                finally:
+                    connection.close()
+            except Exception as e:
+                print(f"Change log compaction failed: {e}")
+
+
+compactor = Compactor()
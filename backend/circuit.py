@@ -0,0 +1,130 @@
+import math
+import threading
+import time
+
+# Fail-fast guards for database access. A CircuitBreaker stops connection
+# attempts after repeated failures so requests are rejected immediately
+# instead of each waiting out a connect timeout; ConnectionSlots caps the
+# connections one process holds open and bounds how long a request waits
+# for one. Both raise DatabaseUnavailable, which the app turns into a 503
+# with Retry-After.
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class DatabaseUnavailable(Exception):
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures; open ->
+    half_open after `reset_timeout` seconds, letting one trial call through;
+    the trial's outcome closes or re-opens the circuit."""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=10.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.rejected = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise DatabaseUnavailable unless a call may be attempted now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            self.rejected += 1
+        raise DatabaseUnavailable(f"{self.name} circuit is {self.state}", max(remaining, 1))
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) if error is not None else None
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"{self.name} circuit opened after {self.failures} failures: {self.last_error}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def cancel_trial(self):
+        # The trial never reached the database (e.g. no free connection slot)
+        with self._lock:
+            self._trial_running = False
+
+    def stats(self):
+        with self._lock:
+            retry_after = None
+            if self.state == OPEN:
+                retry_after = round(max(0.0, self.opened_at + self.reset_timeout - time.monotonic()), 3)
+            return {'state': self.state, 'consecutive_failures': self.failures, 'last_error': self.last_error,
+                    'rejected': self.rejected, 'retry_after_seconds': retry_after}
+
+
+class Slot:
+    """One acquired connection slot; release() is idempotent."""
+
+    def __init__(self, slots):
+        self._slots = slots
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._slots.release()
+
+
+class ConnectionSlots:
+    """Per-process cap on open database connections with a bounded wait."""
+
+    def __init__(self, limit, acquire_timeout):
+        self.limit = limit
+        self.acquire_timeout = acquire_timeout
+        self.shed = 0
+        self._in_use = 0
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self._semaphore.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self.shed += 1
+            raise DatabaseUnavailable(f"No database connection free within {self.acquire_timeout}s")
+        with self._lock:
+            self._in_use += 1
+        return Slot(self)
+
+    def release(self):
+        with self._lock:
+            self._in_use -= 1
+        self._semaphore.release()
+
+    def stats(self):
+        with self._lock:
+            return {'in_use': self._in_use, 'limit': self.limit,
+                    'acquire_timeout_seconds': self.acquire_timeout, 'shed': self.shed}
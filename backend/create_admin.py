@@ -1,10 +1,6 @@
-import hashlib
 import pymysql
 from db import create_connection
-
-def hash_password(password):
-    """Hash a password using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+from passwords import hash_password
 
 def create_admin_user(username, password):
     """Create an admin user in the database"""
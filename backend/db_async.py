@@ -0,0 +1,199 @@
+import asyncio
+import contextlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+from db import DatabaseUnavailable, primary_breaker
+
+# Connection pool for the asyncio serving mode (asgi.py). With DB_BACKEND=mysql
+# it is an aiomysql pool, so a request waiting on MySQL holds a coroutine rather
+# than a thread. SQLite has no asyncio driver; each pooled connection there is a
+# thread of its own running db_sqlite, which keeps local development and the
+# benchmarks working. Both hand out cursors whose execute/fetchone/fetchall are
+# awaited, and fail fast with DatabaseUnavailable like the synchronous
+# create_connection. Reads always go to the primary.
+
+DB_ASYNC_POOL_MIN = int(os.getenv('DB_ASYNC_POOL_MIN', 1))
+DB_ASYNC_POOL_MAX = int(os.getenv('DB_ASYNC_POOL_MAX', 20))
+DB_ACQUIRE_TIMEOUT = float(os.getenv('DB_ACQUIRE_TIMEOUT', 0.5))
+
+
+class _MySQLPool:
+    def __init__(self, minsize, maxsize):
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self._pool = None
+
+    async def start(self):
+        import aiomysql
+        from db_mysql import DB_CONNECT_TIMEOUT, primary_settings
+        settings = primary_settings()
+        settings['db'] = settings.pop('database')
+        self._cursor_class = aiomysql.DictCursor
+        # autocommit, or a pooled connection would keep reading its first snapshot
+        self._pool = await aiomysql.create_pool(minsize=self.minsize, maxsize=self.maxsize, charset='utf8mb4',
+                                                autocommit=True, connect_timeout=DB_CONNECT_TIMEOUT,
+                                                pool_recycle=3600, **settings)
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+
+    async def acquire(self, timeout):
+        primary_breaker.before_call()
+        try:
+            connection = await asyncio.wait_for(self._pool.acquire(), timeout)
+        except asyncio.TimeoutError:
+            primary_breaker.cancel_trial()
+            raise DatabaseUnavailable(f"No database connection free within {timeout}s")
+        except Exception as e:
+            primary_breaker.record_failure(e)
+            print(f"Error while connecting to MySQL: {e}")
+            raise DatabaseUnavailable('Database connection failed')
+        primary_breaker.record_success()
+        return connection
+
+    async def cursor(self, connection):
+        return await connection.cursor(self._cursor_class)
+
+    async def release(self, connection, cursor):
+        await cursor.close()
+        self._pool.release(connection)
+
+    def stats(self):
+        if self._pool is None:
+            return {'size': 0, 'free': 0, 'max': self.maxsize}
+        return {'size': self._pool.size, 'free': self._pool.freesize, 'max': self.maxsize}
+
+
+class _ThreadCursor:
+    """A db_sqlite cursor driven from the event loop; every call runs on its connection's thread."""
+
+    def __init__(self, executor, cursor):
+        self._executor = executor
+        self._cursor = cursor
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def execute(self, query, args=None):
+        return await self._run(self._cursor.execute, query, args)
+
+    async def fetchone(self):
+        return await self._run(self._cursor.fetchone)
+
+    async def fetchall(self):
+        return await self._run(self._cursor.fetchall)
+
+
+class _ThreadPool:
+    def __init__(self, size):
+        self.size = size
+        self._free = None
+        self._executors = []
+
+    async def start(self):
+        self._free = asyncio.Queue()
+        for index in range(self.size):
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"db-async-{index}")
+            self._executors.append(executor)
+            self._free.put_nowait(executor)
+
+    async def close(self):
+        for executor in self._executors:
+            executor.shutdown(wait=False)
+        self._executors = []
+
+    async def acquire(self, timeout):
+        try:
+            executor = await asyncio.wait_for(self._free.get(), timeout)
+        except asyncio.TimeoutError:
+            raise DatabaseUnavailable(f"No database connection free within {timeout}s")
+        # db_sqlite keeps one connection per thread (and applies the circuit breaker);
+        # the executor's single thread owns it. Shielded so a cancelled request cannot
+        # strand an open connection.
+        opening = asyncio.get_running_loop().run_in_executor(executor, self._open)
+        try:
+            connection = await asyncio.shield(opening)
+        except asyncio.CancelledError:
+            opening.add_done_callback(lambda done: self._discard(executor, done))
+            raise
+        except BaseException:
+            self._free.put_nowait(executor)
+            raise
+        if connection is None:
+            self._free.put_nowait(executor)
+            raise DatabaseUnavailable('Database connection failed')
+        return executor, connection
+
+    @staticmethod
+    def _open():
+        # sqlite3 objects may only be touched on the thread that made them
+        connection = db.create_connection(readonly=False)
+        return None if connection is None else (connection, connection.cursor())
+
+    @staticmethod
+    def _close(connection):
+        connection[1].close()
+        connection[0].close()
+
+    def _discard(self, executor, opening):
+        if not opening.cancelled() and opening.exception() is None and opening.result() is not None:
+            executor.submit(self._close, opening.result())
+        self._free.put_nowait(executor)
+
+    async def cursor(self, handle):
+        executor, (_, cursor) = handle
+        return _ThreadCursor(executor, cursor)
+
+    async def release(self, handle, cursor):
+        executor, connection = handle
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, self._close, connection)
+        finally:
+            self._free.put_nowait(executor)
+
+    def stats(self):
+        free = self._free.qsize() if self._free is not None else 0
+        return {'size': len(self._executors), 'free': free, 'max': self.size}
+
+
+pool = None
+
+
+async def start():
+    """Open the pool for this process; called when the ASGI app starts."""
+    global pool
+    if pool is not None:
+        return
+    pool = _MySQLPool(DB_ASYNC_POOL_MIN, DB_ASYNC_POOL_MAX) if db.DB_BACKEND == 'mysql' \
+        else _ThreadPool(DB_ASYNC_POOL_MAX)
+    await pool.start()
+
+
+async def close():
+    global pool
+    if pool is not None:
+        await pool.close()
+        pool = None
+
+
+@contextlib.asynccontextmanager
+async def cursor():
+    """An awaitable cursor on the primary, returned to the pool on exit.
+
+    Raises DatabaseUnavailable while the primary's circuit is open or when no
+    pooled connection frees up within DB_ACQUIRE_TIMEOUT.
+    """
+    handle = await pool.acquire(DB_ACQUIRE_TIMEOUT)
+    handle_cursor = await pool.cursor(handle)
+    try:
+        yield handle_cursor
+    finally:
+        await pool.release(handle, handle_cursor)
+
+
+def stats():
+    return pool.stats() if pool is not None else None
@@ -1,17 +1,333 @@
-import sqlite3
+import functools
 import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from circuit import CircuitBreaker, ConnectionSlots, DatabaseUnavailable
+import query_budget
+
+# SQLite backend with the same API as db_mysql.py (select it with DB_BACKEND=sqlite).
+# Connections are opened once per thread in WAL mode and reused; statements
+# written for MySQL are translated on the way in (see translate) and rows come
+# back as dicts with DATE/DATETIME columns parsed, like PyMySQL's DictCursor.
+
+DIALECT = 'sqlite'
+
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'skillhive.db')
+# Read-only copies (e.g. restored by Litestream) that GET requests may read from
+SQLITE_REPLICA_PATHS = [path.strip() for path in os.getenv('SQLITE_REPLICA_PATHS', '').split(',') if path.strip()]
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_CACHE_KB = int(os.getenv('SQLITE_CACHE_KB', 65536))
+SQLITE_MMAP_BYTES = int(os.getenv('SQLITE_MMAP_BYTES', 268435456))
+
+DB_BREAKER_FAILURES = int(os.getenv('DB_BREAKER_FAILURES', 5))
+DB_BREAKER_RESET_SECONDS = float(os.getenv('DB_BREAKER_RESET_SECONDS', 10))
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 32))
+DB_ACQUIRE_TIMEOUT = float(os.getenv('DB_ACQUIRE_TIMEOUT', 0.5))
+
+primary_breaker = CircuitBreaker('primary', DB_BREAKER_FAILURES, DB_BREAKER_RESET_SECONDS)
+connection_slots = ConnectionSlots(DB_MAX_CONNECTIONS, DB_ACQUIRE_TIMEOUT)
+
+# FTS5 tables mirroring the searchable columns, kept in sync by triggers
+FTS_TABLES = {
+    'Work_Request_FTS': ('Work_Request', 'request_id', ['description', 'area', 'street_name']),
+    'Skill_Worker_FTS': ('Skill_Worker', 'worker_id', ['first_name', 'last_name', 'area', 'street_name']),
+}
 
-def create_connection():
+_local = threading.local()
+
+
+def _parse_date(value):
     try:
-        # Create SQLite database file
-        conn = sqlite3.connect('skillhive.db')
-        conn.row_factory = sqlite3.Row  # This enables column access by name
-        print("Successfully connected to SQLite database")
-        return conn
-    except Exception as e:
-        print(f"Error while connecting to SQLite: {e}")
+        return date.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+
+def _parse_datetime(value):
+    try:
+        return datetime.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter('DATE', _parse_date)
+sqlite3.register_converter('DATETIME', _parse_datetime)
+
+
+# MySQL -> SQLite rewrites, applied in order
+_NOW = re.compile(r'\bNOW\(\)', re.IGNORECASE)
+_CURDATE = re.compile(r'\bCURDATE\(\)', re.IGNORECASE)
+_INTERVAL = re.compile(r"((?:datetime|date)\('now', 'localtime'\)|[\w.]+)\s*([+-])\s*INTERVAL\s+(\?|\d+)\s+"
+                       r"(SECOND|MINUTE|HOUR|DAY|MONTH|YEAR)\b", re.IGNORECASE)
+_DELETE_LIMIT = re.compile(r'^\s*DELETE\s+FROM\s+(\w+)\s+WHERE\s+(.*?)\s+LIMIT\s+(\?|\d+)\s*$',
+                           re.IGNORECASE | re.DOTALL)
+_INSERT_IGNORE = re.compile(r'^\s*INSERT\s+IGNORE\b', re.IGNORECASE)
+
+
+def _interval(match):
+    operand, sign, amount, unit = match.groups()
+    return f"datetime({operand}, '{sign}' || {amount} || ' {unit.lower()}s')"
+
+
+@functools.lru_cache(maxsize=1024)
+def translate(sql):
+    """Rewrite a MySQL statement for SQLite.
+
+    Handles %s placeholders, NOW(), CURDATE(), `<expr> +/- INTERVAL n UNIT`,
+    `DELETE ... LIMIT n` and INSERT IGNORE. Full-text MATCH ... AGAINST has no
+    translation; search.py issues FTS5 queries when DIALECT is 'sqlite'.
+    """
+    sql = sql.replace('%s', '?')
+    sql = _NOW.sub("datetime('now', 'localtime')", sql)
+    sql = _CURDATE.sub("date('now', 'localtime')", sql)
+    sql = _INTERVAL.sub(_interval, sql)
+    sql = _DELETE_LIMIT.sub(r'DELETE FROM \1 WHERE rowid IN (SELECT rowid FROM \1 WHERE \2 LIMIT \3)', sql)
+    return _INSERT_IGNORE.sub('INSERT OR IGNORE', sql)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class Cursor:
+    """DictCursor-like wrapper translating MySQL statements."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        try:
+            self._cursor.execute(translate(query), tuple(args) if args is not None else ())
+        finally:
+            if query_budget.QUERY_DEBUG or query_budget.is_tracking():
+                query_budget.record(query, (time.perf_counter() - start) * 1000)
+        return self._cursor.rowcount
+
+    def executemany(self, query, args):
+        start = time.perf_counter()
+        try:
+            self._cursor.executemany(translate(query), [tuple(row) for row in args])
+        finally:
+            if query_budget.QUERY_DEBUG or query_budget.is_tracking():
+                query_budget.record(query, (time.perf_counter() - start) * 1000)
+        return self._cursor.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    """Handle on this thread's shared sqlite3 connection.
+
+    close() rolls back anything uncommitted and frees the connection slot but
+    keeps the underlying connection open for the thread's next request.
+    """
+
+    def __init__(self, raw, slot):
+        self._raw = raw
+        self._slot = slot
+
+    def cursor(self, cursorclass=None):
+        return Cursor(self._raw.cursor())
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        if self._raw is None:
+            return
+        try:
+            if self._raw.in_transaction:
+                self._raw.rollback()
+        finally:
+            self._raw = None
+            self._slot.release()
+
+
+def _open(path, readonly=False):
+    if readonly:
+        raw = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                              detect_types=sqlite3.PARSE_DECLTYPES)
+    else:
+        # IMMEDIATE: take the write lock when the first write starts, so a transaction
+        # that read first waits on busy_timeout instead of failing with SQLITE_BUSY
+        raw = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, isolation_level='IMMEDIATE',
+                              detect_types=sqlite3.PARSE_DECLTYPES)
+        raw.execute("PRAGMA journal_mode = WAL")
+        raw.execute("PRAGMA synchronous = NORMAL")
+    raw.row_factory = _dict_row
+    raw.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    raw.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_KB}")
+    raw.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_BYTES}")
+    raw.execute("PRAGMA temp_store = MEMORY")
+    raw.execute("PRAGMA foreign_keys = ON")
+    return raw
+
+
+def _thread_connection(path, readonly=False):
+    # Connections must not cross threads or fork()
+    if getattr(_local, 'pid', None) != os.getpid():
+        _local.pid = os.getpid()
+        _local.connections = {}
+    key = (path, readonly)
+    raw = _local.connections.get(key)
+    if raw is None:
+        raw = _local.connections[key] = _open(path, readonly)
+    return raw
+
+
+def route_reads_to_replica(enabled):
+    _local.replica = enabled
+    _local.used = None
+
+
+def reads_use_replica():
+    return getattr(_local, 'replica', False)
+
+
+def last_route():
+    return getattr(_local, 'used', None)
+
+
+class ReplicaFiles:
+    """Round-robin over SQLITE_REPLICA_PATHS, skipping files that cannot be opened.
+
+    Copies are assumed current; there is no replication lag to measure.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.errors = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self):
+        return bool(self.paths)
+
+    def connect(self):
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.paths)
+        for path in self.paths[start:] + self.paths[:start]:
+            try:
+                raw = _thread_connection(path, readonly=True)
+                self.errors.pop(path, None)
+                return raw
+            except sqlite3.Error as e:
+                self.errors[path] = str(e)
         return None
 
+    def stats(self):
+        return [{'replica': path, 'healthy': path not in self.errors, 'lag_seconds': None,
+                 'error': self.errors.get(path)} for path in self.paths]
+
+
+replicas = ReplicaFiles(SQLITE_REPLICA_PATHS)
+
+
+def create_connection(readonly=None):
+    """Return a handle on this thread's connection, or None if the file cannot be opened.
+
+    Connections on one thread share a transaction: commit or roll back before
+    opening another. Raises DatabaseUnavailable like db_mysql.create_connection.
+    """
+    if readonly is None:
+        readonly = reads_use_replica()
+    slot = connection_slots.acquire()
+    try:
+        if readonly and replicas.configured:
+            raw = replicas.connect()
+            if raw is not None:
+                _local.used = 'replica'
+                return Connection(raw, slot)
+        primary_breaker.before_call()
+        try:
+            raw = _thread_connection(SQLITE_PATH)
+        except sqlite3.Error as e:
+            primary_breaker.record_failure(e)
+            print(f"Error while opening SQLite database {SQLITE_PATH}: {e}")
+            slot.release()
+            return None
+        primary_breaker.record_success()
+        _local.used = 'primary'
+        return Connection(raw, slot)
+    except BaseException:
+        slot.release()
+        raise
+
+
+def server_side_cursor(connection):
+    # sqlite3 cursors already step through results lazily
+    return connection.cursor()
+
+
+def ensure_column(cursor, table, column, definition):
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row['name'] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        return True
+    return False
+
+
+def ensure_fts_table(cursor, fts_table, table, key, columns):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,))
+    exists = cursor.fetchone() is not None
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f"new.{column}" for column in columns)
+    old_values = ', '.join(f"old.{column}" for column in columns)
+    cursor.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+                       USING fts5({column_list}, content='{table}', content_rowid='{key}')""")
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table} BEGIN
+                       INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.{key}, {new_values});
+                       END""")
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table} BEGIN
+                       INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.{key}, {old_values});
+                       END""")
+    cursor.execute(f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE ON {table} BEGIN
+                       INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.{key}, {old_values});
+                       INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.{key}, {new_values});
+                       END""")
+    if not exists:
+        # Index rows that were inserted before the FTS table existed
+        cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
 def init_db():
     connection = create_connection()
     if connection is None:
@@ -30,7 +346,8 @@ def init_db():
             login_id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT UNIQUE NOT NULL,
             password TEXT NOT NULL,
-            role TEXT NOT NULL CHECK (role IN ('User', 'Worker', 'Admin'))
+            role TEXT NOT NULL CHECK (role IN ('User', 'Worker', 'Admin')),
+            deleted_at DATETIME NULL
         )
         """)
         
@@ -44,6 +361,7 @@ def init_db():
             phone_number1 TEXT,
             phone_number2 TEXT,
             login_id INTEGER,
+            deleted_at DATETIME NULL,
             FOREIGN KEY (login_id) REFERENCES Login(login_id) ON DELETE CASCADE
         )
         """)
@@ -65,6 +383,10 @@ def init_db():
             phone_number1 TEXT,
             phone_number2 TEXT,
             login_id INTEGER,
+            deleted_at DATETIME NULL,
+            rating_count INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            avg_rating REAL NOT NULL DEFAULT 0,
             FOREIGN KEY (login_id) REFERENCES Login(login_id) ON DELETE CASCADE
         )
         """)
@@ -105,6 +427,8 @@ def init_db():
             area TEXT,
             worker_arrival_time TEXT,
             user_confirmation_status TEXT DEFAULT 'Pending' CHECK (user_confirmation_status IN ('Pending', 'Confirmed', 'Rejected')),
+            amount REAL,
+            completed_date DATE,
             FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE,
             FOREIGN KEY (worker_id) REFERENCES Skill_Worker(worker_id) ON DELETE SET NULL,
             FOREIGN KEY (skill_type_id) REFERENCES Skill_Type(skill_type_id) ON DELETE CASCADE
@@ -145,12 +469,187 @@ def init_db():
         )
         """)
         
+        # Create Purge_Job table (background cascade for soft-deleted accounts)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Purge_Job (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity TEXT NOT NULL CHECK (entity IN ('User', 'Worker')),
+            entity_id INTEGER NOT NULL,
+            login_id INTEGER,
+            status TEXT DEFAULT 'Pending',
+            step INTEGER DEFAULT 0,
+            current_table TEXT,
+            rows_deleted INTEGER DEFAULT 0,
+            claimed_by TEXT,
+            error TEXT,
+            created_at DATETIME,
+            updated_at DATETIME
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_purge_job_status ON Purge_Job (status, job_id)")
+        
+        # Create Report_Job table (background admin reports and their cached results)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Report_Job (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            report TEXT NOT NULL,
+            params TEXT,
+            params_hash TEXT NOT NULL,
+            status TEXT DEFAULT 'Queued',
+            error TEXT,
+            result TEXT,
+            row_count INTEGER,
+            duration_ms REAL,
+            created_at DATETIME,
+            started_at DATETIME,
+            finished_at DATETIME,
+            updated_at DATETIME,
+            expires_at DATETIME NOT NULL
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_report_job_hash ON Report_Job (params_hash, expires_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_report_job_expires ON Report_Job (expires_at)")
+        
+        # Create Idempotency_Key table (stored responses for retried writes)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Idempotency_Key (
+            idempotency_key TEXT PRIMARY KEY,
+            request_hash TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Processing',
+            response_status INTEGER,
+            response_body TEXT,
+            content_type TEXT,
+            created_at DATETIME,
+            expires_at DATETIME NOT NULL
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_idempotency_key_expires ON Idempotency_Key (expires_at)")
+        
+        # Create Change_Log table (change feed for incremental dashboard sync)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Change_Log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity TEXT NOT NULL,
+            entity_id INTEGER,
+            op TEXT NOT NULL,
+            user_id INTEGER,
+            worker_id INTEGER,
+            skill_type_id INTEGER,
+            created_at DATETIME
+        )
+        """)
+        
+        # Create Scheduler_Lease table (scheduler leader election; MySQL uses GET_LOCK instead)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Scheduler_Lease (
+            name TEXT PRIMARY KEY,
+            holder TEXT,
+            expires_at DATETIME
+        )
+        """)
+        
+        # Create Notification_Template table (per-locale overrides of the notification texts)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Notification_Template (
+            template_code INTEGER NOT NULL,
+            locale TEXT NOT NULL,
+            body TEXT NOT NULL,
+            PRIMARY KEY (template_code, locale)
+        )
+        """)
+        
+        # Create Cache_Generation table (cross-host cache invalidation counters)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Cache_Generation (
+            cache_name TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME
+        )
+        """)
+        
+        # Create history tables for archived (closed) work requests and their feedback.
+        # No foreign keys: rows outlive the live tables' cascades.
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Work_Request_History (
+            request_id INTEGER PRIMARY KEY,
+            user_id INTEGER,
+            worker_id INTEGER NULL,
+            skill_type_id INTEGER,
+            description TEXT,
+            request_date DATE,
+            status TEXT,
+            location TEXT,
+            city TEXT,
+            pincode TEXT,
+            door_no TEXT,
+            street_name TEXT,
+            area TEXT,
+            worker_arrival_time TEXT,
+            user_confirmation_status TEXT,
+            amount REAL,
+            completed_date DATE,
+            archived_at DATETIME
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_wr_history_user ON Work_Request_History (user_id, request_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_wr_history_worker ON Work_Request_History (worker_id, request_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_wr_history_status_date ON Work_Request_History (status, request_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_wr_history_status_completed ON Work_Request_History (status, completed_date)")
+        
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Feedback_History (
+            feedback_id INTEGER PRIMARY KEY,
+            request_id INTEGER,
+            comments TEXT,
+            rating INTEGER,
+            archived_at DATETIME
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_feedback_history_request ON Feedback_History (request_id)")
+        
+        # Columns added after the first release
+        ensure_column(cursor, 'Work_Request', 'amount', 'REAL')
+        ensure_column(cursor, 'Work_Request', 'completed_date', 'DATE')
+        ensure_column(cursor, 'Work_Request', 'created_at', 'DATETIME')
+        ensure_column(cursor, 'Work_Request_History', 'created_at', 'DATETIME')
+        ensure_column(cursor, 'Login', 'deleted_at', 'DATETIME')
+        ensure_column(cursor, 'User', 'deleted_at', 'DATETIME')
+        ensure_column(cursor, 'Skill_Worker', 'deleted_at', 'DATETIME')
+        ratings_added = ensure_column(cursor, 'Skill_Worker', 'rating_count', 'INTEGER NOT NULL DEFAULT 0')
+        ensure_column(cursor, 'Skill_Worker', 'rating_sum', 'INTEGER NOT NULL DEFAULT 0')
+        ensure_column(cursor, 'Skill_Worker', 'avg_rating', 'REAL NOT NULL DEFAULT 0')
+        ensure_column(cursor, 'Skill_Worker', 'last_seen_at', 'DATETIME')
+        ensure_column(cursor, 'Notification', 'template_code', 'INTEGER')
+        ensure_column(cursor, 'Notification', 'params', 'TEXT')
+        
+        # Existing ratings count from the release that added the aggregate
+        if ratings_added:
+            from ratings import refresh_worker_ratings
+            refresh_worker_ratings(cursor)
+        
+        # Indexes backing the report and export filters
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_work_request_status_date ON Work_Request (status, request_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_work_request_status_completed ON Work_Request (status, completed_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_skill_worker_status_city ON Skill_Worker (available_status, city)")
+        
+        # Indexes backing the worker directory filters and rating sort
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_skill_worker_status_rating ON Skill_Worker (available_status, avg_rating)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_skill_worker_city_rating ON Skill_Worker (city, avg_rating)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_skill_worker_pincode_rating ON Skill_Worker (pincode, avg_rating)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_worker_skills_skill ON Worker_Skills (skill_type_id, worker_id)")
+        
+        # Presence sync reads the workers seen recently
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_skill_worker_last_seen ON Skill_Worker (last_seen_at)")
+        
+        # Full-text search tables for admin search
+        for fts_table, (table, key, columns) in FTS_TABLES.items():
+            ensure_fts_table(cursor, fts_table, table, key, columns)
+        
         # Insert default skill types if table is empty
         cursor.execute("SELECT COUNT(*) as count FROM Skill_Type")
         if cursor.fetchone()['count'] == 0:
             default_skills = ['Plumbing', 'Electrical', 'Carpentry', 'Cleaning', 'Gardening', 'Painting']
-            for skill in default_skills:
-                cursor.execute("INSERT INTO Skill_Type (skill_name) VALUES (?)", (skill,))
+            cursor.executemany("INSERT INTO Skill_Type (skill_name) VALUES (?)", [(skill,) for skill in default_skills])
             print("Default skill types inserted")
         
         connection.commit()
@@ -0,0 +1,317 @@
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from archive import work_requests_table
+import changes
+from db import create_connection
+
+# Demand analytics for recruiting: work requests and completed requests per
+# skill x pincode x hour-of-week over the last DEMAND_WINDOW_WEEKS weeks, plus a
+# forecast of next week. Each process keeps one row per request in NumPy
+# arrays (sorted by request_id); the matrices are aggregated from them with
+# np.add.at into a snapshot that the admin endpoint serves until something
+# changes. Matrices have one row per (skill, pincode) pair that has requests,
+# so their size follows the requests rather than skills x pincodes. New and
+# completed requests are picked up from Change_Log every
+# DEMAND_REFRESH_SECONDS, re-reading only the requests that changed; the whole
+# window is rebuilt every DEMAND_REBUILD_SECONDS as it slides.
+#
+# Hour-of-week comes from Work_Request.created_at. Rows written before that
+# column existed only have request_date, so they count 1/24 in each hour of
+# that weekday.
+
+DEMAND_WINDOW_WEEKS = int(os.getenv('DEMAND_WINDOW_WEEKS', 8))
+DEMAND_REFRESH_SECONDS = float(os.getenv('DEMAND_REFRESH_SECONDS', 10))
+DEMAND_REBUILD_SECONDS = float(os.getenv('DEMAND_REBUILD_SECONDS', 6 * 3600))
+# Weight of the latest complete week in the forecast level (exponential smoothing)
+DEMAND_SMOOTHING = float(os.getenv('DEMAND_SMOOTHING', 0.5))
+# Pseudo-requests of the all-skill hourly profile mixed into each skill's profile
+PROFILE_PRIOR = 24.0
+LOAD_BATCH_SIZE = 1000
+HOURS_PER_WEEK = 168
+DEFAULT_TOP = 20
+MAX_TOP = 200
+# A Monday; week numbers count from here
+_EPOCH = date(2000, 1, 3)
+
+
+class DemandError(ValueError):
+    pass
+
+
+def _week(day):
+    return (day - _EPOCH).days // 7
+
+
+def _hour_of_week(row):
+    """0-167 from created_at, or -1 - weekday when only request_date is known."""
+    created = row.get('created_at')
+    if created:
+        return created.weekday() * 24 + created.hour
+    return -1 - row['request_date'].weekday()
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class DemandModel:
+    def __init__(self, window_weeks=DEMAND_WINDOW_WEEKS):
+        self.window_weeks = window_weeks
+        self.cursor = None
+        self._skills = {}
+        self._pincodes = {}
+        self._skill_names = {}
+        self._requests = self._empty()
+        self._snapshot = None
+        self._built = 0.0
+        self._refreshed = 0.0
+        self._pid = None
+        self._lock = threading.Lock()
+        self._counters = {'rebuilds': 0, 'refreshes': 0, 'requests_reloaded': 0, 'snapshots': 0,
+                          'last_snapshot_ms': None}
+
+    @staticmethod
+    def _empty():
+        return {'request_id': np.zeros(0, np.int64), 'skill': np.zeros(0, np.int32),
+                'pincode': np.zeros(0, np.int32), 'hour': np.zeros(0, np.int16),
+                'week': np.zeros(0, np.int32), 'completed': np.zeros(0, bool)}
+
+    def _first_week(self):
+        return _week(date.today()) - self.window_weeks
+
+    def _index(self, mapping, key):
+        return mapping.setdefault(key, len(mapping))
+
+    def _rows_to_arrays(self, rows):
+        first_week = self._first_week()
+        rows = [row for row in rows if row['request_date'] and row['skill_type_id']]
+        for row in rows:
+            row['request_date'] = _as_date(row['request_date'])
+        rows = [row for row in rows if _week(_as_date(row.get('created_at') or row['request_date'])) >= first_week]
+        count = len(rows)
+        return {'request_id': np.fromiter((row['request_id'] for row in rows), np.int64, count),
+                'skill': np.fromiter((self._index(self._skills, row['skill_type_id']) for row in rows), np.int32, count),
+                'pincode': np.fromiter((self._index(self._pincodes, (row['pincode'] or '').strip())
+                                        for row in rows), np.int32, count),
+                'hour': np.fromiter((_hour_of_week(row) for row in rows), np.int16, count),
+                'week': np.fromiter((_week(_as_date(row.get('created_at') or row['request_date']))
+                                     for row in rows), np.int32, count),
+                'completed': np.fromiter((row['status'] == 'Completed' for row in rows), bool, count)}
+
+    def _load_requests(self, cursor, request_ids=None):
+        start = _EPOCH + timedelta(weeks=self._first_week())
+        condition, params = "WHERE request_date >= %s OR created_at >= %s", (start, start)
+        if request_ids is not None:
+            condition = f"WHERE request_id IN ({','.join(['%s'] * len(request_ids))})"
+            params = tuple(request_ids)
+        # Archived requests still count towards demand
+        cursor.execute(f"""SELECT request_id, skill_type_id, pincode, status, request_date, created_at
+                           FROM {work_requests_table(True)} wr {condition}""", params)
+        return cursor.fetchall()
+
+    def rebuild(self, cursor):
+        last_seq = changes.visible_seq(cursor)
+        cursor.execute("SELECT skill_type_id, skill_name FROM Skill_Type")
+        skill_names = {row['skill_type_id']: row['skill_name'] for row in cursor.fetchall()}
+        rows = self._load_requests(cursor)
+        with self._lock:
+            self._skills, self._pincodes = {}, {}
+            arrays = self._rows_to_arrays(rows)
+            order = np.argsort(arrays['request_id'], kind='stable')
+            self._requests = {name: array[order] for name, array in arrays.items()}
+            self._skill_names = skill_names
+            self.cursor = last_seq
+            self._snapshot = None
+            self._built = time.monotonic()
+            self._counters['rebuilds'] += 1
+        return len(rows)
+
+    def _upsert(self, rows):
+        """Replace or add the rows for these requests. Caller holds the lock."""
+        ids = np.fromiter((row['request_id'] for row in rows), np.int64, len(rows))
+        current = self._requests
+        keep = ~np.isin(current['request_id'], ids)
+        incoming = self._rows_to_arrays(rows)
+        merged = {name: np.concatenate([current[name][keep], incoming[name]]) for name in current}
+        order = np.argsort(merged['request_id'], kind='stable')
+        self._requests = {name: array[order] for name, array in merged.items()}
+        self._snapshot = None
+
+    def refresh(self, cursor):
+        """Apply the work requests changed since the last refresh (rebuild if the log was compacted)."""
+        if self.cursor is None or time.monotonic() - self._built >= DEMAND_REBUILD_SECONDS:
+            return self.rebuild(cursor)
+        cursor.execute("SELECT MIN(seq) AS first_seq, COALESCE(MAX(seq), 0) AS last_seq FROM Change_Log")
+        bounds = cursor.fetchone()
+        if (bounds['first_seq'] is not None and self.cursor < bounds['first_seq'] - 1) \
+                or self.cursor > bounds['last_seq']:
+            return self.rebuild(cursor)
+        until = changes.visible_seq(cursor, self.cursor)
+        cursor.execute("""SELECT DISTINCT entity_id, op FROM Change_Log WHERE seq > %s AND seq <= %s
+                          AND entity = 'work_request'""", (self.cursor, until))
+        changed = cursor.fetchall()
+        if any(row['op'] == 'refresh' for row in changed):
+            return self.rebuild(cursor)
+        request_ids = sorted({row['entity_id'] for row in changed if row['entity_id'] is not None})
+        for start in range(0, len(request_ids), LOAD_BATCH_SIZE):
+            rows = self._load_requests(cursor, request_ids[start:start + LOAD_BATCH_SIZE])
+            if rows:
+                with self._lock:
+                    self._upsert(rows)
+        with self._lock:
+            self.cursor = until
+            self._counters['refreshes'] += 1
+            self._counters['requests_reloaded'] += len(request_ids)
+        return len(request_ids)
+
+    def ensure_fresh(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self.cursor = None
+        elif time.monotonic() - self._refreshed < DEMAND_REFRESH_SECONDS:
+            return
+        connection = create_connection()
+        if connection is None:
+            raise RuntimeError("Database connection failed")
+        cursor = connection.cursor()
+        try:
+            self.refresh(cursor)
+            self._refreshed = time.monotonic()
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _aggregate(self, pair, hour, pairs):
+        """pairs x 168 matrix of request counts, legacy rows spread over their weekday."""
+        matrix = np.zeros((pairs, HOURS_PER_WEEK), np.float32)
+        hour = hour.astype(np.int64)
+        exact = hour >= 0
+        np.add.at(matrix, (pair[exact], hour[exact]), 1.0)
+        legacy = np.flatnonzero(~exact)
+        if len(legacy):
+            # Each legacy row adds 1/24 to the 24 hours of its weekday
+            first_hour = (-1 - hour[legacy]) * 24
+            spread = np.repeat(first_hour, 24) + np.tile(np.arange(24), len(legacy))
+            np.add.at(matrix, (np.repeat(pair[legacy], 24), spread), 1.0 / 24)
+        return matrix
+
+    def snapshot(self):
+        """Matrices and forecast for the current window, recomputed only after a change.
+
+        Rows are the (skill, pincode) pairs that have requests, in skill then
+        pincode order; a dense skills x pincodes grid would be mostly zeros.
+        """
+        with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            requests = self._requests
+            skills, pincodes = len(self._skills), len(self._pincodes)
+            skill_ids = {index: skill_id for skill_id, index in self._skills.items()}
+            pincode_names = {index: pincode for pincode, index in self._pincodes.items()}
+            skill_names = dict(self._skill_names)
+        started = time.perf_counter()
+        keys, pair = np.unique(requests['skill'].astype(np.int64) * max(pincodes, 1) + requests['pincode'],
+                               return_inverse=True)
+        pair = pair.reshape(-1)
+        pair_skill, pair_pincode = keys // max(pincodes, 1), keys % max(pincodes, 1)
+        demand = self._aggregate(pair, requests['hour'], len(keys))
+        completed = requests['completed']
+        fulfilled = self._aggregate(pair[completed], requests['hour'][completed], len(keys))
+
+        # Level: exponentially smoothed weekly totals per skill and pincode over the complete weeks
+        current_week = _week(date.today())
+        first_week = current_week - self.window_weeks
+        weekly = np.zeros((self.window_weeks, len(keys)), np.float32)
+        complete = (requests['week'] >= first_week) & (requests['week'] < current_week)
+        np.add.at(weekly, (requests['week'][complete] - first_week, pair[complete]), 1.0)
+        decay = (1 - DEMAND_SMOOTHING) ** np.arange(self.window_weeks - 1, -1, -1, dtype=np.float32)
+        level = np.tensordot(decay / decay.sum(), weekly, axes=1)
+        # Season: each skill's share of its week per hour, shrunk towards the all-skill profile
+        by_skill_hour = np.zeros((max(skills, 1), HOURS_PER_WEEK), np.float32)
+        np.add.at(by_skill_hour, pair_skill, demand)
+        overall = by_skill_hour.sum(axis=0)
+        overall_profile = overall / overall.sum() if overall.sum() else np.full(HOURS_PER_WEEK, 1.0 / HOURS_PER_WEEK)
+        profile = ((by_skill_hour + PROFILE_PRIOR * overall_profile)
+                   / (by_skill_hour.sum(axis=1, keepdims=True) + PROFILE_PRIOR))
+        forecast = level[:, None] * profile[pair_skill]
+
+        snapshot = {'demand': demand, 'fulfilled': fulfilled, 'forecast': forecast.astype(np.float32),
+                    'pair_skill': pair_skill, 'pair_pincode': pair_pincode,
+                    'skill_ids': skill_ids, 'pincodes': pincode_names, 'skill_names': skill_names,
+                    'requests': len(requests['request_id']), 'window_weeks': self.window_weeks,
+                    'generated_at': datetime.now().isoformat(timespec='seconds')}
+        with self._lock:
+            if self._requests is requests:
+                self._snapshot = snapshot
+            self._counters['snapshots'] += 1
+            self._counters['last_snapshot_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return snapshot
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({'requests': len(self._requests['request_id']), 'skills': len(self._skills),
+                          'pincodes': len(self._pincodes), 'cursor': self.cursor})
+        return stats
+
+
+model = DemandModel()
+
+
+def _week_grid(hours):
+    """168 hourly values as 7 rows (Monday first) of 24, rounded for JSON."""
+    return np.round(hours.astype(np.float64).reshape(7, 24), 2).tolist()
+
+
+def demand_report(snapshot, skill_type_id=None, pincode=None, top=DEFAULT_TOP):
+    """Hour-of-week heatmaps for the selected skill/pincode and the areas with the most unmet demand."""
+    try:
+        top = max(1, min(int(top), MAX_TOP))
+    except (TypeError, ValueError):
+        raise DemandError("top must be a number")
+    skill_index = {skill_id: index for index, skill_id in snapshot['skill_ids'].items()}
+    pincode_index = {name: index for index, name in snapshot['pincodes'].items()}
+    pair_skill, pair_pincode = snapshot['pair_skill'], snapshot['pair_pincode']
+    # A skill or pincode without requests in the window selects nothing, so every total is zero
+    selected = np.ones(len(pair_skill), bool)
+    if skill_type_id is not None:
+        selected &= pair_skill == skill_index.get(skill_type_id, -1)
+    if pincode is not None:
+        selected &= pair_pincode == pincode_index.get(pincode, -1)
+    demand, fulfilled, forecast = (snapshot[name][selected] for name in ('demand', 'fulfilled', 'forecast'))
+    pair_skill, pair_pincode = pair_skill[selected], pair_pincode[selected]
+
+    hours_demand = demand.sum(axis=0)
+    hours_fulfilled = fulfilled.sum(axis=0)
+    hours_forecast = forecast.sum(axis=0)
+
+    # Areas ranked by requests that were not completed
+    totals = demand.sum(axis=1)
+    done = fulfilled.sum(axis=1)
+    expected = forecast.sum(axis=1)
+    unmet = totals - done
+    areas = []
+    for row in np.argsort(-unmet, kind='stable')[:top]:
+        if totals[row] <= 0:
+            break
+        skill_id = snapshot['skill_ids'][int(pair_skill[row])]
+        areas.append({'skill_type_id': skill_id, 'skill_name': snapshot['skill_names'].get(skill_id),
+                      'pincode': snapshot['pincodes'][int(pair_pincode[row])],
+                      'requests': round(float(totals[row]), 2), 'completed': round(float(done[row]), 2),
+                      'unmet': round(float(unmet[row]), 2),
+                      'fulfilment_rate': round(float(done[row] / totals[row]), 3),
+                      'forecast_next_week': round(float(expected[row]), 2)})
+    return {'window_weeks': snapshot['window_weeks'], 'generated_at': snapshot['generated_at'],
+            'requests': snapshot['requests'], 'skill_type_id': skill_type_id, 'pincode': pincode,
+            'hour_of_week': {'demand': _week_grid(hours_demand), 'completed': _week_grid(hours_fulfilled),
+                             'forecast_next_week': _week_grid(hours_forecast)},
+            'areas': areas}
@@ -0,0 +1,169 @@
+import csv
+import io
+from datetime import date
+
+from archive import feedback_table, wants_history, work_requests_table
+from db import create_connection, server_side_cursor
+
+# Streaming CSV exports for admin reporting. Rows are read from a server-side
+# cursor in fixed-size chunks and written out as they arrive, so memory use
+# does not grow with the size of the export.
+
+CHUNK_SIZE = 1000
+
+WORK_REQUEST_COLUMNS = ['request_id', 'status', 'request_date', 'completed_date', 'amount', 'skill_name',
+                        'user_id', 'user_first_name', 'user_last_name', 'worker_id', 'worker_first_name',
+                        'worker_last_name', 'city', 'pincode', 'area', 'description']
+FEEDBACK_COLUMNS = ['feedback_id', 'request_id', 'rating', 'comments', 'skill_name', 'completed_date',
+                    'worker_id', 'worker_first_name', 'worker_last_name', 'user_first_name', 'user_last_name']
+WORKER_COLUMNS = ['worker_id', 'login_id', 'username', 'first_name', 'last_name', 'available_status',
+                  'experience_years', 'city', 'pincode', 'area', 'street_name', 'phone_number1', 'phone_number2']
+
+WORK_REQUEST_STATUSES = ('Pending', 'Accepted', 'Completed', 'Cancelled', 'Expired')
+DATE_FIELDS = ('request_date', 'completed_date')
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parse_date(value, name):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"{name} must be a date in YYYY-MM-DD format")
+
+
+def _date_range(args, column, conditions, params):
+    start = parse_date(args.get('from'), 'from')
+    end = parse_date(args.get('to'), 'to')
+    if start:
+        conditions.append(f"{column} >= %s")
+        params.append(start)
+    if end:
+        conditions.append(f"{column} <= %s")
+        params.append(end)
+
+
+def _where(conditions):
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+
+def work_requests_query(args):
+    """Build the export query for work requests.
+
+    Filters: status, from/to on `date_field` (request_date or completed_date),
+    include_history to add archived requests.
+    With a status filter the (status, <date>) index covers both the filter and
+    the ORDER BY, so MySQL streams rows without a filesort.
+    """
+    date_field = args.get('date_field', 'request_date')
+    if date_field not in DATE_FIELDS:
+        raise ExportError(f"date_field must be one of {', '.join(DATE_FIELDS)}")
+    conditions, params = ["u.deleted_at IS NULL", "sw.deleted_at IS NULL"], []
+    status = args.get('status')
+    if status:
+        if status not in WORK_REQUEST_STATUSES:
+            raise ExportError(f"status must be one of {', '.join(WORK_REQUEST_STATUSES)}")
+        conditions.append("wr.status = %s")
+        params.append(status)
+    _date_range(args, f"wr.{date_field}", conditions, params)
+    query = f"""SELECT wr.request_id, wr.status, wr.request_date, wr.completed_date, wr.amount, st.skill_name,
+                wr.user_id, u.first_name AS user_first_name, u.last_name AS user_last_name,
+                wr.worker_id, sw.first_name AS worker_first_name, sw.last_name AS worker_last_name,
+                wr.city, wr.pincode, wr.area, wr.description
+                FROM {work_requests_table(wants_history(args))} wr
+                LEFT JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+                LEFT JOIN User u ON wr.user_id = u.user_id
+                LEFT JOIN Skill_Worker sw ON wr.worker_id = sw.worker_id
+                {_where(conditions)}
+                ORDER BY wr.{date_field}, wr.request_id"""
+    return query, params
+
+
+def feedback_query(args):
+    """Feedback joined to its request. Filters: from/to on completed_date, min_rating, include_history."""
+    conditions, params = ["u.deleted_at IS NULL", "sw.deleted_at IS NULL"], []
+    _date_range(args, "wr.completed_date", conditions, params)
+    min_rating = args.get('min_rating')
+    if min_rating:
+        if not str(min_rating).isdigit():
+            raise ExportError("min_rating must be a whole number")
+        conditions.append("f.rating >= %s")
+        params.append(int(min_rating))
+    query = f"""SELECT f.feedback_id, f.request_id, f.rating, f.comments, st.skill_name, wr.completed_date,
+                wr.worker_id, sw.first_name AS worker_first_name, sw.last_name AS worker_last_name,
+                u.first_name AS user_first_name, u.last_name AS user_last_name
+                FROM {feedback_table(wants_history(args))} f
+                JOIN {work_requests_table(wants_history(args))} wr ON f.request_id = wr.request_id
+                LEFT JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+                LEFT JOIN Skill_Worker sw ON wr.worker_id = sw.worker_id
+                LEFT JOIN User u ON wr.user_id = u.user_id
+                {_where(conditions)}
+                ORDER BY f.feedback_id"""
+    return query, params
+
+
+def workers_query(args):
+    """Workers with their username. Filters: status (available_status), city."""
+    conditions, params = ["sw.deleted_at IS NULL"], []
+    if args.get('status'):
+        conditions.append("sw.available_status = %s")
+        params.append(args.get('status'))
+    if args.get('city'):
+        conditions.append("sw.city = %s")
+        params.append(args.get('city'))
+    query = f"""SELECT sw.worker_id, sw.login_id, l.username, sw.first_name, sw.last_name, sw.available_status,
+                sw.experience_years, sw.city, sw.pincode, sw.area, sw.street_name,
+                sw.phone_number1, sw.phone_number2
+                FROM Skill_Worker sw
+                JOIN Login l ON sw.login_id = l.login_id
+                {_where(conditions)}
+                ORDER BY sw.worker_id"""
+    return query, params
+
+
+def _encode(rows, columns, writer, buffer):
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return data
+
+
+def stream_csv(query, params, columns, chunk_size=CHUNK_SIZE):
+    """Run `query` on a server-side cursor and return a generator of CSV text chunks.
+
+    At most `chunk_size` rows are held at a time. Returns None if the database is
+    unreachable; the connection is closed when the generator finishes or the
+    client disconnects.
+    """
+    connection = create_connection()
+    if connection is None:
+        return None
+    try:
+        cursor = server_side_cursor(connection)
+        cursor.execute(query, tuple(params))
+    except Exception:
+        connection.close()
+        raise
+
+    def generate():
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield _encode([], columns, writer, buffer)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield _encode(rows, columns, writer, buffer)
+        finally:
+            # Closing the connection also abandons any unread rows of an interrupted export
+            connection.close()
+
+    return generate()
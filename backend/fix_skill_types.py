@@ -31,11 +31,13 @@ def check_and_fix_skill_types():
         # Get current skill names
         current_skill_names = [row['skill_name'] for row in results]
         
-        # Check for missing skill types
-        for skill_name in required_skill_types:
-            if skill_name not in current_skill_names:
-                print(f"Adding missing skill type: {skill_name}")
-                cursor.execute("INSERT INTO Skill_Type (skill_name) VALUES (%s)", (skill_name,))
+        # Check for missing skill types and insert them in one statement
+        missing_skill_types = [name for name in required_skill_types if name not in current_skill_names]
+        for skill_name in missing_skill_types:
+            print(f"Adding missing skill type: {skill_name}")
+        if missing_skill_types:
+            cursor.executemany("INSERT INTO Skill_Type (skill_name) VALUES (%s)",
+                               [(skill_name,) for skill_name in missing_skill_types])
         
         # Check for incorrect skill types that need to be corrected
         # For example, if "Painer" exists, we should correct it to "Painter"
@@ -0,0 +1,27 @@
+import gc
+import os
+
+# gunicorn settings (gunicorn reads ./gunicorn.conf.py by default).
+#
+# The app is imported once in the master and the workers are forked from it, so
+# the modules, blueprints and numpy pages are shared copy-on-write instead of
+# being loaded by every worker. With preloading the master also creates the
+# tables once (INIT_DB=eager) rather than each worker on its first request.
+# GUNICORN_PRELOAD=0 goes back to importing the app in each worker.
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+if preload_app:
+    os.environ.setdefault('INIT_DB', 'eager')
+
+
+def pre_fork(server, worker):
+    # The collector writes to the header of every object it scans, which would
+    # copy the shared pages into each worker. Move everything the master has
+    # built so far out of its reach; objects created after the fork are still collected.
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,147 @@
+import hashlib
+import itertools
+import os
+
+from db import create_connection
+
+# Idempotency-Key support for write endpoints. The first request with a key
+# claims a row in Idempotency_Key, runs, and stores its response there; a retry
+# with the same key gets the stored response back without running the write
+# again. Rows hold only hashes, the status code and the response body, and
+# expire after IDEMPOTENCY_TTL_SECONDS.
+#
+# The claim and the stored response are separate transactions from the write
+# itself, so the write also marks its claim Committed in its own transaction
+# (commit_claim). A claim still Processing when its lock runs out never
+# committed and can be taken over; a Committed claim whose response was never
+# stored (the process died in between) is kept until it expires, so the write
+# is not run twice. A takeover while the first attempt is still running makes
+# that attempt's commit_claim fail, which rolls its write back.
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 86400))
+# A claim whose write never committed (the process died mid-request) is released after this long
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', 60))
+MAX_KEY_LENGTH = 255
+# Every Nth claim also deletes a batch of expired keys
+EXPIRE_EVERY_CLAIMS = 100
+
+# claim() outcomes
+CLAIMED = 'claimed'
+COMMITTED = 'committed'
+IN_PROGRESS = 'in_progress'
+MISMATCH = 'mismatch'
+REPLAY = 'replay'
+
+_claims = itertools.count(1)
+
+
+class IdempotencyError(ValueError):
+    pass
+
+
+class ClaimLost(RuntimeError):
+    """The claim was taken over by a retry while this request was still running."""
+
+
+def key_hash(key, method, path):
+    """Keys are scoped to the endpoint they were first used on."""
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyError(f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+    return hashlib.sha256(f"{method} {path} {key}".encode()).hexdigest()
+
+
+def body_hash(body):
+    return hashlib.sha256(body or b'').hexdigest()
+
+
+def claim(key, request_hash):
+    """Reserve `key` for this request.
+
+    Returns (outcome, row): CLAIMED when the caller should run the request,
+    REPLAY with the stored response, IN_PROGRESS while the first request is
+    still running, COMMITTED when it wrote but its response was lost, or
+    MISMATCH when the key was used with a different body.
+    """
+    connection = create_connection(readonly=False)
+    if connection is None:
+        raise RuntimeError("Database connection failed")
+    cursor = connection.cursor()
+    try:
+        # Expired responses and abandoned claims free the key for a new attempt
+        cursor.execute("""DELETE FROM Idempotency_Key WHERE idempotency_key = %s
+                          AND (expires_at <= NOW() OR (status = 'Processing'
+                               AND created_at < NOW() - INTERVAL %s SECOND))""", (key, IDEMPOTENCY_LOCK_SECONDS))
+        if next(_claims) % EXPIRE_EVERY_CLAIMS == 0:
+            expire_keys(cursor)
+        cursor.execute("""INSERT IGNORE INTO Idempotency_Key (idempotency_key, request_hash, status, created_at, expires_at)
+                          VALUES (%s, %s, 'Processing', NOW(), NOW() + INTERVAL %s SECOND)""",
+                       (key, request_hash, IDEMPOTENCY_TTL_SECONDS))
+        claimed = cursor.rowcount == 1
+        connection.commit()
+        if claimed:
+            return CLAIMED, None
+        cursor.execute("SELECT * FROM Idempotency_Key WHERE idempotency_key = %s", (key,))
+        row = cursor.fetchone()
+        if row is None:
+            # Released between our INSERT and SELECT; the client can simply retry
+            return IN_PROGRESS, None
+        if row['request_hash'] != request_hash:
+            return MISMATCH, row
+        if row['status'] == 'Processing':
+            return IN_PROGRESS, row
+        if row['status'] == 'Committed':
+            return COMMITTED, row
+        return REPLAY, row
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def commit_claim(cursor, key):
+    """Mark `key` Committed in the caller's write transaction, just before it commits.
+
+    Raises ClaimLost when the claim is no longer this request's Processing row.
+    """
+    cursor.execute("""UPDATE Idempotency_Key SET status = 'Committed'
+                      WHERE idempotency_key = %s AND status = 'Processing'""", (key,))
+    if cursor.rowcount != 1:
+        raise ClaimLost('The Idempotency-Key claim was taken over by a retry')
+
+
+def complete(key, status_code, body, content_type):
+    """Store the response for a claimed key."""
+    connection = create_connection(readonly=False)
+    if connection is None:
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""UPDATE Idempotency_Key SET status = 'Done', response_status = %s, response_body = %s,
+                          content_type = %s WHERE idempotency_key = %s""",
+                       (status_code, body, content_type, key))
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def release(key):
+    """Drop a claim so the request can be retried (used when it failed with a server error).
+
+    A Committed claim is kept: the write went through even if the response did not.
+    """
+    connection = create_connection(readonly=False)
+    if connection is None:
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DELETE FROM Idempotency_Key WHERE idempotency_key = %s AND status = 'Processing'", (key,))
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def expire_keys(cursor, batch_size=1000):
+    """Delete one batch of expired keys. Returns the number removed."""
+    cursor.execute("DELETE FROM Idempotency_Key WHERE expires_at <= NOW() LIMIT %s", (batch_size,))
+    return cursor.rowcount
@@ -1,4 +1,5 @@
 from db import create_connection
+from bulk import insert_missing_skill_types
 
 def init_skill_types():
     connection = create_connection()
@@ -21,22 +22,19 @@ def init_skill_types():
     ]
     
     try:
+        # Insert all missing skill types in one statement
+        added = insert_missing_skill_types(cursor, skill_types)
         for skill_name in skill_types:
-            # Check if skill type already exists
-            cursor.execute("SELECT * FROM Skill_Type WHERE skill_name = %s", (skill_name,))
-            if not cursor.fetchone():
-                # Insert new skill type
-                cursor.execute("INSERT INTO Skill_Type (skill_name) VALUES (%s)", (skill_name,))
+            if skill_name in added:
                 print(f"Added skill type: {skill_name}")
             else:
                 print(f"Skill type already exists: {skill_name}")
         
         # Remove any incorrect skill types
         incorrect_skill_types = ["Painer", "Mesan"]
-        for skill_name in incorrect_skill_types:
-            cursor.execute("DELETE FROM Skill_Type WHERE skill_name = %s", (skill_name,))
-            if cursor.rowcount > 0:
-                print(f"Removed incorrect skill type: {skill_name}")
+        cursor.execute("DELETE FROM Skill_Type WHERE skill_name IN (%s, %s)", tuple(incorrect_skill_types))
+        if cursor.rowcount > 0:
+            print(f"Removed {cursor.rowcount} incorrect skill type(s)")
         
         connection.commit()
         print("All skill types initialized successfully!")
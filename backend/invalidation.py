@@ -0,0 +1,212 @@
+import atexit
+import json
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+
+from db import create_connection
+
+# Cache invalidation across the processes serving the app. Each process binds
+# a UNIX datagram socket in INVALIDATION_SOCKET_DIR; an invalidation is sent to
+# every other socket there, and each receiver drops the keys from its own copy
+# of the cache, typically within a millisecond. Sockets of dead processes are
+# removed by the first sender that finds them refusing messages.
+#
+# With CACHE_DB_GENERATION=1 every invalidation also bumps a per-cache counter
+# in Cache_Generation, and every process polls it; a changed counter clears the
+# whole local cache. This covers app servers on other hosts.
+
+INVALIDATION_SOCKET_DIR = os.getenv('INVALIDATION_SOCKET_DIR',
+                                    os.path.join(tempfile.gettempdir(), 'skillhive-cache-bus'))
+CACHE_DB_GENERATION = os.getenv('CACHE_DB_GENERATION', '').lower() in ('1', 'true', 'yes')
+GENERATION_POLL_SECONDS = float(os.getenv('CACHE_GENERATION_POLL_SECONDS', 1))
+
+SOCKET_SUFFIX = '.sock'
+MAX_MESSAGE_BYTES = 65536
+
+
+class InvalidationBus:
+    def __init__(self, socket_dir=INVALIDATION_SOCKET_DIR, use_db=CACHE_DB_GENERATION,
+                 poll_seconds=GENERATION_POLL_SECONDS):
+        self.socket_dir = socket_dir
+        self.use_db = use_db
+        self.poll_seconds = poll_seconds
+        self.enabled = hasattr(socket, 'AF_UNIX')
+        self._caches = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._receiver = None
+        self._sender = None
+        self._path = None
+        self._bumps = queue.Queue()
+        self._generations = {}
+        self._counters = {'sent': 0, 'received': 0, 'dropped': 0, 'generation_bumps': 0, 'generation_clears': 0}
+
+    def register(self, cache):
+        """Forward `cache` invalidations to peers and clear it on generation gaps.
+
+        Shared backends are skipped: their deletes are already seen by every
+        process, and a generation clear would empty them for every host.
+        """
+        if not cache.per_process:
+            return
+        self._caches[cache.name] = cache
+        cache.listeners.append(self.publish)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats['caches'] = sorted(self._caches)
+        stats['peers'] = len(self._peers()) if self._path else None
+        stats['db_generation'] = self.use_db
+        return stats
+
+    # Threads and sockets do not survive fork, so everything is (re)created per pid
+    def ensure_started(self):
+        if self._pid == os.getpid() or not self._caches:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._sender = None
+            if self.enabled:
+                try:
+                    self._bind()
+                    atexit.register(self.close)
+                except OSError as e:
+                    # Without a socket this process still sends; peers' caches stay correct
+                    print(f"Cache invalidation bus could not bind in {self.socket_dir}: {e}")
+            if self.use_db:
+                self._bumps = queue.Queue()
+                threading.Thread(target=self._poll_generations, name='cache-generations', daemon=True).start()
+
+    def _bind(self):
+        os.makedirs(self.socket_dir, exist_ok=True)
+        path = os.path.join(self.socket_dir, f"{os.getpid()}{SOCKET_SUFFIX}")
+        if os.path.exists(path):
+            os.unlink(path)
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(path)
+        self._receiver, self._path = receiver, path
+        threading.Thread(target=self._receive, args=(receiver,), name='cache-bus', daemon=True).start()
+
+    def close(self):
+        if self._path and self._pid == os.getpid():
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass
+            self._path = None
+
+    def _peers(self):
+        try:
+            names = os.listdir(self.socket_dir)
+        except FileNotFoundError:
+            return []
+        own = f"{os.getpid()}{SOCKET_SUFFIX}"
+        return [os.path.join(self.socket_dir, name) for name in names
+                if name.endswith(SOCKET_SUFFIX) and name != own]
+
+    def publish(self, cache_name, keys):
+        """Listener for Cache: keys is a list, or None when the cache was cleared."""
+        if self.enabled:
+            self._send(json.dumps({'cache': cache_name, 'keys': keys, 'pid': os.getpid()}).encode())
+        if self.use_db:
+            self._bumps.put(cache_name)
+
+    def _send(self, message):
+        if len(message) > MAX_MESSAGE_BYTES:
+            message = json.dumps({'cache': json.loads(message)['cache'], 'keys': None,
+                                  'pid': os.getpid()}).encode()
+        with self._lock:
+            if self._sender is None:
+                self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                # A peer with a full buffer must not block the request that invalidated
+                self._sender.setblocking(False)
+            sender = self._sender
+        for path in self._peers():
+            try:
+                sender.sendto(message, path)
+                self._count('sent')
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Nobody listening: the process that bound it has exited
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError as e:
+                # Dropped messages fall back to the cache TTL
+                self._count('dropped')
+                print(f"Cache invalidation to {path} dropped: {e}")
+
+    def _receive(self, receiver):
+        while True:
+            try:
+                data = receiver.recv(MAX_MESSAGE_BYTES)
+                message = json.loads(data)
+            except OSError:
+                return
+            except ValueError:
+                continue
+            cache = self._caches.get(message.get('cache'))
+            if cache is None:
+                continue
+            self._count('received')
+            if message.get('keys') is None:
+                cache.clear(broadcast=False)
+            else:
+                cache.invalidate(*message['keys'], broadcast=False)
+
+    def _poll_generations(self):
+        while True:
+            try:
+                self._sync_generations()
+            except Exception as e:
+                print(f"Cache generation poll failed: {e}")
+            time.sleep(self.poll_seconds)
+
+    def _sync_generations(self):
+        bumps = set()
+        while not self._bumps.empty():
+            bumps.add(self._bumps.get_nowait())
+        connection = create_connection()
+        if connection is None:
+            for name in bumps:
+                self._bumps.put(name)
+            return
+        cursor = connection.cursor()
+        try:
+            for name in bumps:
+                cursor.execute("""UPDATE Cache_Generation SET generation = generation + 1, updated_at = NOW()
+                                  WHERE cache_name = %s""", (name,))
+                if cursor.rowcount == 0:
+                    cursor.execute("""INSERT INTO Cache_Generation (cache_name, generation, updated_at)
+                                      VALUES (%s, 1, NOW())""", (name,))
+                self._count('generation_bumps')
+            connection.commit()
+            cursor.execute("SELECT cache_name, generation FROM Cache_Generation")
+            current = {row['cache_name']: row['generation'] for row in cursor.fetchall()}
+            first_poll = not self._generations
+            for name, cache in self._caches.items():
+                # A cache nobody has invalidated yet has no row: generation 0
+                generation = current.get(name, 0)
+                seen = self._generations.get(name, 0)
+                self._generations[name] = generation
+                # Our own bump is already applied locally; anything beyond it came from another host
+                if not first_poll and generation - seen > (1 if name in bumps else 0):
+                    cache.clear(broadcast=False)
+                    self._count('generation_clears')
+        finally:
+            cursor.close()
+            connection.close()
+
+
+bus = InvalidationBus()
@@ -0,0 +1,192 @@
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+
+# Local stand-in for a Redis-compatible cache server, for development and for
+# exercising CACHE_BACKEND=kv without installing Redis. Speaks enough RESP for
+# cache.KVClient: PING, GET, SET (EX/PX), DEL, EXISTS, DBSIZE, SCAN (MATCH/COUNT),
+# FLUSHDB, FLUSHALL.
+#
+#   python kv_server.py --port 6379
+
+
+class Store:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key):
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+
+    def delete(self, keys):
+        deleted = 0
+        with self._lock:
+            for key in keys:
+                if self._live(key) is not None:
+                    del self._data[key]
+                    deleted += 1
+        return deleted
+
+    def exists(self, keys):
+        with self._lock:
+            return sum(1 for key in keys if self._live(key) is not None)
+
+    def size(self):
+        with self._lock:
+            return sum(1 for key in list(self._data) if self._live(key) is not None)
+
+    def scan(self, pattern=None):
+        # Everything in one page: COUNT is only a hint in Redis, and a single page
+        # cannot skip keys deleted between calls
+        with self._lock:
+            keys = [key for key in list(self._data) if self._live(key) is not None]
+        if pattern is not None:
+            keys = [key for key in keys if fnmatch.fnmatchcase(key.decode('latin-1'), pattern.decode('latin-1'))]
+        return keys
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CommandError(Exception):
+    pass
+
+
+def _encode(reply):
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, CommandError):
+        return f"-ERR {reply}\r\n".encode()
+    if isinstance(reply, int):
+        return f":{reply}\r\n".encode()
+    if isinstance(reply, str):
+        return f"+{reply}\r\n".encode()
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b''.join(_encode(item) for item in reply)
+    return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+
+def _set(store, args):
+    if len(args) < 2:
+        raise CommandError("wrong number of arguments for 'set' command")
+    key, value, options = args[0], args[1], args[2:]
+    ttl = None
+    while options:
+        option = options[0].upper()
+        if option in (b'EX', b'PX') and len(options) >= 2:
+            amount = int(options[1])
+            ttl = amount if option == b'EX' else amount / 1000
+            options = options[2:]
+        else:
+            raise CommandError("syntax error")
+    store.set(key, value, ttl)
+    return 'OK'
+
+
+def _scan(store, args):
+    int(args[0])
+    options, pattern = args[1:], None
+    while options:
+        option = options[0].upper()
+        if option == b'MATCH' and len(options) >= 2:
+            pattern = options[1]
+        elif option == b'COUNT' and len(options) >= 2:
+            int(options[1])
+        else:
+            raise CommandError("syntax error")
+        options = options[2:]
+    return [b'0', store.scan(pattern)]
+
+
+COMMANDS = {
+    b'PING': lambda store, args: args[0] if args else 'PONG',
+    b'GET': lambda store, args: store.get(args[0]),
+    b'SET': _set,
+    b'DEL': lambda store, args: store.delete(args),
+    b'EXISTS': lambda store, args: store.exists(args),
+    b'DBSIZE': lambda store, args: store.size(),
+    b'SCAN': _scan,
+    b'FLUSHDB': lambda store, args: store.clear() or 'OK',
+    b'FLUSHALL': lambda store, args: store.clear() or 'OK',
+}
+
+
+class RESPHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command, e.g. typed into telnet
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            try:
+                command = self._read_command()
+            except (ValueError, ConnectionError):
+                return
+            if command is None:
+                return
+            if not command:
+                continue
+            name, args = command[0].upper(), command[1:]
+            handler = COMMANDS.get(name)
+            try:
+                if handler is None:
+                    raise CommandError(f"unknown command '{name.decode(errors='replace')}'")
+                reply = handler(self.server.store, args)
+            except CommandError as e:
+                reply = e
+            except (IndexError, ValueError):
+                reply = CommandError(f"invalid arguments for '{name.decode(errors='replace')}' command")
+            self.wfile.write(_encode(reply))
+
+
+class KVServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, RESPHandler)
+        self.store = Store()
+
+
+def serve_in_background(host='127.0.0.1', port=0):
+    """Start a server on a daemon thread; returns it (address in server.server_address)."""
+    server = KVServer((host, port))
+    threading.Thread(target=server.serve_forever, name='kv-server', daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Redis-compatible cache server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    options = parser.parse_args()
+    with KVServer((options.host, options.port)) as server:
+        print(f"KV server listening on {options.host}:{options.port}")
+        server.serve_forever()
@@ -0,0 +1,160 @@
+import os
+from datetime import date, timedelta
+
+import archive
+import changes
+import idempotency
+import notifications
+import ratings
+import reports
+from db import create_connection
+
+# Periodic maintenance jobs, registered with the in-process scheduler:
+# expiring Pending requests nobody took, archival, the nightly rating
+# rebuild, notification cleanup and the expiry of idempotency keys and report
+# jobs. Each job opens its own connection and works in small batches.
+
+STALE_REQUEST_DAYS = int(os.getenv('STALE_REQUEST_DAYS', 14))
+STALE_REQUEST_BATCH_SIZE = int(os.getenv('STALE_REQUEST_BATCH_SIZE', 200))
+STALE_REQUEST_CHECK_SECONDS = int(os.getenv('STALE_REQUEST_CHECK_SECONDS', 3600))
+NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))
+MAINTENANCE_BATCH_SIZE = int(os.getenv('MAINTENANCE_BATCH_SIZE', 1000))
+ARCHIVE_CRON = os.getenv('ARCHIVE_CRON', '30 3 * * *')
+RATINGS_REFRESH_CRON = os.getenv('RATINGS_REFRESH_CRON', '0 4 * * *')
+NOTIFICATION_CLEANUP_CRON = os.getenv('NOTIFICATION_CLEANUP_CRON', '15 4 * * *')
+
+
+def _connect():
+    connection = create_connection(readonly=False)
+    if connection is None:
+        raise RuntimeError("Database connection failed")
+    return connection
+
+
+def expire_batch(connection, cutoff, days, batch_size=STALE_REQUEST_BATCH_SIZE):
+    """Expire one batch of untaken Pending requests made before `cutoff` and notify their users.
+
+    Returns the number of requests expired.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""SELECT request_id FROM Work_Request
+                          WHERE status = 'Pending' AND worker_id IS NULL AND request_date < %s
+                          ORDER BY request_id LIMIT %s""", (cutoff, batch_size))
+        ids = [row['request_id'] for row in cursor.fetchall()]
+        if not ids:
+            return 0
+        placeholders = ','.join(['%s'] * len(ids))
+        # Re-checked in the UPDATE so a request accepted meanwhile is left alone
+        cursor.execute(f"""UPDATE Work_Request SET status = 'Expired'
+                           WHERE request_id IN ({placeholders}) AND status = 'Pending' AND worker_id IS NULL""",
+                       tuple(ids))
+        cursor.execute(f"""SELECT request_id FROM Work_Request
+                           WHERE request_id IN ({placeholders}) AND status = 'Expired'""", tuple(ids))
+        expired = cursor.fetchall()
+        if not expired:
+            connection.commit()
+            return 0
+        expired_ids = tuple(row['request_id'] for row in expired)
+        placeholders = ','.join(['%s'] * len(expired_ids))
+        cursor.execute("SELECT COALESCE(MAX(notification_id), 0) AS last_id FROM Notification")
+        last_notification = cursor.fetchone()['last_id']
+        notifications.insert_many(cursor, notifications.REQUEST_EXPIRED,
+                                  [(row['request_id'], days) for row in expired])
+        # One INSERT ... SELECT per entity instead of a change row per request
+        cursor.execute(f"""INSERT INTO Change_Log (entity, entity_id, op, user_id, worker_id, skill_type_id, created_at)
+                           SELECT 'work_request', request_id, %s, user_id, worker_id, skill_type_id, NOW()
+                           FROM Work_Request WHERE request_id IN ({placeholders})""",
+                       (changes.UPDATE, *expired_ids))
+        cursor.execute(f"""INSERT INTO Change_Log (entity, entity_id, op, user_id, worker_id, skill_type_id, created_at)
+                           SELECT 'notification', n.notification_id, %s, wr.user_id, wr.worker_id,
+                                  wr.skill_type_id, NOW()
+                           FROM Notification n JOIN Work_Request wr ON n.request_id = wr.request_id
+                           WHERE n.notification_id > %s AND n.request_id IN ({placeholders})""",
+                       (changes.INSERT, last_notification, *expired_ids))
+        connection.commit()
+        return len(expired_ids)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def expire_stale_requests(days=STALE_REQUEST_DAYS, batch_size=STALE_REQUEST_BATCH_SIZE):
+    """Expire every Pending request nobody accepted within `days`, one transaction per batch."""
+    cutoff = date.today() - timedelta(days=days)
+    connection = _connect()
+    expired = 0
+    try:
+        while True:
+            count = expire_batch(connection, cutoff, days, batch_size)
+            expired += count
+            if count < batch_size:
+                return {'expired': expired}
+    finally:
+        connection.close()
+
+
+def cleanup_notifications(days=NOTIFICATION_RETENTION_DAYS, batch_size=MAINTENANCE_BATCH_SIZE):
+    """Delete read notifications older than `days` in batches."""
+    cutoff = date.today() - timedelta(days=days)
+    connection = _connect()
+    cursor = connection.cursor()
+    removed = 0
+    try:
+        while True:
+            cursor.execute("DELETE FROM Notification WHERE status = 'Read' AND date < %s LIMIT %s",
+                           (cutoff, batch_size))
+            deleted = cursor.rowcount
+            connection.commit()
+            removed += deleted
+            if deleted < batch_size:
+                return {'deleted': removed}
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def refresh_ratings():
+    connection = _connect()
+    cursor = connection.cursor()
+    try:
+        rated = ratings.refresh_worker_ratings(cursor)
+        connection.commit()
+        return {'rated_workers': rated}
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def archive_closed():
+    return {'archived': archive.archive_closed_requests()}
+
+
+def expire_keys_and_jobs(batch_size=MAINTENANCE_BATCH_SIZE):
+    connection = _connect()
+    cursor = connection.cursor()
+    removed = 0
+    try:
+        while True:
+            deleted = idempotency.expire_keys(cursor, batch_size)
+            connection.commit()
+            removed += deleted
+            if deleted < batch_size:
+                break
+        reports.expire_jobs(cursor)
+        connection.commit()
+        return {'idempotency_keys': removed}
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def register_jobs(scheduler):
+    scheduler.register('expire_stale_requests', expire_stale_requests, interval=STALE_REQUEST_CHECK_SECONDS,
+                       jitter=60, initial_delay=60)
+    scheduler.register('archive_closed_requests', archive_closed, cron=ARCHIVE_CRON, jitter=300)
+    scheduler.register('refresh_worker_ratings', refresh_ratings, cron=RATINGS_REFRESH_CRON, jitter=300)
+    scheduler.register('cleanup_notifications', cleanup_notifications, cron=NOTIFICATION_CLEANUP_CRON, jitter=300)
+    scheduler.register('expire_idempotency_keys', expire_keys_and_jobs, interval=3600, jitter=120)
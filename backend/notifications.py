@@ -0,0 +1,255 @@
+import json
+import os
+
+import cache
+
+# Notifications are stored as a template code plus a compact JSON array of
+# the parameters that cannot be read back from the request itself (time slot,
+# amount, the worker involved), and rendered when they are read. Template text
+# lives here; rows in Notification_Template override it per locale, so the
+# wording can change or be translated without rewriting stored notifications.
+# Rows written before templates keep their rendered `message` and are served
+# as they are.
+
+NOTIFICATION_TEMPLATE_TTL_SECONDS = float(os.getenv('NOTIFICATION_TEMPLATE_TTL_SECONDS', 300))
+DEFAULT_LOCALE = os.getenv('NOTIFICATION_DEFAULT_LOCALE', 'en')
+
+REQUEST_ACCEPTED = 1
+REQUEST_DECLINED = 2
+REQUEST_COMPLETED = 3
+REQUEST_CANCELLED = 4
+ARRIVAL_TIME_SET = 5
+ARRIVAL_CONFIRMED = 6
+REQUEST_EXPIRED = 7
+
+# code -> (name, stored parameters in order, default text)
+# The text can also use {request_id}, {description}, and {worker_name} / {worker_phone}
+# when the parameters include worker_id, or {user_name} for the requesting user.
+TEMPLATES = {
+    REQUEST_ACCEPTED: ('request_accepted', ('time_slot', 'arrival_time', 'worker_id'),
+                       "Your work request for '{description}...' has been accepted. Time Slot: {time_slot}. "
+                       "Arrival Time: {arrival_time}. Worker Phone: {worker_phone}. Please confirm arrival time."),
+    REQUEST_DECLINED: ('request_declined', ('worker_id',),
+                       "Your work request for '{description}...' has been declined by {worker_name}. "
+                       "The request is now available for other workers."),
+    REQUEST_COMPLETED: ('request_completed', ('worker_id', 'amount'),
+                        "Your work request for '{description}...' has been completed by {worker_name}. "
+                        "Amount: {amount}."),
+    REQUEST_CANCELLED: ('request_cancelled', (),
+                        "Work request #{request_id} for '{description}...' has been cancelled by the user."),
+    ARRIVAL_TIME_SET: ('arrival_time_set', ('arrival_time',),
+                       "Worker has set arrival time to {arrival_time} for your work request. Please confirm."),
+    ARRIVAL_CONFIRMED: ('arrival_confirmed', ('confirmation_status',),
+                        "{user_name} has {confirmation_status} your arrival time for work request #{request_id}."),
+    REQUEST_EXPIRED: ('request_expired', ('days',),
+                      "Your work request #{request_id} for '{description}...' expired after {days} days without "
+                      "a worker. Please create a new request if you still need it done."),
+}
+
+# Shown for a parameter that was not known when the notification was written
+MISSING = {'time_slot': 'To be confirmed', 'arrival_time': 'To be confirmed', 'worker_phone': 'Not available',
+           'worker_name': 'a worker', 'user_name': 'User', 'amount': 'Not specified'}
+
+# Longest stored text parameter; keeps the payload inside Notification.params
+MAX_PARAM_LENGTH = 60
+
+# Columns the notification queries select alongside n.* for rendering
+RENDER_COLUMNS = "wr.description AS request_description, wr.user_id AS request_user_id"
+
+template_cache = cache.build_cache('notification_templates', backend='local', ttl=NOTIFICATION_TEMPLATE_TTL_SECONDS)
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def params_json(code, *values):
+    """The compact payload for a template: its parameters as a JSON array, or None."""
+    if len(values) != len(TEMPLATES[code][1]):
+        raise TemplateError(f"{TEMPLATES[code][0]} takes {len(TEMPLATES[code][1])} parameters")
+    if not values:
+        return None
+    values = [str(value)[:MAX_PARAM_LENGTH] if value is not None and not isinstance(value, (int, float)) else value
+              for value in values]
+    return json.dumps(values, separators=(',', ':'), ensure_ascii=False)
+
+
+def insert(cursor, request_id, code, *values):
+    """Store a notification for `request_id`. Returns the new notification id."""
+    cursor.execute("""INSERT INTO Notification (template_code, params, date, status, request_id)
+                      VALUES (%s, %s, CURDATE(), 'Unread', %s)""",
+                   (code, params_json(code, *values), request_id))
+    return cursor.lastrowid
+
+
+def insert_many(cursor, code, rows):
+    """Store one notification per (request_id, *values) tuple."""
+    cursor.executemany("""INSERT INTO Notification (template_code, params, date, status, request_id)
+                          VALUES (%s, %s, CURDATE(), 'Unread', %s)""",
+                       [(code, params_json(code, *values), request_id) for request_id, *values in rows])
+
+
+def validate_template(code, locale, body):
+    if code not in TEMPLATES:
+        raise TemplateError('Unknown template code')
+    if not locale or len(locale) > 10:
+        raise TemplateError('locale is required (at most 10 characters)')
+    if not body or not body.strip():
+        raise TemplateError('body is required')
+    try:
+        body.format(**{name: '' for name in _context_names(code)})
+    except (KeyError, IndexError, ValueError) as e:
+        raise TemplateError(f"body uses an unknown or malformed placeholder: {e}")
+    return code, locale, body
+
+
+def _context_names(code):
+    names = {'request_id', 'description', 'user_name'} | set(TEMPLATES[code][1])
+    if 'worker_id' in names:
+        names |= {'worker_name', 'worker_phone'}
+    return names
+
+
+def list_templates(cursor):
+    """Every template with its default text and stored overrides by locale."""
+    cursor.execute("SELECT template_code, locale, body FROM Notification_Template ORDER BY template_code, locale")
+    overrides = {}
+    for row in cursor.fetchall():
+        overrides.setdefault(row['template_code'], {})[row['locale']] = row['body']
+    return [{'template_code': code, 'name': name, 'params': list(params), 'default': body,
+             'overrides': overrides.get(code, {})}
+            for code, (name, params, body) in TEMPLATES.items()]
+
+
+def save_template(cursor, code, locale, body):
+    validate_template(code, locale, body)
+    cursor.execute("DELETE FROM Notification_Template WHERE template_code = %s AND locale = %s", (code, locale))
+    cursor.execute("INSERT INTO Notification_Template (template_code, locale, body) VALUES (%s, %s, %s)",
+                   (code, locale, body))
+
+
+def _load_overrides(cursor, locale):
+    cursor.execute("SELECT template_code, body FROM Notification_Template WHERE locale = %s", (locale,))
+    return {row['template_code']: row['body'] for row in cursor.fetchall()}
+
+
+def _template_locales(locale):
+    return [DEFAULT_LOCALE] if locale == DEFAULT_LOCALE else [DEFAULT_LOCALE, locale]
+
+
+def templates_for(cursor, locale):
+    """code -> text for `locale`: its overrides, then the default locale's, then the built-in text."""
+    texts = {code: body for code, (_, _, body) in TEMPLATES.items()}
+    for name in _template_locales(locale):
+        texts.update(template_cache.read_through(f"locale:{name}", lambda: _load_overrides(cursor, name)))
+    return texts
+
+
+async def templates_for_async(cursor, locale):
+    """templates_for() on an asyncio cursor (see db_async)."""
+    texts = {code: body for code, (_, _, body) in TEMPLATES.items()}
+    for name in _template_locales(locale):
+        found, overrides = template_cache.get(f"locale:{name}")
+        if not found:
+            await cursor.execute("SELECT template_code, body FROM Notification_Template WHERE locale = %s", (name,))
+            overrides = {row['template_code']: row['body'] for row in await cursor.fetchall()}
+            template_cache.set(f"locale:{name}", overrides)
+        texts.update(overrides)
+    return texts
+
+
+def request_locale(value):
+    """The primary language of a ?lang= value or Accept-Language header, e.g. 'ta' for 'ta-IN,en;q=0.8'."""
+    if not value:
+        return DEFAULT_LOCALE
+    return value.split(',')[0].split(';')[0].split('-')[0].strip().lower()[:10] or DEFAULT_LOCALE
+
+
+def _name(first_name, last_name):
+    return f"{first_name} {last_name}" if first_name and last_name else None
+
+
+def _decode(rows, texts):
+    """The templated rows, their decoded parameters, and the worker and user ids the text needs."""
+    templated = [row for row in rows if row.get('template_code')]
+    decoded = []
+    worker_ids, user_ids = set(), set()
+    for row in templated:
+        names = TEMPLATES.get(row['template_code'], ('', (), ''))[1]
+        values = dict(zip(names, json.loads(row['params']) if row['params'] else ()))
+        decoded.append(values)
+        if values.get('worker_id'):
+            worker_ids.add(values['worker_id'])
+        if '{user_name}' in texts.get(row['template_code'], ''):
+            user_ids.add(row['request_user_id'])
+    user_ids.discard(None)
+    return templated, decoded, worker_ids, user_ids
+
+
+def _lookups(worker_ids, user_ids):
+    """(query, params) reading the workers and users named by a page."""
+    queries = []
+    if worker_ids:
+        placeholders = ','.join(['%s'] * len(worker_ids))
+        queries.append((f"""SELECT worker_id, first_name, last_name, phone_number1 FROM Skill_Worker
+                            WHERE worker_id IN ({placeholders})""", tuple(worker_ids)))
+    if user_ids:
+        placeholders = ','.join(['%s'] * len(user_ids))
+        queries.append((f"SELECT user_id, first_name, last_name FROM User WHERE user_id IN ({placeholders})",
+                        tuple(user_ids)))
+    return queries
+
+
+def _fill(rows, templated, decoded, texts, lookups):
+    workers = {row['worker_id']: row for row in lookups if 'worker_id' in row}
+    users = {row['user_id']: row for row in lookups if 'user_id' in row}
+    for row, values in zip(templated, decoded):
+        worker = workers.get(values.get('worker_id'))
+        user = users.get(row['request_user_id'])
+        context = {'request_id': row['request_id'], 'description': (row['request_description'] or '')[:50],
+                   'worker_name': worker and _name(worker['first_name'], worker['last_name']),
+                   'worker_phone': worker and worker['phone_number1'],
+                   'user_name': user and _name(user['first_name'], user['last_name'])}
+        context.update(values)
+        if context.get('amount'):
+            context['amount'] = f"₹{context['amount']}"
+        context = {name: MISSING.get(name, '') if value in (None, '') else value
+                   for name, value in context.items()}
+        text = texts.get(row['template_code'])
+        try:
+            row['message'] = text.format(**context) if text else row['message']
+        except (KeyError, IndexError, ValueError):
+            row['message'] = TEMPLATES[row['template_code']][2].format(**context)
+    for row in rows:
+        for column in ('template_code', 'params', 'request_description', 'request_user_id'):
+            row.pop(column, None)
+    return rows
+
+
+def render(cursor, rows, locale=DEFAULT_LOCALE):
+    """Fill in `message` on notification rows selected with RENDER_COLUMNS; returns the rows.
+
+    Workers and users named by the page are read with one query each.
+    """
+    if not any(row.get('template_code') for row in rows):
+        return _fill(rows, [], [], {}, [])
+    texts = templates_for(cursor, locale)
+    templated, decoded, worker_ids, user_ids = _decode(rows, texts)
+    lookups = []
+    for query, params in _lookups(worker_ids, user_ids):
+        cursor.execute(query, params)
+        lookups.extend(cursor.fetchall())
+    return _fill(rows, templated, decoded, texts, lookups)
+
+
+async def render_async(cursor, rows, locale=DEFAULT_LOCALE):
+    """render() on an asyncio cursor (see db_async)."""
+    if not any(row.get('template_code') for row in rows):
+        return _fill(rows, [], [], {}, [])
+    texts = await templates_for_async(cursor, locale)
+    templated, decoded, worker_ids, user_ids = _decode(rows, texts)
+    lookups = []
+    for query, params in _lookups(worker_ids, user_ids):
+        await cursor.execute(query, params)
+        lookups.extend(await cursor.fetchall())
+    return _fill(rows, templated, decoded, texts, lookups)
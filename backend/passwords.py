@@ -0,0 +1,9 @@
+import hashlib
+
+# Password hashing shared by the blueprints and the CLI scripts. Kept free of
+# Flask and the app modules so the scripts can import it on their own.
+
+
+def hash_password(password):
+    """Hash a password using SHA256"""
+    return hashlib.sha256(password.encode()).hexdigest()
@@ -0,0 +1,347 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import cache
+import changes
+from db import create_connection
+
+# Worker presence. Worker clients send a heartbeat every
+# HEARTBEAT_INTERVAL_SECONDS; each process keeps the workers it has heard from
+# in memory (worker id, skills, status, last heartbeat), so answering "who is
+# online" or "which skills does this worker have" costs no query. Status
+# changes and last_seen_at are written to Skill_Worker behind the request by a
+# flusher thread, in batches every PRESENCE_FLUSH_SECONDS. The same thread
+# merges in the workers other processes have seen, read back by last_seen_at.
+
+PRESENCE_TTL_SECONDS = int(os.getenv('PRESENCE_TTL_SECONDS', 90))
+HEARTBEAT_INTERVAL_SECONDS = int(os.getenv('HEARTBEAT_INTERVAL_SECONDS', 30))
+PRESENCE_FLUSH_SECONDS = float(os.getenv('PRESENCE_FLUSH_SECONDS', 5))
+# A worker's last_seen_at is written at most this often; status changes go out on the next flush
+PRESENCE_PERSIST_SECONDS = int(os.getenv('PRESENCE_PERSIST_SECONDS', 60))
+PRESENCE_FLUSH_BATCH = int(os.getenv('PRESENCE_FLUSH_BATCH', 500))
+# Workers not heard from for this long are dropped from memory
+PRESENCE_FORGET_SECONDS = int(os.getenv('PRESENCE_FORGET_SECONDS', 3600))
+
+WORKER_STATUSES = ('Available', 'At Work', 'Leave')
+
+
+class PresenceError(ValueError):
+    pass
+
+
+def validate_status(status):
+    if status not in WORKER_STATUSES:
+        raise PresenceError(f"status must be one of {', '.join(WORKER_STATUSES)}")
+    return status
+
+
+class Presence:
+    __slots__ = ('login_id', 'worker_id', 'skill_ids', 'status', 'last_seen', 'persisted')
+
+    def __init__(self, login_id, worker_id, skill_ids, status, last_seen):
+        self.login_id = login_id
+        self.worker_id = worker_id
+        self.skill_ids = frozenset(skill_ids)
+        self.status = status
+        self.last_seen = last_seen
+        self.persisted = last_seen
+
+    def to_dict(self):
+        return {'login_id': self.login_id, 'worker_id': self.worker_id, 'status': self.status,
+                'skill_type_ids': sorted(self.skill_ids),
+                'last_seen': datetime.fromtimestamp(self.last_seen).isoformat(timespec='seconds')
+                if self.last_seen else None}
+
+
+def _timestamp(value):
+    return value.timestamp() if value else 0.0
+
+
+class PresenceTable:
+    """In-memory presence of workers, keyed by login id.
+
+    Registered with the invalidation bus like a per-process cache, so deleting a
+    worker or changing their skills drops it from every process. An entry with
+    unwritten changes stays for the flusher, marked stale so the next read
+    reloads its skills.
+    """
+
+    name = 'presence'
+    per_process = True
+
+    def __init__(self, ttl=PRESENCE_TTL_SECONDS):
+        self.ttl = ttl
+        # Called as listener(name, keys) on local invalidations; keys is None for clear()
+        self.listeners = []
+        self._entries = {}
+        # login_id -> True when the status changed, False when only last_seen is due
+        self._dirty = {}
+        # Entries kept only for the flusher; get() misses them so they are reloaded
+        self._stale = set()
+        self._lock = threading.Lock()
+        self._counters = {'heartbeats': 0, 'loads': 0, 'status_changes': 0, 'flushed': 0, 'merged': 0,
+                          'forgotten': 0, 'flush_errors': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, login_id):
+        if login_id in self._stale:
+            return None
+        return self._entries.get(login_id)
+
+    def load(self, cursor, login_id):
+        """Read a worker into the table. Returns its entry, or None if there is no such worker."""
+        cursor.execute("""SELECT sw.worker_id, sw.available_status, sw.last_seen_at FROM Skill_Worker sw
+                          JOIN Login l ON sw.login_id = l.login_id
+                          WHERE sw.login_id = %s AND l.role = 'Worker'
+                          AND l.deleted_at IS NULL AND sw.deleted_at IS NULL""", (login_id,))
+        worker = cursor.fetchone()
+        if not worker:
+            return None
+        cursor.execute("SELECT skill_type_id FROM Worker_Skills WHERE worker_id = %s", (worker['worker_id'],))
+        skill_ids = [row['skill_type_id'] for row in cursor.fetchall()]
+        self._count('loads')
+        with self._lock:
+            entry = self._entries.get(login_id)
+            if entry is None:
+                entry = Presence(login_id, worker['worker_id'], skill_ids, worker['available_status'] or 'Available',
+                                 _timestamp(worker['last_seen_at']))
+                self._entries[login_id] = entry
+            else:
+                # A stale entry keeps its unwritten status and last_seen
+                entry.skill_ids = frozenset(skill_ids)
+                self._stale.discard(login_id)
+            return entry
+
+    def get_or_load(self, cursor, login_id):
+        return self.get(login_id) or self.load(cursor, login_id)
+
+    def heartbeat(self, entry, status=None):
+        """Mark the worker as seen now, optionally with a new status."""
+        now = time.time()
+        with self._lock:
+            self._counters['heartbeats'] += 1
+            entry.last_seen = now
+            if status is not None and status != entry.status:
+                entry.status = status
+                self._dirty[entry.login_id] = True
+                self._counters['status_changes'] += 1
+            elif now - entry.persisted >= PRESENCE_PERSIST_SECONDS:
+                self._dirty.setdefault(entry.login_id, False)
+            self._entries[entry.login_id] = entry
+        return entry
+
+    def is_online(self, entry, within=None):
+        return entry is not None and entry.last_seen >= time.time() - (within or self.ttl)
+
+    def online_workers(self, skill_type_id=None, status=None, within=None):
+        """Workers heard from in the last `within` seconds (default PRESENCE_TTL_SECONDS), newest first."""
+        cutoff = time.time() - (within or self.ttl)
+        with self._lock:
+            entries = [entry for entry in self._entries.values()
+                       if entry.last_seen >= cutoff and entry.login_id not in self._stale
+                       and (skill_type_id is None or skill_type_id in entry.skill_ids)
+                       and (status is None or entry.status == status)]
+        return sorted(entries, key=lambda entry: entry.last_seen, reverse=True)
+
+    def online_worker_ids(self, skill_type_id=None, status=None, within=None):
+        return {entry.worker_id for entry in self.online_workers(skill_type_id, status, within)}
+
+    # Cache interface used by the invalidation bus; keys are login ids as strings
+    def invalidate(self, *keys, broadcast=True):
+        with self._lock:
+            for key in keys:
+                login_id = int(key)
+                if login_id in self._dirty:
+                    self._stale.add(login_id)
+                elif self._entries.pop(login_id, None) is not None:
+                    self._stale.discard(login_id)
+                    self._counters['forgotten'] += 1
+        if broadcast:
+            self._notify(list(keys))
+
+    def forget(self, login_id):
+        self.invalidate(str(login_id))
+
+    def clear(self, broadcast=True):
+        # Entries with unwritten changes stay until the flusher has persisted them
+        with self._lock:
+            self._entries = {login_id: entry for login_id, entry in self._entries.items() if login_id in self._dirty}
+            self._stale = set(self._entries)
+        if broadcast:
+            self._notify(None)
+
+    def _notify(self, keys):
+        for listener in self.listeners:
+            try:
+                listener(self.name, keys)
+            except Exception as e:
+                print(f"Presence listener failed: {e}")
+
+    def _take_dirty(self, limit):
+        with self._lock:
+            batch = []
+            for login_id in list(self._dirty)[:limit]:
+                status_changed = self._dirty.pop(login_id)
+                entry = self._entries.get(login_id)
+                if entry is not None:
+                    batch.append((entry, status_changed, entry.status, entry.last_seen))
+            return batch
+
+    def _requeue(self, batch):
+        with self._lock:
+            for entry, status_changed, _, _ in batch:
+                if entry.login_id in self._entries:
+                    self._dirty[entry.login_id] = self._dirty.get(entry.login_id, False) or status_changed
+
+    def flush(self, connection, batch_size=PRESENCE_FLUSH_BATCH):
+        """Write pending status changes and last_seen_at, one batch per transaction. Returns rows written."""
+        written = 0
+        while True:
+            batch = self._take_dirty(batch_size)
+            if not batch:
+                return written
+            cursor = connection.cursor()
+            try:
+                statuses = [(status, datetime.fromtimestamp(seen), entry.worker_id)
+                            for entry, changed, status, seen in batch if changed]
+                seen_only = [(datetime.fromtimestamp(seen), entry.worker_id)
+                             for entry, changed, status, seen in batch if not changed and seen]
+                if statuses:
+                    cursor.executemany("UPDATE Skill_Worker SET available_status = %s, last_seen_at = %s "
+                                       "WHERE worker_id = %s", statuses)
+                    for _, _, worker_id in statuses:
+                        changes.record(cursor, 'worker', worker_id, changes.UPDATE, worker_id=worker_id)
+                if seen_only:
+                    cursor.executemany("UPDATE Skill_Worker SET last_seen_at = %s WHERE worker_id = %s",
+                                       seen_only)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                self._requeue(batch)
+                self._count('flush_errors')
+                raise
+            finally:
+                cursor.close()
+            for entry, changed, status, seen in batch:
+                entry.persisted = max(entry.persisted, seen)
+            self._count('flushed', len(batch))
+            written += len(batch)
+            changed_keys = [cache.worker_key(entry.login_id) for entry, changed, _, _ in batch if changed]
+            if changed_keys:
+                cache.profile_cache.invalidate(*changed_keys)
+            if len(batch) < batch_size:
+                return written
+
+    def sync(self, cursor):
+        """Merge in workers that other processes have seen within the TTL."""
+        cursor.execute("""SELECT login_id, worker_id, available_status, last_seen_at FROM Skill_Worker
+                          WHERE last_seen_at >= %s AND deleted_at IS NULL""",
+                       (datetime.fromtimestamp(time.time() - self.ttl),))
+        rows = cursor.fetchall()
+        missing = [row['worker_id'] for row in rows if row['login_id'] not in self._entries]
+        skills = {}
+        if missing:
+            placeholders = ','.join(['%s'] * len(missing))
+            cursor.execute(f"SELECT worker_id, skill_type_id FROM Worker_Skills WHERE worker_id IN ({placeholders})",
+                           tuple(missing))
+            for row in cursor.fetchall():
+                skills.setdefault(row['worker_id'], []).append(row['skill_type_id'])
+        merged = 0
+        with self._lock:
+            for row in rows:
+                seen = _timestamp(row['last_seen_at'])
+                entry = self._entries.get(row['login_id'])
+                if entry is None:
+                    entry = Presence(row['login_id'], row['worker_id'], skills.get(row['worker_id'], ()),
+                                     row['available_status'] or 'Available', seen)
+                    self._entries[row['login_id']] = entry
+                    merged += 1
+                elif seen > entry.last_seen:
+                    entry.last_seen = entry.persisted = seen
+                    if row['login_id'] not in self._dirty:
+                        entry.status = row['available_status'] or entry.status
+                    merged += 1
+            self._counters['merged'] += merged
+        return merged
+
+    def sweep(self, max_age=PRESENCE_FORGET_SECONDS):
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [login_id for login_id, entry in self._entries.items()
+                     if entry.last_seen < cutoff and login_id not in self._dirty]
+            for login_id in stale:
+                del self._entries[login_id]
+                self._stale.discard(login_id)
+            self._counters['forgotten'] += len(stale)
+        return len(stale)
+
+    def stats(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            stats = dict(self._counters)
+            stats['tracked'] = len(self._entries)
+            stats['online'] = sum(1 for entry in self._entries.values() if entry.last_seen >= cutoff)
+            stats['pending_writes'] = len(self._dirty)
+        stats['ttl_seconds'] = self.ttl
+        return stats
+
+
+table = PresenceTable()
+
+
+class PresenceFlusher:
+    """Daemon thread flushing and syncing the presence table. Restarted after fork."""
+
+    def __init__(self, interval=PRESENCE_FLUSH_SECONDS):
+        self.interval = interval
+        self._thread = None
+        self._pid = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='presence-flusher', daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        self.ensure_started()
+        self._wake.set()
+
+    def run_once(self):
+        connection = create_connection(readonly=False)
+        if connection is None:
+            return
+        try:
+            table.flush(connection)
+            cursor = connection.cursor()
+            try:
+                table.sync(cursor)
+                connection.commit()
+            finally:
+                cursor.close()
+            table.sweep()
+        finally:
+            connection.close()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Presence flush failed: {e}")
+
+
+flusher = PresenceFlusher()
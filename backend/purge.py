@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+
+from db import create_connection
+
+# Background purge of soft-deleted users and workers. delete_user/delete_worker
+# only mark the account deleted and queue a Purge_Job; this thread then removes
+# the dependent rows in small batches, committing after each one so no single
+# transaction holds row locks for long.
+
+PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', 500))
+# Pause between batches so the purge yields to interactive traffic
+PURGE_PAUSE_SECONDS = float(os.getenv('PURGE_PAUSE_SECONDS', 0.05))
+PURGE_POLL_SECONDS = float(os.getenv('PURGE_POLL_SECONDS', 30))
+# Running jobs not updated for this long are assumed orphaned and re-claimed
+STALE_JOB_MINUTES = int(os.getenv('PURGE_STALE_JOB_MINUTES', 10))
+
+# Ordered cascade per entity: (table, statement, parameter). Statements with a
+# LIMIT are repeated until they delete nothing. A job resumes at the table it
+# recorded last (current_table), so steps can be added anywhere in a list
+# without sending jobs queued under the old list to the wrong table; `step`
+# is kept for progress reporting.
+PURGE_STEPS = {
+    'User': [
+        ('Notification', """DELETE FROM Notification WHERE request_id IN
+                            (SELECT request_id FROM Work_Request WHERE user_id = %s) LIMIT %s""", 'entity_id'),
+        ('Feedback', """DELETE FROM Feedback WHERE request_id IN
+                        (SELECT request_id FROM Work_Request WHERE user_id = %s) LIMIT %s""", 'entity_id'),
+        ('Work_Request', "DELETE FROM Work_Request WHERE user_id = %s LIMIT %s", 'entity_id'),
+        ('Feedback_History', """DELETE FROM Feedback_History WHERE request_id IN
+                                (SELECT request_id FROM Work_Request_History WHERE user_id = %s) LIMIT %s""", 'entity_id'),
+        ('Work_Request_History', "DELETE FROM Work_Request_History WHERE user_id = %s LIMIT %s", 'entity_id'),
+        ('User', "DELETE FROM User WHERE user_id = %s", 'entity_id'),
+        ('Login', "DELETE FROM Login WHERE login_id = %s", 'login_id'),
+    ],
+    'Worker': [
+        ('Worker_Skills', "DELETE FROM Worker_Skills WHERE worker_id = %s LIMIT %s", 'entity_id'),
+        ('Worker_Availability', "DELETE FROM Worker_Availability WHERE worker_id = %s LIMIT %s", 'entity_id'),
+        ('Notification', """DELETE FROM Notification WHERE request_id IN
+                            (SELECT request_id FROM Work_Request WHERE worker_id = %s) LIMIT %s""", 'entity_id'),
+        ('Feedback', """DELETE FROM Feedback WHERE request_id IN
+                        (SELECT request_id FROM Work_Request WHERE worker_id = %s) LIMIT %s""", 'entity_id'),
+        ('Work_Request', "DELETE FROM Work_Request WHERE worker_id = %s LIMIT %s", 'entity_id'),
+        ('Feedback_History', """DELETE FROM Feedback_History WHERE request_id IN
+                                (SELECT request_id FROM Work_Request_History WHERE worker_id = %s) LIMIT %s""", 'entity_id'),
+        ('Work_Request_History', "DELETE FROM Work_Request_History WHERE worker_id = %s LIMIT %s", 'entity_id'),
+        ('Skill_Worker', "DELETE FROM Skill_Worker WHERE worker_id = %s", 'entity_id'),
+        ('Login', "DELETE FROM Login WHERE login_id = %s", 'login_id'),
+    ],
+}
+
+
+def queue_purge(cursor, entity, entity_id, login_id):
+    """Record a purge job in the caller's transaction and return its id."""
+    cursor.execute("""INSERT INTO Purge_Job (entity, entity_id, login_id, status, step, rows_deleted, created_at, updated_at)
+                      VALUES (%s, %s, %s, 'Pending', 0, 0, NOW(), NOW())""", (entity, entity_id, login_id))
+    return cursor.lastrowid
+
+
+def _claim_next_job(cursor, worker_name):
+    cursor.execute("""SELECT * FROM Purge_Job
+                      WHERE status = 'Pending'
+                         OR (status = 'Running' AND updated_at < NOW() - INTERVAL %s MINUTE)
+                      ORDER BY job_id LIMIT 1""", (STALE_JOB_MINUTES,))
+    job = cursor.fetchone()
+    if not job:
+        return None
+    # Re-check the claim condition in the UPDATE so only one process wins
+    cursor.execute("""UPDATE Purge_Job SET status = 'Running', claimed_by = %s, updated_at = NOW()
+                      WHERE job_id = %s
+                        AND (status = 'Pending'
+                             OR (status = 'Running' AND updated_at < NOW() - INTERVAL %s MINUTE))""",
+                   (worker_name, job['job_id'], STALE_JOB_MINUTES))
+    return job if cursor.rowcount == 1 else None
+
+
+def _resume_index(steps, job):
+    for index, (table, _, _) in enumerate(steps):
+        if table == job.get('current_table'):
+            return index
+    return job['step'] or 0
+
+
+def run_job(connection, job, batch_size=PURGE_BATCH_SIZE, pause=PURGE_PAUSE_SECONDS):
+    """Execute (or resume) one purge job from its recorded step."""
+    cursor = connection.cursor()
+    job_id = job['job_id']
+    rows_deleted = job['rows_deleted'] or 0
+    try:
+        steps = PURGE_STEPS[job['entity']]
+        for index in range(_resume_index(steps, job), len(steps)):
+            table, statement, key = steps[index]
+            batched = 'LIMIT' in statement
+            while True:
+                params = (job[key], batch_size) if batched else (job[key],)
+                cursor.execute(statement, params)
+                deleted = cursor.rowcount
+                rows_deleted += deleted
+                cursor.execute("""UPDATE Purge_Job SET step = %s, current_table = %s, rows_deleted = %s,
+                                  updated_at = NOW() WHERE job_id = %s""", (index, table, rows_deleted, job_id))
+                connection.commit()
+                if not batched or deleted < batch_size:
+                    break
+                if pause:
+                    time.sleep(pause)
+        cursor.execute("""UPDATE Purge_Job SET status = 'Done', step = %s, current_table = NULL,
+                          rows_deleted = %s, updated_at = NOW() WHERE job_id = %s""",
+                       (len(steps), rows_deleted, job_id))
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        cursor.execute("UPDATE Purge_Job SET status = 'Failed', error = %s, updated_at = NOW() WHERE job_id = %s",
+                       (str(e), job_id))
+        connection.commit()
+        print(f"Purge job {job_id} failed: {e}")
+    finally:
+        cursor.close()
+
+
+def purge_pending_jobs(worker_name='manual', max_jobs=None):
+    """Claim and run queued jobs until none are left. Returns the number processed."""
+    connection = create_connection()
+    if connection is None:
+        return 0
+    processed = 0
+    try:
+        while max_jobs is None or processed < max_jobs:
+            cursor = connection.cursor()
+            try:
+                job = _claim_next_job(cursor, worker_name)
+                connection.commit()
+            finally:
+                cursor.close()
+            if job is None:
+                break
+            run_job(connection, job)
+            processed += 1
+    finally:
+        connection.close()
+    return processed
+
+
+class Purger:
+    """Daemon thread draining Purge_Job. Safe to start from every gunicorn worker."""
+
+    def __init__(self):
+        self._thread = None
+        self._pid = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        # Threads do not survive fork, so restart when running in a new process
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='purger', daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        self.ensure_started()
+        self._wake.set()
+
+    def _run(self):
+        worker_name = f"pid-{os.getpid()}"
+        while True:
+            try:
+                purge_pending_jobs(worker_name)
+            except Exception as e:
+                print(f"Purger error: {e}")
+            self._wake.wait(PURGE_POLL_SECONDS)
+            self._wake.clear()
+
+
+purger = Purger()
+
+
+def get_job(cursor, job_id):
+    cursor.execute("SELECT * FROM Purge_Job WHERE job_id = %s", (job_id,))
+    return cursor.fetchone()
@@ -0,0 +1,134 @@
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+# Dev/test query instrumentation. Enable per-request statement counting,
+# N+1 detection and slow query logging with QUERY_DEBUG=1.
+QUERY_DEBUG = os.getenv('QUERY_DEBUG', '').lower() in ('1', 'true', 'yes')
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+# A statement shape repeated this many times in one request is reported as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 3))
+# Requests issuing more statements than this are reported as over budget
+MAX_QUERIES_PER_REQUEST = int(os.getenv('MAX_QUERIES_PER_REQUEST', 8))
+
+_local = threading.local()
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_NULL_LITERAL = re.compile(r'\bNULL\b', re.IGNORECASE)
+_VALUE_TUPLE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_VALUE_TUPLES = re.compile(r'\(\?\+\)(?:\s*,\s*\(\?\+\))+')
+
+
+class QueryLog:
+    def __init__(self, label):
+        self.label = label
+        self.statements = []
+
+    def add(self, sql, duration_ms):
+        self.statements.append((normalize(sql), sql, duration_ms))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated_shapes(self, threshold=None):
+        """Return {shape: count} for shapes issued at least `threshold` times."""
+        threshold = threshold or N_PLUS_ONE_THRESHOLD
+        counts = {}
+        for shape, _, _ in self.statements:
+            counts[shape] = counts.get(shape, 0) + 1
+        return {shape: n for shape, n in counts.items() if n >= threshold}
+
+    def slow_statements(self, threshold_ms=None):
+        threshold_ms = SLOW_QUERY_MS if threshold_ms is None else threshold_ms
+        return [(sql, ms) for _, sql, ms in self.statements if ms >= threshold_ms]
+
+
+def normalize(sql):
+    """Reduce a statement to its shape: literals and IN/VALUES lists collapse to '?'."""
+    shape = sql.replace('%s', '?')
+    shape = _STRING_LITERAL.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _NULL_LITERAL.sub('?', shape)
+    shape = _WHITESPACE.sub(' ', shape).strip()
+    shape = _VALUE_TUPLE.sub('(?+)', shape)
+    return _VALUE_TUPLES.sub('(?+)', shape)
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def is_tracking():
+    return bool(getattr(_local, 'stack', None))
+
+
+def start_tracking(label=''):
+    log = QueryLog(label)
+    _stack().append(log)
+    return log
+
+
+def stop_tracking(log=None):
+    stack = _stack()
+    if not stack:
+        return log
+    if log is None:
+        return stack.pop()
+    if log in stack:
+        stack.remove(log)
+    return log
+
+
+def record(sql, duration_ms):
+    """Called by the DB cursor for every executed statement."""
+    for log in getattr(_local, 'stack', ()):
+        log.add(sql, duration_ms)
+    if QUERY_DEBUG and duration_ms >= SLOW_QUERY_MS:
+        print(f"[query] slow query ({duration_ms:.1f} ms): {_WHITESPACE.sub(' ', sql).strip()}")
+
+
+def report(log):
+    """Print a summary for one request and return the list of problems found."""
+    problems = []
+    if log.count > MAX_QUERIES_PER_REQUEST:
+        problems.append(f"{log.count} statements (budget {MAX_QUERIES_PER_REQUEST})")
+    for shape, n in log.repeated_shapes().items():
+        problems.append(f"likely N+1: {n}x {shape}")
+    if problems:
+        print(f"[query] {log.label}: " + '; '.join(problems))
+    return problems
+
+
+@contextmanager
+def assert_max_queries(limit, label=''):
+    """Fail if the block issues more than `limit` statements.
+
+    Usable from pytest:
+
+        with assert_max_queries(4):
+            client.post('/api/work-requests/1/accept', json={...})
+    """
+    log = start_tracking(label)
+    try:
+        yield log
+    finally:
+        stop_tracking(log)
+    if log.count > limit:
+        statements = '\n'.join(f"  {shape}" for shape, _, _ in log.statements)
+        raise AssertionError(
+            f"{label or 'block'} issued {log.count} statements, budget is {limit}:\n{statements}"
+        )
+
+
+def assert_endpoint_budget(client, method, url, limit, **kwargs):
+    """Call `url` on a Flask test client and assert its statement budget."""
+    label = f"{method.upper()} {url}"
+    with assert_max_queries(limit, label):
+        response = client.open(url, method=method.upper(), **kwargs)
+    return response
@@ -0,0 +1,68 @@
+from archive import feedback_table, work_requests_table
+
+# Per-worker rating aggregate stored on Skill_Worker (rating_count, rating_sum,
+# avg_rating) so the worker directory can filter and sort by rating from an
+# index instead of aggregating Feedback on every query. submit_feedback keeps it
+# current; refresh_worker_ratings rebuilds it from live and archived feedback.
+
+
+def record_rating(cursor, request_id, rating):
+    """Add one rating to the aggregate of the worker assigned to `request_id`."""
+    # avg_rating is assigned first: MySQL applies SET clauses left to right
+    cursor.execute("""UPDATE Skill_Worker
+                      SET avg_rating = ROUND((rating_sum + %s) * 1.0 / (rating_count + 1), 2),
+                          rating_sum = rating_sum + %s,
+                          rating_count = rating_count + 1
+                      WHERE worker_id = (SELECT worker_id FROM Work_Request WHERE request_id = %s)""",
+                   (rating, rating, request_id))
+    return cursor.rowcount
+
+
+def refresh_worker_ratings(cursor, worker_ids=None):
+    """Recompute the aggregate from Feedback and Feedback_History.
+
+    Refreshes every worker, or only `worker_ids` when given. Returns the number
+    of workers that have at least one rating.
+    """
+    conditions, params = ["f.rating IS NOT NULL"], []
+    if worker_ids is not None:
+        worker_ids = list(worker_ids)
+        if not worker_ids:
+            return 0
+        placeholders = ','.join(['%s'] * len(worker_ids))
+        conditions.append(f"wr.worker_id IN ({placeholders})")
+        params += worker_ids
+    cursor.execute(f"""SELECT wr.worker_id, COUNT(*) AS rating_count, SUM(f.rating) AS rating_sum
+                       FROM {feedback_table(True)} f
+                       JOIN {work_requests_table(True)} wr ON f.request_id = wr.request_id
+                       WHERE {' AND '.join(conditions)}
+                       GROUP BY wr.worker_id""", tuple(params))
+    totals = [(int(row['rating_count']), int(row['rating_sum']),
+               round(int(row['rating_sum']) / int(row['rating_count']), 2), row['worker_id'])
+              for row in cursor.fetchall()]
+
+    if worker_ids is None:
+        cursor.execute("UPDATE Skill_Worker SET rating_count = 0, rating_sum = 0, avg_rating = 0")
+    else:
+        cursor.execute(f"UPDATE Skill_Worker SET rating_count = 0, rating_sum = 0, avg_rating = 0 "
+                       f"WHERE worker_id IN ({placeholders})", tuple(worker_ids))
+    if totals:
+        cursor.executemany("UPDATE Skill_Worker SET rating_count = %s, rating_sum = %s, avg_rating = %s "
+                           "WHERE worker_id = %s", totals)
+    return len(totals)
+
+
+if __name__ == "__main__":
+    from db import create_connection
+
+    connection = create_connection()
+    if connection is None:
+        raise SystemExit("Database connection failed")
+    cursor = connection.cursor()
+    try:
+        rated = refresh_worker_ratings(cursor)
+        connection.commit()
+        print(f"Refreshed rating aggregates ({rated} rated workers)")
+    finally:
+        cursor.close()
+        connection.close()
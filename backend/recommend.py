@@ -0,0 +1,322 @@
+import os
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+
+import changes
+from db import create_connection
+
+# Worker recommendations for a work request. Every process keeps one row per
+# worker in NumPy arrays: a skills bitset, pincode and city, rating totals,
+# experience, open (Accepted) jobs and whether the worker is available. A
+# recommendation filters and scores all candidates with array operations and
+# takes the top k with argpartition, so it costs no query beyond reading the
+# request. The arrays are loaded once and then refreshed from Change_Log: every
+# write that touches a worker records its worker_id there, and only those
+# workers are re-read, at most every RECOMMEND_REFRESH_SECONDS.
+
+RECOMMEND_REFRESH_SECONDS = float(os.getenv('RECOMMEND_REFRESH_SECONDS', 2))
+DEFAULT_K = 10
+MAX_K = 50
+LOAD_BATCH_SIZE = 1000
+
+# Ratings are pulled towards RATING_PRIOR_MEAN by RATING_PRIOR_WEIGHT pseudo-ratings,
+# so a single 5-star review does not outrank a long record of 4.8s
+RATING_PRIOR_MEAN = 3.5
+RATING_PRIOR_WEIGHT = 5
+MAX_EXPERIENCE_YEARS = 20
+MAX_OPEN_JOBS = 5
+WEIGHTS = {'rating': 0.35, 'locality': 0.30, 'experience': 0.15, 'load': 0.15, 'online': 0.05}
+# Locality: same pincode, same first three digits (sorting district), same city
+LOCALITY_PINCODE = 1.0
+LOCALITY_DISTRICT = 0.7
+LOCALITY_CITY = 0.5
+
+_DIGITS = re.compile(r'\d+')
+
+
+def parse_pincode(value):
+    """Pincode as an int, or -1 when missing or not numeric."""
+    match = _DIGITS.search(str(value or ''))
+    return int(match.group()) if match else -1
+
+
+def _empty(capacity, words):
+    return {'worker_id': np.zeros(capacity, np.int64), 'login_id': np.zeros(capacity, np.int64),
+            'skills': np.zeros((capacity, words), np.uint64), 'pincode': np.full(capacity, -1, np.int64),
+            'city': np.full(capacity, -1, np.int32), 'rating_sum': np.zeros(capacity, np.float64),
+            'rating_count': np.zeros(capacity, np.float64), 'experience': np.zeros(capacity, np.float32),
+            'open_jobs': np.zeros(capacity, np.float32), 'available': np.zeros(capacity, bool),
+            'active': np.zeros(capacity, bool)}
+
+
+def _grow(arrays, capacity, words):
+    grown = _empty(capacity, words)
+    size = len(arrays['worker_id'])
+    for name, array in arrays.items():
+        if name == 'skills':
+            grown[name][:size, :array.shape[1]] = array
+        else:
+            grown[name][:size] = array
+    return grown
+
+
+class WorkerIndex:
+    """Per-process feature arrays for every worker, keyed by Skill_Worker.worker_id."""
+
+    def __init__(self, refresh_seconds=RECOMMEND_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.size = 0
+        self.cursor = None
+        self._arrays = _empty(0, 1)
+        self._rows = {}
+        self._cities = {}
+        self._refreshed = 0.0
+        self._pid = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._counters = {'full_loads': 0, 'incremental_loads': 0, 'workers_reloaded': 0, 'recommendations': 0,
+                          'last_score_ms': None}
+
+    def _city_code(self, city):
+        key = (city or '').strip().lower()
+        if not key:
+            return -1
+        return self._cities.setdefault(key, len(self._cities))
+
+    def _load_rows(self, cursor, worker_ids=None):
+        """Read worker rows, skills and open jobs, for all workers or only `worker_ids`."""
+        condition, params = '', ()
+        if worker_ids is not None:
+            condition = f"WHERE sw.worker_id IN ({','.join(['%s'] * len(worker_ids))})"
+            params = tuple(worker_ids)
+        cursor.execute(f"""SELECT sw.worker_id, sw.login_id, sw.city, sw.pincode, sw.experience_years,
+                           sw.available_status, sw.rating_sum, sw.rating_count, sw.deleted_at
+                           FROM Skill_Worker sw {condition}""", params)
+        workers = cursor.fetchall()
+        cursor.execute(f"""SELECT ws.worker_id, ws.skill_type_id FROM Worker_Skills ws
+                           {condition.replace('sw.', 'ws.')}""", params)
+        skills = cursor.fetchall()
+        load_condition = f"AND wr.worker_id IN ({','.join(['%s'] * len(worker_ids))})" if worker_ids else ''
+        cursor.execute(f"""SELECT wr.worker_id, COUNT(*) AS open_jobs FROM Work_Request wr
+                           WHERE wr.status = 'Accepted' {load_condition} GROUP BY wr.worker_id""", params)
+        open_jobs = {row['worker_id']: row['open_jobs'] for row in cursor.fetchall()}
+        return workers, skills, open_jobs
+
+    def _apply(self, workers, skills, open_jobs):
+        """Write rows into the arrays, appending workers not seen before. Caller holds the lock."""
+        new_ids = [row['worker_id'] for row in workers if row['worker_id'] not in self._rows]
+        max_skill = max((row['skill_type_id'] for row in skills), default=0)
+        arrays = self._arrays
+        capacity, words = len(arrays['worker_id']), arrays['skills'].shape[1]
+        needed_words = max(words, max_skill // 64 + 1)
+        if self.size + len(new_ids) > capacity or needed_words > words:
+            capacity = max(capacity, int((self.size + len(new_ids)) * 1.25) + 16)
+            # Scorers keep using the old arrays until this swap
+            arrays = _grow(arrays, capacity, needed_words)
+        for worker_id in new_ids:
+            self._rows[worker_id] = self.size
+            self.size += 1
+        if not workers:
+            self._arrays = arrays
+            return
+        index = np.fromiter((self._rows[row['worker_id']] for row in workers), np.int64, len(workers))
+        arrays['worker_id'][index] = [row['worker_id'] for row in workers]
+        arrays['login_id'][index] = [row['login_id'] or 0 for row in workers]
+        arrays['pincode'][index] = [parse_pincode(row['pincode']) for row in workers]
+        arrays['city'][index] = [self._city_code(row['city']) for row in workers]
+        arrays['rating_sum'][index] = [float(row['rating_sum'] or 0) for row in workers]
+        arrays['rating_count'][index] = [float(row['rating_count'] or 0) for row in workers]
+        arrays['experience'][index] = [float(row['experience_years'] or 0) for row in workers]
+        arrays['open_jobs'][index] = [open_jobs.get(row['worker_id'], 0) for row in workers]
+        arrays['available'][index] = [(row['available_status'] or 'Available') == 'Available' for row in workers]
+        arrays['active'][index] = [row['deleted_at'] is None for row in workers]
+        arrays['skills'][index] = 0
+        if skills:
+            skill_ids = np.fromiter((row['skill_type_id'] for row in skills), np.int64, len(skills))
+            rows = np.fromiter((self._rows[row['worker_id']] for row in skills), np.int64, len(skills))
+            np.bitwise_or.at(arrays['skills'], (rows, skill_ids // 64),
+                             np.left_shift(np.uint64(1), (skill_ids % 64).astype(np.uint64)))
+        self._arrays = arrays
+
+    def full_load(self, cursor):
+        last_seq = changes.visible_seq(cursor)
+        workers, skills, open_jobs = self._load_rows(cursor)
+        # Built aside and swapped in, so recommendations meanwhile score the old arrays
+        fresh = WorkerIndex()
+        fresh._cities = dict(self._cities)
+        fresh._apply(workers, skills, open_jobs)
+        with self._lock:
+            self._cities = fresh._cities
+            self._rows = fresh._rows
+            self._arrays = fresh._arrays
+            self.size = fresh.size
+            self.cursor = last_seq
+            self._counters['full_loads'] += 1
+        return len(workers)
+
+    def refresh(self, cursor):
+        """Re-read the workers changed since the last refresh, or everything when the log was compacted."""
+        if self.cursor is None:
+            return self.full_load(cursor)
+        cursor.execute("SELECT MIN(seq) AS first_seq, COALESCE(MAX(seq), 0) AS last_seq FROM Change_Log")
+        bounds = cursor.fetchone()
+        if (bounds['first_seq'] is not None and self.cursor < bounds['first_seq'] - 1) \
+                or self.cursor > bounds['last_seq']:
+            return self.full_load(cursor)
+        until = changes.visible_seq(cursor, self.cursor)
+        cursor.execute("""SELECT DISTINCT worker_id, op, entity FROM Change_Log
+                          WHERE seq > %s AND seq <= %s AND (worker_id IS NOT NULL OR op = 'refresh')""",
+                       (self.cursor, until))
+        rows = cursor.fetchall()
+        if any(row['op'] == 'refresh' and row['entity'] == 'worker' for row in rows):
+            return self.full_load(cursor)
+        worker_ids = sorted({row['worker_id'] for row in rows if row['worker_id'] is not None})
+        for start in range(0, len(worker_ids), LOAD_BATCH_SIZE):
+            batch = worker_ids[start:start + LOAD_BATCH_SIZE]
+            workers, skills, open_jobs = self._load_rows(cursor, batch)
+            with self._lock:
+                self._apply(workers, skills, open_jobs)
+        with self._lock:
+            self.cursor = until
+            self._counters['incremental_loads'] += 1
+            self._counters['workers_reloaded'] += len(worker_ids)
+        return len(worker_ids)
+
+    def ensure_fresh(self):
+        """Refresh when RECOMMEND_REFRESH_SECONDS have passed; concurrent callers use the current arrays."""
+        if self._pid != os.getpid():
+            # Arrays inherited over fork are reloaded: the parent's cursor is not ours to trust
+            self._pid = os.getpid()
+            self.cursor = None
+        elif time.monotonic() - self._refreshed < self.refresh_seconds:
+            return
+        if not self._refresh_lock.acquire(blocking=self.cursor is None):
+            return
+        try:
+            if self.cursor is not None and time.monotonic() - self._refreshed < self.refresh_seconds:
+                return
+            connection = create_connection()
+            if connection is None:
+                raise RuntimeError("Database connection failed")
+            cursor = connection.cursor()
+            try:
+                self.refresh(cursor)
+                self._refreshed = time.monotonic()
+            finally:
+                cursor.close()
+                connection.close()
+        finally:
+            self._refresh_lock.release()
+
+    def recommend(self, skill_type_id, pincode=None, city=None, k=DEFAULT_K, exclude=(), online_ids=()):
+        """Top `k` available workers with the skill, best first.
+
+        Returns (recommendations, candidate_count); each recommendation has the
+        worker's ids, its score and the score components.
+        """
+        started = time.perf_counter()
+        arrays, size = self._arrays, min(self.size, len(self._arrays['worker_id']))
+        word, bit = divmod(int(skill_type_id), 64)
+        if word >= arrays['skills'].shape[1] or size == 0:
+            return [], 0
+        has_skill = (arrays['skills'][:size, word] >> np.uint64(bit)) & np.uint64(1)
+        mask = has_skill.astype(bool) & arrays['available'][:size] & arrays['active'][:size]
+        if exclude:
+            mask &= ~np.isin(arrays['worker_id'][:size], np.fromiter(exclude, np.int64))
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return [], 0
+
+        rating = ((arrays['rating_sum'][candidates] + RATING_PRIOR_MEAN * RATING_PRIOR_WEIGHT)
+                  / (arrays['rating_count'][candidates] + RATING_PRIOR_WEIGHT) / 5.0)
+        experience = np.minimum(arrays['experience'][candidates], MAX_EXPERIENCE_YEARS) / MAX_EXPERIENCE_YEARS
+        load = np.minimum(arrays['open_jobs'][candidates], MAX_OPEN_JOBS) / MAX_OPEN_JOBS
+        locality = np.zeros(len(candidates))
+        city_code = self._cities.get((city or '').strip().lower(), -2)
+        if city_code >= 0:
+            locality = np.where(arrays['city'][candidates] == city_code, LOCALITY_CITY, locality)
+        pin = parse_pincode(pincode)
+        if pin >= 0:
+            worker_pins = arrays['pincode'][candidates]
+            locality = np.where((worker_pins >= 0) & (worker_pins // 1000 == pin // 1000),
+                                np.maximum(locality, LOCALITY_DISTRICT), locality)
+            locality = np.where(worker_pins == pin, LOCALITY_PINCODE, locality)
+        online = np.zeros(len(candidates))
+        if online_ids:
+            online = np.isin(arrays['worker_id'][candidates], np.fromiter(online_ids, np.int64)).astype(float)
+        score = (WEIGHTS['rating'] * rating + WEIGHTS['locality'] * locality + WEIGHTS['experience'] * experience
+                 - WEIGHTS['load'] * load + WEIGHTS['online'] * online)
+
+        k = max(1, min(int(k), MAX_K))
+        top = np.argpartition(-score, k - 1)[:k] if len(score) > k else np.arange(len(score))
+        top = top[np.argsort(-score[top], kind='stable')]
+        rows = candidates[top]
+        recommendations = [{'worker_id': int(arrays['worker_id'][row]), 'login_id': int(arrays['login_id'][row]),
+                            'score': round(float(score[i]), 4),
+                            'components': {'rating': round(float(rating[i]), 3),
+                                           'locality': round(float(locality[i]), 3),
+                                           'experience': round(float(experience[i]), 3),
+                                           'load': round(float(load[i]), 3), 'online': bool(online[i])}}
+                           for i, row in zip(top, rows)]
+        with self._lock:
+            self._counters['recommendations'] += 1
+            self._counters['last_score_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return recommendations, len(candidates)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update({'workers': self.size, 'cursor': self.cursor, 'refresh_seconds': self.refresh_seconds})
+        return stats
+
+
+index = WorkerIndex()
+
+
+def worker_details(cursor, recommendations):
+    """Add names and profile fields to `recommendations` with one query."""
+    if not recommendations:
+        return recommendations
+    ids = [item['worker_id'] for item in recommendations]
+    cursor.execute(f"""SELECT worker_id, first_name, last_name, city, pincode, area, experience_years,
+                       avg_rating, rating_count FROM Skill_Worker
+                       WHERE worker_id IN ({','.join(['%s'] * len(ids))})""", tuple(ids))
+    details = {row['worker_id']: row for row in cursor.fetchall()}
+    return [dict(details.get(item['worker_id'], {}), **item) for item in recommendations]
+
+
+def _benchmark(workers=100000, skills=40, runs=200):
+    """Score a synthetic index of `workers` workers and print latency percentiles."""
+    rng = np.random.default_rng(7)
+    synthetic = WorkerIndex()
+    rows = [{'worker_id': i + 1, 'login_id': i + 100001, 'city': f"city{rng.integers(50)}",
+             'pincode': str(600000 + int(rng.integers(5000))), 'experience_years': int(rng.integers(30)),
+             'available_status': 'Available' if rng.random() < 0.8 else 'Leave',
+             'rating_sum': int(rng.integers(200)), 'rating_count': int(rng.integers(1, 50)), 'deleted_at': None}
+            for i in range(workers)]
+    skill_rows = [{'worker_id': i + 1, 'skill_type_id': int(skill)}
+                  for i in range(workers) for skill in rng.choice(skills, size=3, replace=False) + 1]
+    open_jobs = {i + 1: int(rng.integers(4)) for i in range(0, workers, 3)}
+    started = time.perf_counter()
+    with synthetic._lock:
+        synthetic._apply(rows, skill_rows, open_jobs)
+    print(f"Built arrays for {workers} workers in {(time.perf_counter() - started) * 1000:.0f} ms")
+    online = set(int(x) for x in rng.choice(workers, size=workers // 10, replace=False) + 1)
+    timings = []
+    for _ in range(runs):
+        skill = int(rng.integers(1, skills + 1))
+        pincode = 600000 + int(rng.integers(5000))
+        started = time.perf_counter()
+        synthetic.recommend(skill, pincode, f"city{rng.integers(50)}", DEFAULT_K, online_ids=online)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"recommend() over {runs} runs: p50 {timings[len(timings) // 2]:.2f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms, max {timings[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,343 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+
+import export
+from archive import wants_history, work_requests_table
+from db import create_connection
+
+# Background jobs for heavy admin reports. POST /api/admin/reports records a
+# Report_Job row and hands the job to a small per-process thread pool, so a
+# full dump or stats pass never holds a request worker; clients poll the job
+# (?wait= holds the poll for at most REPORT_MAX_WAIT_SECONDS, kept short because
+# it ties up a request worker) and fetch the result once it is Done.
+# Results are stored as JSON on the job row for REPORT_RESULT_TTL_SECONDS, and
+# an identical request within that window is answered by the existing job.
+
+REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', 2))
+# Jobs waiting for a pool thread in this process before submissions are refused
+REPORT_MAX_QUEUED = int(os.getenv('REPORT_MAX_QUEUED', 10))
+REPORT_RESULT_TTL_SECONDS = int(os.getenv('REPORT_RESULT_TTL_SECONDS', 600))
+REPORT_MAX_ROWS = int(os.getenv('REPORT_MAX_ROWS', 100000))
+REPORT_MAX_WAIT_SECONDS = float(os.getenv('REPORT_MAX_WAIT_SECONDS', 2))
+# Queued or Running jobs not updated for this long belonged to a process that died
+REPORT_STALE_MINUTES = int(os.getenv('REPORT_STALE_MINUTES', 30))
+# How often a process touches updated_at on the jobs it holds, so long reports are not taken for dead
+REPORT_HEARTBEAT_SECONDS = float(os.getenv('REPORT_HEARTBEAT_SECONDS', 60))
+
+FINISHED_STATUSES = ('Done', 'Failed')
+
+
+class ReportError(ValueError):
+    pass
+
+
+class ReportBusy(Exception):
+    pass
+
+
+def _table_report(build_query, columns):
+    def run(cursor, params):
+        query, query_params = build_query(params)
+        # One row past the cap tells us the report was truncated without reading the rest
+        cursor.execute(f"{query} LIMIT %s", (*query_params, REPORT_MAX_ROWS + 1))
+        rows = cursor.fetchall()
+        return {'columns': columns, 'rows': [[row[column] for column in columns] for row in rows[:REPORT_MAX_ROWS]],
+                'row_count': min(len(rows), REPORT_MAX_ROWS), 'truncated': len(rows) > REPORT_MAX_ROWS}
+    run.validate = build_query
+    return run
+
+
+def _stats_filter(params):
+    conditions, query_params = [], []
+    start = export.parse_date(params.get('from'), 'from')
+    end = export.parse_date(params.get('to'), 'to')
+    if start:
+        conditions.append("wr.request_date >= %s")
+        query_params.append(start)
+    if end:
+        conditions.append("wr.request_date <= %s")
+        query_params.append(end)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    return f"{work_requests_table(wants_history(params))} wr", where, tuple(query_params)
+
+
+def stats_report(cursor, params):
+    """Work request totals by status, skill and city plus account counts.
+
+    Filters: from/to on request_date, include_history.
+    """
+    source, where, query_params = _stats_filter(params)
+    cursor.execute(f"""SELECT wr.status, COUNT(*) AS requests, SUM(wr.amount) AS amount
+                       FROM {source} {where} GROUP BY wr.status ORDER BY wr.status""", query_params)
+    by_status = cursor.fetchall()
+    cursor.execute(f"""SELECT st.skill_name, COUNT(*) AS requests,
+                       SUM(CASE WHEN wr.status = 'Completed' THEN 1 ELSE 0 END) AS completed
+                       FROM {source} LEFT JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+                       {where} GROUP BY st.skill_name ORDER BY requests DESC""", query_params)
+    by_skill = cursor.fetchall()
+    cursor.execute(f"""SELECT wr.city, COUNT(*) AS requests FROM {source} {where}
+                       GROUP BY wr.city ORDER BY requests DESC LIMIT 20""", query_params)
+    top_cities = cursor.fetchall()
+    cursor.execute("SELECT COUNT(*) AS users FROM User WHERE deleted_at IS NULL")
+    users = cursor.fetchone()['users']
+    cursor.execute("""SELECT available_status, COUNT(*) AS workers, SUM(rating_sum) AS rating_sum,
+                      SUM(rating_count) AS rating_count
+                      FROM Skill_Worker WHERE deleted_at IS NULL GROUP BY available_status""")
+    worker_rows = cursor.fetchall()
+    rating_sum = sum(row['rating_sum'] or 0 for row in worker_rows)
+    rating_count = sum(row['rating_count'] or 0 for row in worker_rows)
+    return {'work_requests_by_status': by_status, 'work_requests_by_skill': by_skill, 'top_cities': top_cities,
+            'users': users,
+            'workers_by_status': {row['available_status']: row['workers'] for row in worker_rows},
+            'average_rating': round(rating_sum / rating_count, 2) if rating_count else None}
+
+
+stats_report.validate = _stats_filter
+
+REPORTS = {
+    'work_requests': _table_report(export.work_requests_query, export.WORK_REQUEST_COLUMNS),
+    'feedback': _table_report(export.feedback_query, export.FEEDBACK_COLUMNS),
+    'workers': _table_report(export.workers_query, export.WORKER_COLUMNS),
+    'stats': stats_report,
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def params_hash(report, params):
+    canonical = json.dumps({'report': report, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def validate(report, params):
+    """Raise ReportError unless `report` exists and accepts `params`."""
+    if report not in REPORTS:
+        raise ReportError(f"report must be one of {', '.join(sorted(REPORTS))}")
+    if not isinstance(params, dict):
+        raise ReportError("params must be an object")
+    try:
+        REPORTS[report].validate(params)
+    except export.ExportError as e:
+        raise ReportError(str(e))
+
+
+def _public(job, include_result=False):
+    job = dict(job)
+    job.pop('params_hash', None)
+    job['params'] = json.loads(job['params']) if job['params'] else {}
+    result = job.pop('result', None)
+    if include_result:
+        job['result'] = json.loads(result) if result else None
+    return job
+
+
+def get_job(cursor, job_id, include_result=False):
+    cursor.execute("SELECT * FROM Report_Job WHERE job_id = %s AND expires_at > NOW()", (job_id,))
+    job = cursor.fetchone()
+    return _public(job, include_result) if job else None
+
+
+def list_jobs(cursor, limit=100):
+    cursor.execute("""SELECT job_id, report, params, status, error, row_count, created_at, started_at,
+                      finished_at, expires_at FROM Report_Job WHERE expires_at > NOW()
+                      ORDER BY job_id DESC LIMIT %s""", (limit,))
+    return [_public(job) for job in cursor.fetchall()]
+
+
+def expire_jobs(cursor):
+    """Drop expired finished jobs and fail the ones abandoned by a dead process.
+
+    Queued and Running jobs are only removed once they have been failed here.
+    """
+    cursor.execute("DELETE FROM Report_Job WHERE status IN ('Done', 'Failed') AND expires_at <= NOW()")
+    cursor.execute("""UPDATE Report_Job SET status = 'Failed', error = 'Abandoned by its worker process',
+                      finished_at = NOW(), expires_at = NOW() + INTERVAL %s SECOND
+                      WHERE status IN ('Queued', 'Running') AND updated_at < NOW() - INTERVAL %s MINUTE""",
+                   (REPORT_RESULT_TTL_SECONDS, REPORT_STALE_MINUTES))
+
+
+def run_job(job_id, report, params):
+    """Execute one job on the calling thread and store its result."""
+    connection = create_connection()
+    if connection is None:
+        print(f"Report job {job_id} could not start: database connection failed")
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""UPDATE Report_Job SET status = 'Running', started_at = NOW(), updated_at = NOW(),
+                          expires_at = NOW() + INTERVAL %s SECOND WHERE job_id = %s""",
+                       (REPORT_RESULT_TTL_SECONDS, job_id))
+        connection.commit()
+        started = time.perf_counter()
+        # Reports read through their own connection, from a replica when one is configured
+        reader = create_connection(readonly=True)
+        if reader is None:
+            raise RuntimeError("Database connection failed")
+        reader_cursor = reader.cursor()
+        try:
+            result = REPORTS[report](reader_cursor, params)
+        finally:
+            reader_cursor.close()
+            reader.close()
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        cursor.execute("""UPDATE Report_Job SET status = 'Done', result = %s, row_count = %s, duration_ms = %s,
+                          finished_at = NOW(), updated_at = NOW(),
+                          expires_at = NOW() + INTERVAL %s SECOND WHERE job_id = %s""",
+                       (json.dumps(result, default=_json_default), result.get('row_count'), duration_ms,
+                        REPORT_RESULT_TTL_SECONDS, job_id))
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        cursor.execute("""UPDATE Report_Job SET status = 'Failed', error = %s, finished_at = NOW(), updated_at = NOW(),
+                          expires_at = NOW() + INTERVAL %s SECOND WHERE job_id = %s""",
+                       (str(e), REPORT_RESULT_TTL_SECONDS, job_id))
+        connection.commit()
+        print(f"Report job {job_id} failed: {e}")
+    finally:
+        cursor.close()
+        connection.close()
+
+
+class ReportRunner:
+    """Per-process thread pool running report jobs. Recreated after fork.
+
+    A heartbeat thread touches updated_at on every job the process holds, queued
+    or running, so expire_jobs only fails the jobs of a process that died.
+    """
+
+    def __init__(self, workers=REPORT_WORKERS, max_queued=REPORT_MAX_QUEUED,
+                 heartbeat_seconds=REPORT_HEARTBEAT_SECONDS):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.heartbeat_seconds = heartbeat_seconds
+        self._executor = None
+        self._pid = None
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._jobs = set()
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='report')
+                self._pending = self._running = 0
+                self._jobs = set()
+                threading.Thread(target=self._heartbeat, name='report-heartbeat', daemon=True).start()
+            return self._executor
+
+    def submit(self, job_id, report, params):
+        executor = self._pool()
+        with self._lock:
+            if self._pending >= self.max_queued:
+                raise ReportBusy(f"{self._pending} reports are already queued")
+            self._pending += 1
+            self._jobs.add(job_id)
+        executor.submit(self._run, job_id, report, params)
+
+    def _run(self, job_id, report, params):
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+        try:
+            run_job(job_id, report, params)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._jobs.discard(job_id)
+
+    def _heartbeat(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.heartbeat_seconds)
+            try:
+                self.touch_jobs()
+            except Exception as e:
+                print(f"Report heartbeat failed: {e}")
+
+    def touch_jobs(self):
+        """Mark this process's queued and running jobs as alive, and keep them pollable. Returns the number touched."""
+        with self._lock:
+            job_ids = sorted(self._jobs)
+        if not job_ids:
+            return 0
+        connection = create_connection(readonly=False)
+        if connection is None:
+            return 0
+        cursor = connection.cursor()
+        try:
+            placeholders = ','.join(['%s'] * len(job_ids))
+            cursor.execute(f"""UPDATE Report_Job SET updated_at = NOW(), expires_at = NOW() + INTERVAL %s SECOND
+                               WHERE status IN ('Queued', 'Running') AND job_id IN ({placeholders})""",
+                           (REPORT_RESULT_TTL_SECONDS, *job_ids))
+            connection.commit()
+            return cursor.rowcount
+        finally:
+            cursor.close()
+            connection.close()
+
+    def stats(self):
+        with self._lock:
+            return {'workers': self.workers, 'queued': self._pending, 'running': self._running,
+                    'completed': self._completed, 'max_queued': self.max_queued}
+
+
+runner = ReportRunner()
+
+
+def submit_report(connection, report, params):
+    """Create (or reuse) a job for `report` and start it. Returns (job, reused)."""
+    validate(report, params)
+    digest = params_hash(report, params)
+    cursor = connection.cursor()
+    try:
+        expire_jobs(cursor)
+        cursor.execute("""SELECT * FROM Report_Job WHERE params_hash = %s AND status != 'Failed'
+                          AND expires_at > NOW() ORDER BY job_id DESC LIMIT 1""", (digest,))
+        existing = cursor.fetchone()
+        if existing:
+            connection.commit()
+            return _public(existing), True
+        # Queued jobs get a full TTL too; finishing resets the clock for the result
+        cursor.execute("""INSERT INTO Report_Job (report, params, params_hash, status, created_at, updated_at, expires_at)
+                          VALUES (%s, %s, %s, 'Queued', NOW(), NOW(), NOW() + INTERVAL %s SECOND)""",
+                       (report, json.dumps(params, sort_keys=True, default=str), digest,
+                        REPORT_RESULT_TTL_SECONDS))
+        job_id = cursor.lastrowid
+        connection.commit()
+        try:
+            runner.submit(job_id, report, params)
+        except ReportBusy:
+            cursor.execute("DELETE FROM Report_Job WHERE job_id = %s", (job_id,))
+            connection.commit()
+            raise
+        return get_job(cursor, job_id), False
+    finally:
+        cursor.close()
+
+
+def wait_for_job(cursor, connection, job_id, wait_seconds):
+    """Poll a job until it finishes or `wait_seconds` (capped) pass. Returns the job or None."""
+    deadline = time.monotonic() + max(0.0, min(wait_seconds, REPORT_MAX_WAIT_SECONDS))
+    while True:
+        job = get_job(cursor, job_id)
+        if job is None or job['status'] in FINISHED_STATUSES or time.monotonic() >= deadline:
+            return job
+        # End the read snapshot so the next poll sees the job's progress
+        connection.rollback()
+        time.sleep(0.25)
@@ -0,0 +1,314 @@
+import contextlib
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from db import DIALECT, DatabaseUnavailable, create_connection
+
+# Periodic jobs run inside the app processes. Every gunicorn worker runs a
+# scheduler thread, but only the one holding the leader lock runs jobs: a
+# MySQL advisory lock (GET_LOCK) held on a dedicated connection, or a lease row
+# in Scheduler_Lease on SQLite. If the leader dies its lock goes with it and
+# another worker takes over within SCHEDULER_TICK_SECONDS (SQLite: once the
+# lease runs out). Jobs run one at a time on the scheduler thread; the lease is
+# renewed while a job runs and checked again before the next one, so a job
+# that outlasts SCHEDULER_LEASE_SECONDS does not let a second leader start.
+# The MySQL lock connection idles for as long as the process leads, so it does
+# not count against the DB_MAX_CONNECTIONS connection slots.
+
+SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+SCHEDULER_TICK_SECONDS = float(os.getenv('SCHEDULER_TICK_SECONDS', 5))
+SCHEDULER_LEASE_SECONDS = int(os.getenv('SCHEDULER_LEASE_SECONDS', 30))
+LOCK_NAME = 'skillhive_scheduler'
+
+CRON_FIELDS = [('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31), ('month', 1, 12), ('weekday', 0, 6)]
+
+
+class ScheduleError(ValueError):
+    pass
+
+
+def _parse_cron_field(field, low, high):
+    values = set()
+    for part in field.split(','):
+        part, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = end = int(part)
+            if step > 1:
+                end = high
+        if high == 6:
+            # Day of week: 0 and 7 are both Sunday
+            start, end = (0 if start == 7 else start), (6 if end == 7 else end)
+        if start < low or end > high or start > end or step < 1:
+            raise ScheduleError(f"Cron field '{field}' is out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day month weekday) in server local time.
+
+    Supports *, lists, ranges and steps. As in cron, when both day and weekday
+    are restricted a time matching either one is due.
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ScheduleError(f"Cron expression '{expression}' must have 5 fields")
+        try:
+            parsed = [_parse_cron_field(field, low, high) for field, (_, low, high) in zip(fields, CRON_FIELDS)]
+        except ValueError as e:
+            raise ScheduleError(f"Invalid cron expression '{expression}': {e}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = parsed
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        # Python: Monday is 0; cron: Sunday is 0
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment):
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = (candidate.year + 1, 1) if candidate.month == 12 else (candidate.year, candidate.month + 1)
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ScheduleError(f"Cron expression '{self.expression}' never matches")
+
+
+class Job:
+    def __init__(self, name, func, interval=None, cron=None, jitter=0, initial_delay=None):
+        if (interval is None) == (cron is None):
+            raise ScheduleError(f"Job {name} needs exactly one of interval or cron")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron else None
+        self.jitter = jitter
+        self.runs = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = None
+        self.last_started = None
+        self.last_result = None
+        self.last_error = None
+        now = datetime.now()
+        if initial_delay is not None:
+            self.next_run = now + timedelta(seconds=initial_delay + random.uniform(0, jitter))
+        else:
+            self.schedule_next(now)
+
+    def schedule_next(self, now):
+        # Jitter spreads jobs out so they do not all start on the same tick
+        base = now + timedelta(seconds=self.interval) if self.interval else self.cron.next_after(now)
+        self.next_run = base + timedelta(seconds=random.uniform(0, self.jitter))
+
+    def run(self):
+        self.last_started = datetime.now()
+        started = time.perf_counter()
+        try:
+            self.last_result = self.func()
+            self.last_error = None
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Scheduled job {self.name} failed: {e}")
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.runs += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.last_ms = duration_ms
+        self.schedule_next(datetime.now())
+
+    def stats(self):
+        return {'name': self.name, 'schedule': self.cron.expression if self.cron else f"every {self.interval}s",
+                'jitter_seconds': self.jitter, 'runs': self.runs, 'failures': self.failures,
+                'last_started': self.last_started.isoformat(timespec='seconds') if self.last_started else None,
+                'last_duration_ms': round(self.last_ms, 1) if self.last_ms is not None else None,
+                'avg_duration_ms': round(self.total_ms / self.runs, 1) if self.runs else None,
+                'max_duration_ms': round(self.max_ms, 1), 'last_result': self.last_result,
+                'last_error': self.last_error, 'next_run': self.next_run.isoformat(timespec='seconds')}
+
+
+class LeaderLock:
+    """Cross-process leader lock: GET_LOCK on MySQL, a lease row on SQLite."""
+
+    def __init__(self, name=LOCK_NAME, lease_seconds=SCHEDULER_LEASE_SECONDS):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._connection = None
+
+    def acquire(self):
+        """Return True if this process is (still) the leader."""
+        try:
+            if DIALECT == 'mysql':
+                return self._advisory_lock()
+            return self._lease()
+        except DatabaseUnavailable:
+            self.release()
+            return False
+        except Exception as e:
+            print(f"Scheduler leader check failed: {e}")
+            self.release()
+            return False
+
+    def _advisory_lock(self):
+        # The lock belongs to the session, so the connection stays open while we lead
+        if self._connection is None:
+            connection = create_connection(readonly=False)
+            if connection is None:
+                return False
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT GET_LOCK(%s, 0) AS acquired", (self.name,))
+                acquired = cursor.fetchone()['acquired'] == 1
+            finally:
+                cursor.close()
+            if not acquired:
+                connection.close()
+                return False
+            # Give the slot back now rather than hold one of the request bulkhead's slots while we lead
+            connection.slot.release()
+            self._connection = connection
+            return True
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("SELECT IS_USED_LOCK(%s) = CONNECTION_ID() AS mine", (self.name,))
+            mine = cursor.fetchone()['mine'] == 1
+        finally:
+            cursor.close()
+        if not mine:
+            self.release()
+        return mine
+
+    def _lease(self):
+        connection = create_connection(readonly=False)
+        if connection is None:
+            return False
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""INSERT IGNORE INTO Scheduler_Lease (name, holder, expires_at)
+                              VALUES (%s, NULL, NOW())""", (self.name,))
+            cursor.execute("""UPDATE Scheduler_Lease SET holder = %s, expires_at = NOW() + INTERVAL %s SECOND
+                              WHERE name = %s AND (holder = %s OR holder IS NULL OR expires_at < NOW())""",
+                           (self.holder, self.lease_seconds, self.name, self.holder))
+            leader = cursor.rowcount == 1
+            connection.commit()
+            return leader
+        finally:
+            cursor.close()
+            connection.close()
+
+    @contextlib.contextmanager
+    def renewing(self):
+        """Keep the SQLite lease from running out while the body runs (a MySQL lock lasts as long as its session)."""
+        if DIALECT == 'mysql':
+            yield
+            return
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(self.lease_seconds / 3):
+                if not self.acquire():
+                    print(f"Scheduler {self.holder} lost its lease while running a job")
+
+        thread = threading.Thread(target=renew, name='scheduler-lease', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def release(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class Scheduler:
+    def __init__(self, tick=SCHEDULER_TICK_SECONDS, enabled=SCHEDULER_ENABLED):
+        self.tick = tick
+        self.enabled = enabled
+        self.jobs = {}
+        self.is_leader = False
+        self.lock = LeaderLock()
+        self._thread = None
+        self._pid = None
+        self._guard = threading.Lock()
+
+    def register(self, name, func, interval=None, cron=None, jitter=0, initial_delay=None):
+        """Add a job: `func()` runs every `interval` seconds or on a `cron` expression."""
+        self.jobs[name] = Job(name, func, interval, cron, jitter, initial_delay)
+
+    # Threads and the lock connection do not survive fork, so start per pid
+    def ensure_started(self):
+        if not self.enabled or not self.jobs or self._pid == os.getpid():
+            return
+        with self._guard:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.lock = LeaderLock(self.lock.name, self.lock.lease_seconds)
+            self.is_leader = False
+            self._thread = threading.Thread(target=self._run, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            leader = self.lock.acquire()
+            if leader != self.is_leader:
+                print(f"Scheduler {self.lock.holder} {'is now' if leader else 'is no longer'} the leader")
+                self.is_leader = leader
+            if leader:
+                self.run_due_jobs()
+            time.sleep(self.tick)
+
+    def run_due_jobs(self, now=None):
+        now = now or datetime.now()
+        ran = False
+        for job in sorted(self.jobs.values(), key=lambda job: job.next_run):
+            if job.next_run > now:
+                continue
+            # The lease was checked on this tick; after a job, check it again
+            if ran and not self.lock.acquire():
+                self.is_leader = False
+                return
+            with self.lock.renewing():
+                job.run()
+            ran = True
+
+    def stats(self):
+        return {'enabled': self.enabled, 'leader': self.is_leader, 'holder': self.lock.holder,
+                'tick_seconds': self.tick, 'jobs': [job.stats() for job in self.jobs.values()]}
+
+
+scheduler = Scheduler()
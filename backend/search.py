@@ -0,0 +1,272 @@
+import base64
+import json
+import re
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+# Full-text search over work requests and worker profiles. MySQL uses the
+# FULLTEXT indexes created in db.init_db; SQLite uses the FTS5 tables from
+# db_sqlite.init_db. Both rank higher-is-better and paginate with an opaque
+# cursor over (score, id). Scores are rounded to SCORE_DECIMALS in SQL and the
+# cursor carries that value as an exact decimal string, so the next page
+# compares against the same number the database sorted by; comparing raw
+# floats that went through the driver and JSON skips or repeats rows. Keyset
+# paging spares the database the skipped rows of an OFFSET, but every page
+# still scores and sorts all matches, so a page costs in proportion to how
+# many rows match the query, not how deep it is.
+# filter_workers is the structured worker directory and pages the same way
+# over (sort value, worker_id); its sort values are indexed columns.
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+SCORE_DECIMALS = 6
+
+WORK_REQUEST_MATCH = "MATCH(wr.description, wr.area, wr.street_name) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+WORKER_MATCH = "MATCH(sw.first_name, sw.last_name, sw.area, sw.street_name) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+class SearchError(ValueError):
+    pass
+
+
+def encode_cursor(value, row_id):
+    # str() is exact for Decimal and int and round-trips a float
+    raw = json.dumps([str(value), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(value, dialect='mysql'):
+    """(sort value, id) from a cursor. The value is a Decimal, or a float on SQLite."""
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(value.encode()))
+        sort_value = Decimal(sort_value)
+        if not sort_value.is_finite():
+            raise InvalidOperation
+        # SQLite compares a text parameter with an expression as text, so bind a number
+        return (float(sort_value) if dialect == 'sqlite' else sort_value), int(row_id)
+    except Exception:
+        raise SearchError("Invalid cursor")
+
+
+def _rounded_score(score, dialect):
+    if dialect == 'sqlite':
+        return f"ROUND({score}, {SCORE_DECIMALS})"
+    # A DECIMAL reaches the client exactly; a FLOAT is sent with a few digits
+    return f"CAST({score} AS DECIMAL(20, {SCORE_DECIMALS}))"
+
+
+def fts5_query(text):
+    """Quote each term so user input can never be parsed as FTS5 syntax."""
+    tokens = _TOKEN.findall(text)
+    return ' OR '.join(f'"{token}"' for token in tokens)
+
+
+def _parse_date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise SearchError(f"{name} must be a date in YYYY-MM-DD format")
+
+
+def _limit(args):
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise SearchError("limit must be a whole number")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _query_text(args):
+    text = (args.get('q') or '').strip()
+    if not _TOKEN.search(text):
+        raise SearchError("q is required")
+    return text
+
+
+def _page(cursor, sql, params, limit, id_column, sort_column='score'):
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+    rows = [dict(row) for row in rows]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[sort_column], last[id_column])
+    return {'results': rows, 'next_cursor': next_cursor}
+
+
+def _score_page(cursor, sql, params, limit, id_column):
+    page = _page(cursor, sql, params, limit, id_column)
+    for row in page['results']:
+        row['score'] = float(row['score'])
+    return page
+
+
+def search_work_requests(cursor, args, dialect='mysql'):
+    """Search Work_Request.description/area/street_name.
+
+    Filters: status, skill_type_id, city, from/to (request_date). Pagination: limit, cursor.
+    """
+    text = _query_text(args)
+    limit = _limit(args)
+    conditions, filter_params = ["u.deleted_at IS NULL"], []
+    if args.get('status'):
+        conditions.append("wr.status = %s")
+        filter_params.append(args.get('status'))
+    if args.get('skill_type_id'):
+        conditions.append("wr.skill_type_id = %s")
+        filter_params.append(args.get('skill_type_id'))
+    if args.get('city'):
+        conditions.append("wr.city = %s")
+        filter_params.append(args.get('city'))
+    if args.get('from'):
+        conditions.append("wr.request_date >= %s")
+        filter_params.append(_parse_date(args.get('from'), 'from'))
+    if args.get('to'):
+        conditions.append("wr.request_date <= %s")
+        filter_params.append(_parse_date(args.get('to'), 'to'))
+
+    columns = """wr.request_id, wr.description, wr.status, wr.request_date, wr.city, wr.pincode, wr.area,
+                 wr.street_name, wr.skill_type_id, st.skill_name, wr.user_id, u.first_name AS user_first_name,
+                 u.last_name AS user_last_name, wr.worker_id"""
+    if dialect == 'sqlite':
+        score = _rounded_score("-bm25(Work_Request_FTS)", dialect)
+        source = """Work_Request_FTS
+                    JOIN Work_Request wr ON wr.request_id = Work_Request_FTS.rowid"""
+        match, match_params = "Work_Request_FTS MATCH %s", [fts5_query(text)]
+        score_params = []
+    else:
+        score = _rounded_score(WORK_REQUEST_MATCH, dialect)
+        source = "Work_Request wr"
+        match, match_params = WORK_REQUEST_MATCH, [text]
+        score_params = [text]
+
+    params = score_params + match_params + filter_params
+    if args.get('cursor'):
+        last_score, last_id = decode_cursor(args.get('cursor'), dialect)
+        conditions.append(f"({score} < %s OR ({score} = %s AND wr.request_id < %s))")
+        params += score_params + [last_score] + score_params + [last_score, last_id]
+    sql = f"""SELECT {columns}, {score} AS score
+              FROM {source}
+              JOIN Skill_Type st ON wr.skill_type_id = st.skill_type_id
+              JOIN User u ON wr.user_id = u.user_id
+              WHERE {match} AND {' AND '.join(conditions)}
+              ORDER BY score DESC, wr.request_id DESC
+              LIMIT %s"""
+    return _score_page(cursor, sql, params + [limit + 1], limit, 'request_id')
+
+
+def search_workers(cursor, args, dialect='mysql'):
+    """Search worker names, area and street.
+
+    Filters: skill_type_id, city, status (available_status). Pagination: limit, cursor.
+    """
+    text = _query_text(args)
+    limit = _limit(args)
+    conditions, filter_params = ["sw.deleted_at IS NULL"], []
+    if args.get('skill_type_id'):
+        conditions.append("EXISTS (SELECT 1 FROM Worker_Skills ws WHERE ws.worker_id = sw.worker_id "
+                          "AND ws.skill_type_id = %s)")
+        filter_params.append(args.get('skill_type_id'))
+    if args.get('city'):
+        conditions.append("sw.city = %s")
+        filter_params.append(args.get('city'))
+    if args.get('status'):
+        conditions.append("sw.available_status = %s")
+        filter_params.append(args.get('status'))
+
+    columns = """sw.worker_id, sw.login_id, sw.first_name, sw.last_name, sw.city, sw.pincode, sw.area,
+                 sw.street_name, sw.experience_years, sw.available_status"""
+    if dialect == 'sqlite':
+        score = _rounded_score("-bm25(Skill_Worker_FTS)", dialect)
+        source = """Skill_Worker_FTS
+                    JOIN Skill_Worker sw ON sw.worker_id = Skill_Worker_FTS.rowid"""
+        match, match_params = "Skill_Worker_FTS MATCH %s", [fts5_query(text)]
+        score_params = []
+    else:
+        score = _rounded_score(WORKER_MATCH, dialect)
+        source = "Skill_Worker sw"
+        match, match_params = WORKER_MATCH, [text]
+        score_params = [text]
+
+    params = score_params + match_params + filter_params
+    if args.get('cursor'):
+        last_score, last_id = decode_cursor(args.get('cursor'), dialect)
+        conditions.append(f"({score} < %s OR ({score} = %s AND sw.worker_id < %s))")
+        params += score_params + [last_score] + score_params + [last_score, last_id]
+    sql = f"""SELECT {columns}, {score} AS score
+              FROM {source}
+              WHERE {match} AND {' AND '.join(conditions)}
+              ORDER BY score DESC, sw.worker_id DESC
+              LIMIT %s"""
+    return _score_page(cursor, sql, params + [limit + 1], limit, 'worker_id')
+
+
+# Sort options for the worker directory. Each sorts descending with worker_id
+# as the tie-breaker.
+WORKER_SORTS = {
+    'rating': "sw.avg_rating",
+    'experience': "COALESCE(sw.experience_years, 0)",
+    'newest': "sw.worker_id",
+}
+
+
+def filter_workers(cursor, args, online_ids=None, dialect='mysql'):
+    """Worker directory filtered on indexed columns.
+
+    Filters: skill_type_id, city, pincode, status (available_status), min_rating,
+    min_experience. Sort: rating (default), experience, newest. Pagination: limit, cursor.
+    `online_ids`, when given, limits the results to those worker ids.
+    """
+    limit = _limit(args)
+    sort = args.get('sort') or 'rating'
+    if sort not in WORKER_SORTS:
+        raise SearchError(f"sort must be one of {', '.join(WORKER_SORTS)}")
+    sort_value = WORKER_SORTS[sort]
+
+    conditions, params = ["sw.deleted_at IS NULL"], []
+    if args.get('skill_type_id'):
+        conditions.append("EXISTS (SELECT 1 FROM Worker_Skills ws WHERE ws.worker_id = sw.worker_id "
+                          "AND ws.skill_type_id = %s)")
+        params.append(args.get('skill_type_id'))
+    if args.get('city'):
+        conditions.append("sw.city = %s")
+        params.append(args.get('city'))
+    if args.get('pincode'):
+        conditions.append("sw.pincode = %s")
+        params.append(args.get('pincode'))
+    if args.get('status'):
+        conditions.append("sw.available_status = %s")
+        params.append(args.get('status'))
+    try:
+        if args.get('min_rating'):
+            conditions.append("sw.avg_rating >= %s")
+            params.append(float(args.get('min_rating')))
+        if args.get('min_experience'):
+            conditions.append("sw.experience_years >= %s")
+            params.append(int(args.get('min_experience')))
+    except ValueError:
+        raise SearchError("min_rating and min_experience must be numbers")
+    if online_ids is not None:
+        if not online_ids:
+            return {'results': [], 'next_cursor': None}
+        conditions.append(f"sw.worker_id IN ({','.join(['%s'] * len(online_ids))})")
+        params += sorted(online_ids)
+    if args.get('cursor'):
+        last_value, last_id = decode_cursor(args.get('cursor'), dialect)
+        conditions.append(f"({sort_value} < %s OR ({sort_value} = %s AND sw.worker_id < %s))")
+        params += [last_value, last_value, last_id]
+
+    sql = f"""SELECT sw.worker_id, sw.login_id, sw.first_name, sw.last_name, sw.city, sw.pincode, sw.area,
+              sw.experience_years, sw.available_status, sw.avg_rating, sw.rating_count,
+              {sort_value} AS sort_value
+              FROM Skill_Worker sw
+              WHERE {' AND '.join(conditions)}
+              ORDER BY sort_value DESC, sw.worker_id DESC
+              LIMIT %s"""
+    page = _page(cursor, sql, params + [limit + 1], limit, 'worker_id', 'sort_value')
+    for row in page['results']:
+        del row['sort_value']
+    return page
@@ -0,0 +1,6 @@
+# Offline capacity simulator: replays or resamples work request arrivals
+# against a worker population and an assignment policy, and reports
+# time-to-accept and the API load the clients would generate.
+#
+#   python -m simulator --source db --days 30 --workers 300 --policy both
+#   python -m simulator --source synthetic --requests-per-day 800 --scale 2 --policy dispatch
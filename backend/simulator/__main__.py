@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from simulator import arrivals, engine, report, workforce
+
+
+def load_from_db(backend, weeks, rng, **shifts):
+    # db.py reads DB_BACKEND when it is first imported
+    if backend:
+        os.environ['DB_BACKEND'] = backend
+    from db import create_connection
+    connection = create_connection(readonly=True)
+    if connection is None:
+        raise SystemExit('Database connection failed')
+    cursor = connection.cursor()
+    try:
+        return arrivals.load_history(cursor, weeks), workforce.load_workforce(cursor, rng, **shifts)
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m simulator',
+                                     description='Simulate request assignment and API load offline')
+    parser.add_argument('--source', choices=['db', 'synthetic'], default='db',
+                        help='Arrivals and workers from the database, or a synthetic workload')
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help='DB_BACKEND for --source db')
+    parser.add_argument('--mode', choices=['resample', 'replay'], default='resample',
+                        help='Draw arrivals from the historical profile, or replay the historical requests')
+    parser.add_argument('--history-weeks', type=int, default=8)
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply the arrival rate, e.g. 2 for peak season')
+    parser.add_argument('--requests-per-day', type=float, default=400, help='Synthetic arrivals per day')
+    parser.add_argument('--skills', type=int, default=12, help='Synthetic skill types')
+    parser.add_argument('--pincodes', type=int, default=40, help='Synthetic pincodes')
+    parser.add_argument('--workers', type=int,
+                        help='Worker head count (default: the database workers, or 300 for synthetic)')
+    parser.add_argument('--skills-per-worker', type=int, default=2)
+    parser.add_argument('--work-days', type=int, default=6)
+    parser.add_argument('--policy', choices=list(engine.POLICIES) + ['both'], default='pull')
+    parser.add_argument('--reach', choices=workforce.REACHES, help='How far from home a worker takes jobs')
+    parser.add_argument('--poll-seconds', type=float, help='Pull: how often an idle worker refreshes the list')
+    parser.add_argument('--pull-order', choices=['newest', 'oldest'])
+    parser.add_argument('--accept-probability', type=float)
+    parser.add_argument('--offer-reply-seconds', type=float, help='Dispatch: mean time to answer an offer')
+    parser.add_argument('--service-hours', type=float, help='Median job length')
+    parser.add_argument('--shift-hours', type=float)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the results as JSON')
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    shifts = {'work_days': args.work_days}
+    if args.source == 'db':
+        history, workers = load_from_db(args.backend, args.history_weeks, rng, **shifts)
+        profile = arrivals.profile_from_history(history, args.history_weeks)
+        if args.mode == 'replay':
+            stream = arrivals.replay(history, args.days, args.scale, profile, rng)
+        else:
+            stream = arrivals.resample(profile, args.days, args.scale, rng)
+        if args.workers is not None:
+            workers = workers.resized(args.workers, rng, **shifts)
+        print(f"{len(history)} historical requests over {args.history_weeks} weeks, {len(workers)} workers")
+    else:
+        if args.mode == 'replay':
+            parser.error('--mode replay needs --source db')
+        pincodes = [f"{600 + i % 8:03d}{i:03d}" for i in range(args.pincodes)]
+        profile = arrivals.synthetic_profile(args.requests_per_day, list(range(1, args.skills + 1)), pincodes, rng)
+        stream = arrivals.resample(profile, args.days, args.scale, rng)
+        workers = workforce.synthetic_workforce(args.workers or 300, args.skills_per_worker, stream, rng, **shifts)
+    print(f"Simulating {len(stream)} requests over {args.days:g} days")
+
+    policies = engine.POLICIES if args.policy == 'both' else (args.policy,)
+    summaries = []
+    for policy in policies:
+        config = engine.Config(policy=policy, reach=args.reach, poll_seconds=args.poll_seconds,
+                               pull_order=args.pull_order, accept_probability=args.accept_probability,
+                               offer_reply_seconds=args.offer_reply_seconds, service_hours=args.service_hours,
+                               shift_hours=args.shift_hours)
+        started = time.perf_counter()
+        # Same seed per policy so both see the same dice
+        simulation = engine.Simulation(config, stream, workers, args.days, np.random.default_rng(args.seed)).run()
+        summaries.append(report.summarize(simulation, time.perf_counter() - started))
+    report.print_report(summaries)
+
+    if args.output:
+        settings = {key: value for key, value in vars(args).items() if key != 'output'}
+        settings['simulation'] = config.to_dict()
+        report.save(summaries, settings, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import math
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+# Arrival streams for the simulator. A profile holds the expected arrivals per
+# hour-of-week and the (skill, pincode) mix; `resample` draws a
+# non-homogeneous Poisson stream from it, `replay` maps historical requests
+# onto simulation time. Times are seconds from a Monday 00:00.
+
+HOURS_PER_WEEK = 168
+HOUR = 3600.0
+
+# Share of a day's requests per hour for synthetic profiles: quiet nights, a morning and an evening peak
+SYNTHETIC_DAY_SHAPE = np.array([0.2, 0.1, 0.1, 0.1, 0.2, 0.5, 1.2, 2.5, 4.0, 5.0, 5.0, 4.5,
+                                4.0, 3.5, 3.5, 3.5, 4.0, 4.5, 5.0, 4.5, 3.0, 2.0, 1.0, 0.5])
+
+
+class Arrivals:
+    """Sorted arrival times with the skill and pincode of each request."""
+
+    def __init__(self, times, skills, pincodes):
+        order = np.argsort(times, kind='stable')
+        self.times = np.asarray(times, np.float64)[order]
+        self.skills = np.asarray(skills, np.int64)[order]
+        self.pincodes = np.asarray(pincodes, object)[order]
+
+    def __len__(self):
+        return len(self.times)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def load_history(cursor, weeks):
+    """Work requests of the last `weeks` weeks as dicts with skill, pincode and timestamps."""
+    # Imported here so the simulator runs on synthetic profiles without the app's database settings
+    from archive import work_requests_table
+    start = date.today() - timedelta(weeks=weeks)
+    cursor.execute(f"""SELECT skill_type_id, pincode, request_date, created_at FROM {work_requests_table(True)} wr
+                       WHERE (request_date >= %s OR created_at >= %s) AND skill_type_id IS NOT NULL""",
+                   (start, start))
+    rows = cursor.fetchall()
+    for row in rows:
+        row['request_date'] = _as_date(row['request_date'])
+    return [row for row in rows if row['request_date'] or row['created_at']]
+
+
+def profile_from_history(rows, weeks):
+    """Hour-of-week arrival rates and the (skill, pincode) mix of historical requests.
+
+    Rates are averaged over the weeks the rows actually span, at most `weeks`.
+    Requests without created_at count evenly across the hours of their weekday.
+    """
+    if rows:
+        days = [_as_date(row['created_at'] or row['request_date']) for row in rows]
+        weeks = min(weeks, ((max(days) - min(days)).days + 1) / 7)
+    hourly = np.zeros(HOURS_PER_WEEK)
+    for row in rows:
+        created = row['created_at']
+        if created:
+            hourly[created.weekday() * 24 + created.hour] += 1
+        else:
+            weekday = row['request_date'].weekday()
+            hourly[weekday * 24:weekday * 24 + 24] += 1 / 24
+    mix = {}
+    for row in rows:
+        key = (row['skill_type_id'], (row['pincode'] or '').strip())
+        mix[key] = mix.get(key, 0) + 1
+    keys = list(mix)
+    counts = np.array([mix[key] for key in keys], np.float64)
+    return {'hourly_rate': hourly / max(weeks, 1 / 7), 'mix': keys,
+            'mix_weights': counts / counts.sum() if len(counts) else counts}
+
+
+def synthetic_profile(requests_per_day, skill_ids, pincodes, rng):
+    """A daytime-peaked weekly profile with a skewed skill and pincode mix."""
+    day = SYNTHETIC_DAY_SHAPE / SYNTHETIC_DAY_SHAPE.sum() * requests_per_day
+    # Saturday a little busier, Sunday quieter
+    week = np.concatenate([day * factor for factor in (1.0, 1.0, 1.0, 1.0, 1.05, 1.2, 0.8)])
+    skill_weights = rng.dirichlet(np.ones(len(skill_ids)) * 2)
+    pincode_weights = rng.dirichlet(np.ones(len(pincodes)))
+    keys = [(skill, pincode) for skill in skill_ids for pincode in pincodes]
+    weights = np.outer(skill_weights, pincode_weights).ravel()
+    return {'hourly_rate': week, 'mix': keys, 'mix_weights': weights / weights.sum()}
+
+
+def resample(profile, days, scale, rng):
+    """Poisson arrivals at `scale` times the profile's rates for `days` days."""
+    hours = int(days * 24)
+    rates = np.resize(profile['hourly_rate'], hours) * scale
+    counts = rng.poisson(rates)
+    total = int(counts.sum())
+    times = (np.repeat(np.arange(hours), counts) + rng.random(total)) * HOUR
+    if not profile['mix']:
+        return Arrivals(np.zeros(0), np.zeros(0), np.zeros(0))
+    picks = rng.choice(len(profile['mix']), size=total, p=profile['mix_weights'])
+    skills = np.fromiter((profile['mix'][i][0] for i in picks), np.int64, total)
+    pincodes = np.array([profile['mix'][i][1] for i in picks], object)
+    return Arrivals(times, skills, pincodes)
+
+
+def replay(rows, days, scale, profile, rng):
+    """`days` days of historical requests up to the latest, each copied Poisson(`scale`) times.
+
+    The window starts on the Monday before, so simulation hours line up with
+    hours of the week, and may leave out the last few days. Requests without created_at get an hour drawn from the profile's hours
+    of that weekday.
+    """
+    if not rows:
+        return Arrivals(np.zeros(0), np.zeros(0), np.zeros(0))
+    latest = max(_as_date(row['created_at'] or row['request_date']) for row in rows)
+    first_day = latest + timedelta(days=1) - timedelta(days=math.ceil(days))
+    origin = datetime.combine(first_day - timedelta(days=first_day.weekday()), datetime.min.time())
+    window_end = days * 24 * HOUR
+    times, skills, pincodes = [], [], []
+    for row in rows:
+        day = _as_date(row['created_at'] or row['request_date'])
+        if not origin.date() <= day < origin.date() + timedelta(days=math.ceil(days)):
+            continue
+        copies = rng.poisson(scale) if scale != 1 else 1
+        for _ in range(copies):
+            if row['created_at']:
+                moment = (row['created_at'] - origin).total_seconds()
+                if copies > 1:
+                    moment += rng.uniform(-HOUR, HOUR)
+            else:
+                weekday = row['request_date'].weekday()
+                hours = profile['hourly_rate'][weekday * 24:weekday * 24 + 24]
+                hour = rng.choice(24, p=hours / hours.sum()) if hours.sum() else rng.integers(24)
+                day_start = datetime.combine(row['request_date'], datetime.min.time())
+                moment = (day_start - origin).total_seconds() + (hour + rng.random()) * HOUR
+            times.append(min(max(moment, 0.0), window_end - 1))
+            skills.append(row['skill_type_id'])
+            pincodes.append((row['pincode'] or '').strip())
+    return Arrivals(np.array(times), np.array(skills), np.array(pincodes, object))
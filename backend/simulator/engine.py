@@ -0,0 +1,355 @@
+import heapq
+import math
+import os
+
+import numpy as np
+
+from simulator.workforce import area
+
+# Discrete-event model of request assignment. Events sit in one heap ordered
+# by time; each worker goes online for a shift on its working days and is
+# idle, holding an offer, or busy with a job. Two assignment policies:
+#
+#   pull      the app today: idle workers refresh the available list every
+#             poll_seconds and accept a listed request with accept_probability
+#   dispatch  the server offers each request to the idle matching worker that
+#             has waited longest (same pincode first); the worker replies
+#             after a random delay and a declined request goes to the next one
+#
+# Polls only become events when there is something for the worker to take;
+# empty refreshes are counted analytically from idle time for the API load.
+
+ARRIVE, SHIFT_START, SHIFT_END, POLL, REPLY, DONE, EXPIRE = range(7)
+PENDING, OFFERED, ACCEPTED, EXPIRED = range(4)
+DAY = 86400.0
+
+POLICIES = ('pull', 'dispatch')
+
+# API calls the clients make at each simulated event
+CLIENT_CALLS = {
+    'request': ['GET /api/skill-types', 'POST /api/work-requests', 'GET /api/work-requests/user/<id>'],
+    'login': ['POST /api/login', 'GET /api/workers/<id>', 'GET /api/work-requests/worker/<id>',
+              'GET /api/notifications/worker/<id>'],
+    'offer': ['GET /api/notifications/worker/<id>'],
+    'accept': ['POST /api/work-requests/<id>/accept', 'GET /api/notifications/user/<id>',
+               'GET /api/work-requests/user/<id>'],
+    'decline': ['POST /api/work-requests/<id>/decline'],
+    'complete': ['POST /api/work-requests/<id>/complete', 'GET /api/work-requests/user/<id>'],
+    'feedback': ['POST /api/feedback'],
+    'expire': ['GET /api/notifications/user/<id>'],
+}
+POLL_ENDPOINT = 'GET /api/work-requests/available/<id>'
+HEARTBEAT_ENDPOINT = 'POST /api/workers/<id>/heartbeat'
+
+
+class Config:
+    """Assignment policy and client behaviour. Unset (None) overrides keep the defaults."""
+
+    def __init__(self, **overrides):
+        self.policy = 'pull'
+        self.reach = 'district'
+        self.poll_seconds = 120.0
+        # Order of the available list; the endpoint sorts by request_date descending
+        self.pull_order = 'newest'
+        self.accept_probability = 0.7
+        self.offer_reply_seconds = 90.0
+        self.service_hours = 2.0
+        self.service_sigma = 0.6
+        self.shift_hours = 9.0
+        self.heartbeat_seconds = float(os.getenv('HEARTBEAT_INTERVAL_SECONDS', 30))
+        self.expire_days = float(os.getenv('STALE_REQUEST_DAYS', 14))
+        self.feedback_rate = 0.5
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise TypeError(f"Unknown simulator setting: {name}")
+            if value is not None:
+                setattr(self, name, value)
+        if self.policy not in POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(POLICIES)}")
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def _hourly_span_counts(starts, ends, period, hours):
+    """Calls per hour made every `period` seconds during each [start, end) span."""
+    edges = np.arange(hours + 1) * 3600.0
+    if not len(starts):
+        return np.zeros(hours)
+    starts, ends = np.sort(starts), np.sort(ends)
+    start_sums = np.concatenate([[0.0], np.cumsum(starts)])
+    end_sums = np.concatenate([[0.0], np.cumsum(ends)])
+    # Time covered by all spans up to each edge: sum of (edge - start) minus sum of (edge - end)
+    started = np.searchsorted(starts, edges)
+    ended = np.searchsorted(ends, edges)
+    covered = (edges * started - start_sums[started]) - (edges * ended - end_sums[ended])
+    return np.diff(covered) / period
+
+
+class Simulation:
+    def __init__(self, config, arrivals, workforce, days, rng):
+        self.config = config
+        self.arrivals = arrivals
+        self.workforce = workforce
+        self.horizon = days * DAY
+        self.rng = rng
+        self.hours = int(math.ceil(days * 24))
+        reach = config.reach
+        self.request_keys = [(int(skill), area(pincode, reach))
+                             for skill, pincode in zip(arrivals.skills, arrivals.pincodes)]
+        self.worker_keys = [[(skill, area(pincode, reach)) for skill in skills]
+                            for skills, pincode in zip(workforce.skills, workforce.pincodes)]
+        count = len(workforce)
+        self.state = [PENDING] * len(arrivals)
+        self.accepted_at = [None] * len(arrivals)
+        self.declined = {}
+        self.online = [False] * count
+        self.busy = [False] * count
+        self.reserved = [False] * count
+        self.poll_at = [None] * count
+        self.online_since = [0.0] * count
+        self.idle_since = [0.0] * count
+        self.phase = rng.uniform(0, config.poll_seconds, count) if count else np.zeros(0)
+        # (skill, area) -> idle worker ids, and -> heap of pending request ids (negated for newest-first)
+        self.idle = {}
+        self.pending = {}
+        self.newest_first = config.policy == 'pull' and config.pull_order == 'newest'
+        self.online_spans = []
+        self.idle_spans = []
+        self.busy_seconds = 0.0
+        self.calls = {}
+        self.counters = {'events': 0, 'offers': 0, 'declines': 0, 'completed': 0}
+        self._events = []
+        self._seq = 0
+
+    def _push(self, when, kind, *payload):
+        if when <= self.horizon:
+            self._seq += 1
+            heapq.heappush(self._events, (when, self._seq, kind, payload))
+
+    def _call(self, bundle, when):
+        for endpoint in CLIENT_CALLS[bundle]:
+            self.calls.setdefault(endpoint, []).append(when)
+
+    # Idle index
+    def _set_idle(self, worker, when):
+        for key in self.worker_keys[worker]:
+            self.idle.setdefault(key, set()).add(worker)
+        self.idle_since[worker] = when
+
+    def _clear_idle(self, worker, when):
+        for key in self.worker_keys[worker]:
+            self.idle.get(key, set()).discard(worker)
+        self.idle_spans.append((self.idle_since[worker], when))
+
+    def _is_idle(self, worker):
+        return self.online[worker] and not self.busy[worker] and not self.reserved[worker]
+
+    def _declined(self, request, worker):
+        # A worker passes on a request for the rest of the shift, and may take it on a later one
+        return self.declined.get(request, {}).get(worker) == self.online_since[worker]
+
+    # Pending index
+    def _add_pending(self, request):
+        rank = -request if self.newest_first else request
+        heapq.heappush(self.pending.setdefault(self.request_keys[request], []), rank)
+
+    def _next_pending(self, worker):
+        """The first listed pending request the worker can take, or None."""
+        best = None
+        for key in self.worker_keys[worker]:
+            heap = self.pending.get(key)
+            while heap and self.state[abs(heap[0])] != PENDING:
+                heapq.heappop(heap)
+            if not heap:
+                continue
+            rank = heap[0]
+            if self.declined and self._declined(abs(rank), worker):
+                # Rare: the head was declined by this worker; look a little further down
+                rank = next((r for r in heapq.nsmallest(16, heap)
+                             if self.state[abs(r)] == PENDING and not self._declined(abs(r), worker)), None)
+                if rank is None:
+                    continue
+            if best is None or rank < best:
+                best = rank
+        return None if best is None else abs(best)
+
+    # Pull policy
+    def _schedule_poll(self, worker, after):
+        period = self.config.poll_seconds
+        phase = self.phase[worker]
+        tick = phase + math.ceil((after - phase) / period) * period
+        if self.poll_at[worker] is not None and self.poll_at[worker] <= tick:
+            return
+        self.poll_at[worker] = tick
+        self._push(tick, POLL, worker)
+
+    def _poll(self, worker, now):
+        if self.poll_at[worker] != now:
+            return
+        self.poll_at[worker] = None
+        if not self._is_idle(worker):
+            return
+        request = self._next_pending(worker)
+        if request is None:
+            return
+        if self.rng.random() < self.config.accept_probability:
+            self._accept(worker, request, now, from_idle=True)
+        else:
+            self._schedule_poll(worker, now + 1e-6)
+
+    # Dispatch policy
+    def _dispatch(self, request, now):
+        candidates = self.idle.get(self.request_keys[request])
+        if not candidates:
+            return
+        pincode = self.arrivals.pincodes[request]
+        best, best_rank = None, None
+        for worker in candidates:
+            if self._declined(request, worker):
+                continue
+            rank = (self.workforce.pincodes[worker] != pincode, self.idle_since[worker])
+            if best is None or rank < best_rank:
+                best, best_rank = worker, rank
+        if best is not None:
+            self._offer(best, request, now)
+
+    def _offer(self, worker, request, now):
+        self._clear_idle(worker, now)
+        self.reserved[worker] = True
+        self.state[request] = OFFERED
+        self.counters['offers'] += 1
+        self._call('offer', now)
+        delay = self.rng.exponential(self.config.offer_reply_seconds)
+        self._push(now + delay, REPLY, worker, request, self.rng.random() < self.config.accept_probability)
+
+    def _offer_next(self, worker, now):
+        request = self._next_pending(worker)
+        if request is not None:
+            self._offer(worker, request, now)
+
+    def _reply(self, worker, request, accepted, now):
+        self.reserved[worker] = False
+        if accepted:
+            self._accept(worker, request, now)
+            return
+        self.counters['declines'] += 1
+        self._call('decline', now)
+        self.declined.setdefault(request, {})[worker] = self.online_since[worker]
+        if now >= self.arrivals.times[request] + self.config.expire_days * DAY:
+            self.state[request] = EXPIRED
+            self._call('expire', now)
+        else:
+            self.state[request] = PENDING
+            self._add_pending(request)
+        if self.online[worker]:
+            self._set_idle(worker, now)
+        if self.state[request] == PENDING:
+            self._dispatch(request, now)
+        if self._is_idle(worker):
+            self._offer_next(worker, now)
+        elif not self.online[worker] and not self.busy[worker]:
+            self.online_spans.append((self.online_since[worker], now))
+
+    # Shared transitions
+    def _accept(self, worker, request, now, from_idle=False):
+        if from_idle:
+            self._clear_idle(worker, now)
+        self.state[request] = ACCEPTED
+        self.accepted_at[request] = now
+        self.busy[worker] = True
+        self._call('accept', now)
+        hours = self.rng.lognormal(math.log(self.config.service_hours), self.config.service_sigma)
+        self.busy_seconds += min(hours * 3600, self.horizon - now)
+        self._push(now + hours * 3600, DONE, worker, request)
+
+    def _worker_free(self, worker, now):
+        if self.config.policy == 'pull':
+            self._schedule_poll(worker, now)
+        else:
+            self._offer_next(worker, now)
+
+    def _handle(self, when, kind, payload):
+        if kind == ARRIVE:
+            request, = payload
+            self._call('request', when)
+            self._add_pending(request)
+            self._push(when + self.config.expire_days * DAY, EXPIRE, request)
+            if self.config.policy == 'pull':
+                for worker in self.idle.get(self.request_keys[request], ()):
+                    self._schedule_poll(worker, when)
+            else:
+                self._dispatch(request, when)
+        elif kind == POLL:
+            self._poll(payload[0], when)
+        elif kind == REPLY:
+            self._reply(*payload, when)
+        elif kind == DONE:
+            worker, request = payload
+            self.busy[worker] = False
+            self.counters['completed'] += 1
+            self._call('complete', when)
+            if self.rng.random() < self.config.feedback_rate:
+                self._call('feedback', when)
+            if self.online[worker]:
+                self._set_idle(worker, when)
+                self._worker_free(worker, when)
+            else:
+                self.online_spans.append((self.online_since[worker], when))
+        elif kind == SHIFT_START:
+            worker, = payload
+            self.online[worker] = True
+            self.online_since[worker] = when
+            self._call('login', when)
+            self._push(when + self.config.shift_hours * 3600, SHIFT_END, worker)
+            self._set_idle(worker, when)
+            self._worker_free(worker, when)
+        elif kind == SHIFT_END:
+            worker, = payload
+            if self._is_idle(worker):
+                self._clear_idle(worker, when)
+            self.online[worker] = False
+            if not self.busy[worker] and not self.reserved[worker]:
+                self.online_spans.append((self.online_since[worker], when))
+        elif kind == EXPIRE:
+            request, = payload
+            if self.state[request] == PENDING:
+                self.state[request] = EXPIRED
+                self._call('expire', when)
+
+    def run(self):
+        workforce = self.workforce
+        for worker in range(len(workforce)):
+            start = workforce.shift_starts[worker] * 3600
+            for day in range(int(math.ceil(self.horizon / DAY))):
+                if day % 7 not in workforce.days_off[worker]:
+                    self._push(day * DAY + start, SHIFT_START, worker)
+        for request, when in enumerate(self.arrivals.times.tolist()):
+            self._push(when, ARRIVE, request)
+        events = self._events
+        while events:
+            when, _, kind, payload = heapq.heappop(events)
+            self.counters['events'] += 1
+            self._handle(when, kind, payload)
+        # Close the spans of workers still online at the horizon
+        for worker in range(len(workforce)):
+            if self.online[worker]:
+                self.online_spans.append((self.online_since[worker], self.horizon))
+                if self._is_idle(worker):
+                    self.idle_spans.append((self.idle_since[worker], self.horizon))
+        return self
+
+    def api_load(self):
+        """Calls per hour for each endpoint, as {endpoint: numpy array}."""
+        load = {}
+        for endpoint, times in self.calls.items():
+            hours = np.minimum((np.array(times) // 3600).astype(np.int64), self.hours - 1)
+            load[endpoint] = np.bincount(hours, minlength=self.hours).astype(np.float64)
+        online = np.array(self.online_spans).reshape(-1, 2)
+        load[HEARTBEAT_ENDPOINT] = _hourly_span_counts(online[:, 0], online[:, 1], self.config.heartbeat_seconds,
+                                                       self.hours)
+        if self.config.policy == 'pull':
+            idle = np.array(self.idle_spans).reshape(-1, 2)
+            # Every idle poll refreshes the list; polls that took a request are already in the spans
+            load[POLL_ENDPOINT] = _hourly_span_counts(idle[:, 0], idle[:, 1], self.config.poll_seconds, self.hours)
+        return load
@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+
+from benchmarks.report import percentile
+from simulator.engine import ACCEPTED, EXPIRED
+
+
+def _minutes(seconds):
+    return round(seconds / 60, 1)
+
+
+def _accept_stats(waits):
+    waits = sorted(waits)
+    if not waits:
+        return {'count': 0}
+    return {'count': len(waits), 'mean_min': _minutes(sum(waits) / len(waits)),
+            'p50_min': _minutes(percentile(waits, 50)), 'p90_min': _minutes(percentile(waits, 90)),
+            'p95_min': _minutes(percentile(waits, 95)), 'p99_min': _minutes(percentile(waits, 99)),
+            'within_15_min': round(sum(1 for wait in waits if wait <= 900) / len(waits), 3),
+            'within_1_hour': round(sum(1 for wait in waits if wait <= 3600) / len(waits), 3)}
+
+
+def summarize(simulation, elapsed_seconds):
+    """Time-to-accept, worker utilisation and per-endpoint API load of a finished run."""
+    arrivals = simulation.arrivals
+    waits, by_skill = [], {}
+    for request, accepted_at in enumerate(simulation.accepted_at):
+        if accepted_at is not None:
+            wait = accepted_at - arrivals.times[request]
+            waits.append(wait)
+            by_skill.setdefault(int(arrivals.skills[request]), []).append(wait)
+    states = simulation.state
+    accepted = sum(1 for state in states if state == ACCEPTED)
+    expired = sum(1 for state in states if state == EXPIRED)
+    online_seconds = sum(end - start for start, end in simulation.online_spans)
+
+    endpoints = {}
+    load = simulation.api_load()
+    for endpoint, hourly in sorted(load.items()):
+        endpoints[endpoint] = {'total': int(round(hourly.sum())),
+                               'mean_rps': round(hourly.mean() / 3600, 3) if len(hourly) else 0.0,
+                               'peak_rps': round(hourly.max() / 3600, 3) if len(hourly) else 0.0}
+    total = sum(load.values()) if load else np.zeros(simulation.hours)
+    peak_hour = int(np.argmax(total)) if len(total) else 0
+    return {
+        'policy': simulation.config.policy,
+        'elapsed_seconds': round(elapsed_seconds, 3),
+        'events': simulation.counters['events'],
+        'requests': len(arrivals),
+        'accepted': accepted,
+        'expired': expired,
+        # Still waiting at the end of the run; their wait is not in the distribution
+        'unassigned': len(arrivals) - accepted - expired,
+        'time_to_accept': _accept_stats(waits),
+        'time_to_accept_by_skill': {skill: _accept_stats(skill_waits)
+                                    for skill, skill_waits in sorted(by_skill.items())},
+        'workers': {'count': len(simulation.workforce), 'online_hours': round(online_seconds / 3600, 1),
+                    'utilisation': round(simulation.busy_seconds / online_seconds, 3) if online_seconds else 0.0,
+                    'offers': simulation.counters['offers'], 'declines': simulation.counters['declines'],
+                    'completed': simulation.counters['completed']},
+        'api': {'total_calls': int(round(total.sum())),
+                'mean_rps': round(total.mean() / 3600, 3) if len(total) else 0.0,
+                'peak_rps': round(total[peak_hour] / 3600, 3) if len(total) else 0.0,
+                # Hours from the start of the run, which is a Monday 00:00
+                'peak_hour': {'day': peak_hour // 24, 'hour': peak_hour % 24},
+                'endpoints': endpoints},
+    }
+
+
+def print_report(summaries):
+    for summary in summaries:
+        accept = summary['time_to_accept']
+        workers = summary['workers']
+        print(f"\n== policy: {summary['policy']} ({summary['events']} events in {summary['elapsed_seconds']}s)")
+        print(f"requests {summary['requests']}  accepted {summary['accepted']}  expired {summary['expired']}  "
+              f"unassigned {summary['unassigned']}")
+        if accept['count']:
+            print(f"time to accept (min): mean {accept['mean_min']}  p50 {accept['p50_min']}  "
+                  f"p90 {accept['p90_min']}  p95 {accept['p95_min']}  p99 {accept['p99_min']}  "
+                  f"<=15m {accept['within_15_min']:.1%}  <=1h {accept['within_1_hour']:.1%}")
+        print(f"workers {workers['count']}  utilisation {workers['utilisation']:.1%}  "
+              f"offers {workers['offers']}  declines {workers['declines']}")
+        print(f"\n{'endpoint':<52} {'total':>10} {'mean rps':>10} {'peak rps':>10}")
+        for endpoint, stats in summary['api']['endpoints'].items():
+            print(f"{endpoint:<52} {stats['total']:>10} {stats['mean_rps']:>10.3f} {stats['peak_rps']:>10.3f}")
+        api = summary['api']
+        print(f"{'all endpoints':<52} {api['total_calls']:>10} {api['mean_rps']:>10.3f} {api['peak_rps']:>10.3f}"
+              f"  (peak: day {api['peak_hour']['day']}, {api['peak_hour']['hour']:02d}:00)")
+
+
+def save(summaries, config, path):
+    with open(path, 'w') as f:
+        json.dump({'config': config, 'runs': summaries}, f, indent=2, sort_keys=True)
+    print(f"\nResults written to {path}")
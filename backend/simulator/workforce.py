@@ -0,0 +1,67 @@
+import numpy as np
+
+# Worker populations for the simulator: either the workers in the database
+# (optionally resampled to a different head count) or a synthetic population
+# whose skills and pincodes follow the demand mix.
+
+REACHES = ('pincode', 'district', 'any')
+
+
+def area(pincode, reach):
+    """The area a worker serves from `pincode`: the pincode itself, its district (first 3 digits) or anywhere."""
+    if reach == 'pincode':
+        return pincode
+    if reach == 'district':
+        return pincode[:3]
+    return ''
+
+
+class Workforce:
+    """Skills, pincode and weekly shift pattern of each simulated worker."""
+
+    def __init__(self, skills, pincodes, rng, shift_start_hours=(7.0, 11.0), work_days=6):
+        self.skills = [tuple(sorted(set(worker_skills))) for worker_skills in skills]
+        self.pincodes = list(pincodes)
+        count = len(self.skills)
+        # Shift start in hours after midnight, and the weekday each worker takes off
+        self.shift_starts = rng.uniform(shift_start_hours[0], shift_start_hours[1], count)
+        self.days_off = [set(rng.choice(7, size=7 - work_days, replace=False).tolist()) for _ in range(count)]
+
+    def __len__(self):
+        return len(self.skills)
+
+    def resized(self, count, rng, **shifts):
+        """A population of `count` workers drawn with replacement from this one."""
+        picks = rng.integers(len(self), size=count) if len(self) else []
+        return Workforce([self.skills[i] for i in picks], [self.pincodes[i] for i in picks], rng, **shifts)
+
+
+def load_workforce(cursor, rng, **shifts):
+    """Active workers not on leave, with their skills."""
+    cursor.execute("""SELECT sw.worker_id, sw.pincode FROM Skill_Worker sw
+                      JOIN Login l ON sw.login_id = l.login_id
+                      WHERE sw.deleted_at IS NULL AND l.deleted_at IS NULL
+                      AND (sw.available_status IS NULL OR sw.available_status <> 'Leave')""")
+    workers = cursor.fetchall()
+    cursor.execute("SELECT worker_id, skill_type_id FROM Worker_Skills")
+    skills = {}
+    for row in cursor.fetchall():
+        skills.setdefault(row['worker_id'], []).append(row['skill_type_id'])
+    workers = [worker for worker in workers if worker['worker_id'] in skills]
+    return Workforce([skills[worker['worker_id']] for worker in workers],
+                     [(worker['pincode'] or '').strip() for worker in workers], rng, **shifts)
+
+
+def synthetic_workforce(count, skills_per_worker, arrivals, rng, **shifts):
+    """`count` workers with skills weighted by demand and pincodes drawn from request pincodes."""
+    skill_ids, skill_counts = np.unique(arrivals.skills, return_counts=True)
+    pincodes, pincode_counts = np.unique(arrivals.pincodes.astype(str), return_counts=True)
+    if not len(skill_ids):
+        return Workforce([], [], rng, **shifts)
+    # Square-root weighting keeps some supply for rare skills
+    skill_weights = np.sqrt(skill_counts) / np.sqrt(skill_counts).sum()
+    per_worker = min(skills_per_worker, len(skill_ids))
+    skills = [skill_ids[rng.choice(len(skill_ids), size=per_worker, replace=False, p=skill_weights)].tolist()
+              for _ in range(count)]
+    homes = rng.choice(pincodes, size=count, p=pincode_counts / pincode_counts.sum())
+    return Workforce(skills, homes.tolist(), rng, **shifts)
@@ -0,0 +1,179 @@
+import asyncio
+import os
+
+from blueprints.notifications import NOTIFICATION_COLUMNS, NOTIFICATION_SOURCE
+import changes
+import db_async
+import notifications
+
+# Server-sent event streams of notifications for the asyncio serving mode
+# (asgi.py). An open stream is a coroutine waiting on a small queue, so a
+# process can hold thousands of idle dashboards. One task per process reads
+# the notification rows of the change feed (Change_Log) every
+# SSE_POLL_SECONDS while any stream is open, renders each new or changed
+# notification once per locale in use, and hands it to the streams of the
+# user and the worker the request belongs to. The database sees one query per
+# poll however many streams are open.
+#
+# Events carry the Change_Log seq as their id. A client reconnecting with
+# Last-Event-ID is sent what it missed; a client that falls more than
+# SSE_QUEUE_SIZE events behind is sent `reset` and should reload its list.
+
+SSE_POLL_SECONDS = float(os.getenv('SSE_POLL_SECONDS', 1))
+SSE_KEEPALIVE_SECONDS = float(os.getenv('SSE_KEEPALIVE_SECONDS', 15))
+SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', 10000))
+SSE_QUEUE_SIZE = int(os.getenv('SSE_QUEUE_SIZE', 100))
+SSE_BATCH_SIZE = 1000
+
+SCOPES = ('user', 'worker')
+
+# Queued in place of the events a slow client missed
+RESET = 'reset'
+
+
+class Stream:
+    """One open connection: who it listens for, its locale and its pending events."""
+
+    def __init__(self, scope, scope_id, locale, queue_size):
+        self.key = (scope, scope_id)
+        self.locale = locale
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.last_seq = 0
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+            return False
+        return True
+
+
+class NotificationHub:
+    def __init__(self, poll_seconds=SSE_POLL_SECONDS, max_streams=SSE_MAX_STREAMS, queue_size=SSE_QUEUE_SIZE):
+        self.poll_seconds = poll_seconds
+        self.max_streams = max_streams
+        self.queue_size = queue_size
+        self._streams = {}
+        self._open = 0
+        self._last_seq = None
+        self._task = None
+        self._counters = {'opened': 0, 'rejected': 0, 'polls': 0, 'events': 0, 'resets': 0, 'errors': 0}
+
+    def open(self, scope, scope_id, locale):
+        """Register a stream, or return None when the process already holds SSE_MAX_STREAMS."""
+        if self._open >= self.max_streams:
+            self._counters['rejected'] += 1
+            return None
+        stream = Stream(scope, scope_id, locale, self.queue_size)
+        self._streams.setdefault(stream.key, set()).add(stream)
+        self._open += 1
+        self._counters['opened'] += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return stream
+
+    def close(self, stream):
+        streams = self._streams.get(stream.key)
+        if streams is None or stream not in streams:
+            return
+        streams.discard(stream)
+        if not streams:
+            del self._streams[stream.key]
+        self._open -= 1
+
+    def stats(self):
+        return dict(self._counters, open=self._open, audiences=len(self._streams), cursor=self._last_seq)
+
+    async def _run(self):
+        while self._streams:
+            try:
+                await self.poll()
+            except Exception as e:
+                self._counters['errors'] += 1
+                print(f"Notification stream poll failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+        # Start from the newest change again when the next stream opens
+        self._last_seq = None
+
+    async def poll(self):
+        async with db_async.cursor() as cursor:
+            if self._last_seq is None:
+                await cursor.execute(changes.LAST_SEQ_QUERY)
+                start = changes.start_seq((await cursor.fetchone())['last_seq'])
+                self._last_seq = await self._visible_seq(cursor, start)
+                return
+            until = await self._visible_seq(cursor, self._last_seq)
+            await cursor.execute("""SELECT seq, entity_id FROM Change_Log
+                                    WHERE seq > %s AND seq <= %s AND entity = 'notification' ORDER BY seq LIMIT %s""",
+                                 (self._last_seq, until, SSE_BATCH_SIZE))
+            rows = await cursor.fetchall()
+            self._counters['polls'] += 1
+            self._last_seq = rows[-1]['seq'] if len(rows) == SSE_BATCH_SIZE else until
+            if not rows:
+                return
+            for seq, key, payloads in await self._events(cursor, rows, self._locales):
+                for stream in list(self._streams.get(key, ())):
+                    self._counters['events'] += 1
+                    if not stream.push((seq, payloads[stream.locale])):
+                        self._counters['resets'] += 1
+
+    @staticmethod
+    async def _visible_seq(cursor, since):
+        # Not past a seq whose transaction may still commit (see changes.visible_seq)
+        await cursor.execute(changes.VISIBLE_SEQ_QUERY, changes.visible_seq_params(since))
+        return (await cursor.fetchone())['visible_seq']
+
+    def _locales(self, key):
+        return {stream.locale for stream in self._streams.get(key, ())}
+
+    async def _events(self, cursor, changes, locales_for):
+        """[(seq, audience key, {locale: notification})] for Change_Log rows, oldest first.
+
+        A notification changed several times in the batch is sent once, as it is
+        now, to the user and worker the request currently belongs to.
+        """
+        latest = {}
+        for change in changes:
+            latest[change['entity_id']] = change['seq']
+        placeholders = ','.join(['%s'] * len(latest))
+        await cursor.execute(f"""SELECT {NOTIFICATION_COLUMNS}, wr.worker_id AS stream_worker_id
+                                 FROM {NOTIFICATION_SOURCE} WHERE n.notification_id IN ({placeholders})""",
+                             tuple(latest))
+        rows = await cursor.fetchall()
+        wanted = []
+        for row in rows:
+            for key in (('user', row['request_user_id']), ('worker', row.pop('stream_worker_id'))):
+                locales = locales_for(key)
+                if locales:
+                    wanted.append((latest[row['notification_id']], key, row, locales))
+        rendered = {}
+        for locale in {locale for _, _, _, locales in wanted for locale in locales}:
+            copies = [dict(row) for row in rows]
+            await notifications.render_async(cursor, copies, locale)
+            rendered[locale] = {row['notification_id']: row for row in copies}
+        return sorted(((seq, key, {locale: rendered[locale][row['notification_id']] for locale in locales})
+                       for seq, key, row, locales in wanted), key=lambda event: event[0])
+
+    async def backlog(self, stream, since):
+        """The events for `stream` after Change_Log seq `since` (a reconnect's Last-Event-ID)."""
+        scope, scope_id = stream.key
+        column = 'user_id' if scope == 'user' else 'worker_id'
+        async with db_async.cursor() as cursor:
+            # Bounded like poll, or a later change with a lower seq would be skipped as already sent
+            until = await self._visible_seq(cursor, since)
+            await cursor.execute(f"""SELECT seq, entity_id FROM Change_Log
+                                     WHERE seq > %s AND seq <= %s AND entity = 'notification' AND {column} = %s
+                                     ORDER BY seq LIMIT %s""", (since, until, scope_id, self.queue_size + 1))
+            rows = await cursor.fetchall()
+            if len(rows) > self.queue_size:
+                return [RESET]
+            if not rows:
+                return []
+            events = await self._events(cursor, rows, lambda key: {stream.locale} if key == stream.key else set())
+        return [(seq, payloads[stream.locale]) for seq, _, payloads in events]
+
+
+hub = NotificationHub()
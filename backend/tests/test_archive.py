@@ -0,0 +1,28 @@
+from datetime import date
+
+import archive
+from db import create_connection
+import demand
+
+# Archived requests keep their hour-of-week and still feed the demand analytics.
+
+
+def test_archived_request_keeps_created_at(app, seed):
+    request_id = seed.work_request(seed.user())
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""UPDATE Work_Request SET status = 'Completed', request_date = '2020-06-01',
+                          completed_date = '2020-06-01', created_at = '2020-06-01 14:00:00'
+                          WHERE request_id = %s""", (request_id,))
+        connection.commit()
+        assert archive.archive_batch(connection, date(2021, 1, 1)) >= 1
+
+        cursor.execute("SELECT created_at FROM Work_Request_History WHERE request_id = %s", (request_id,))
+        assert str(cursor.fetchone()['created_at']).startswith('2020-06-01 14:00:00')
+        rows = demand.DemandModel()._load_requests(cursor, [request_id])
+        assert [(row['request_id'], row['status']) for row in rows] == [(request_id, 'Completed')]
+        assert str(rows[0]['created_at']).startswith('2020-06-01 14:00:00')
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,37 @@
+from pymysql.cursors import RE_INSERT_VALUES
+
+import bulk
+from db import create_connection
+from query_budget import assert_max_queries
+
+WORKERS_CSV = """username,password,first_name,last_name,city,pincode,experience_years,skills
+{prefix}-1,secret,Asha,K,Chennai,600001,2,Plumbing
+{prefix}-2,secret,Ravi,M,Chennai,600002,,Plumbing;Electrical
+{prefix}-3,secret,Meena,S,Madurai,625001,5,
+"""
+
+
+def import_workers(prefix, batch_size):
+    connection = create_connection(readonly=False)
+    try:
+        with assert_max_queries(8) as log:
+            result = bulk.import_workers_csv(connection, WORKERS_CSV.format(prefix=prefix), batch_size)
+    finally:
+        connection.close()
+    return result, log
+
+
+def test_worker_import_statements_do_not_grow_with_the_batch(app):
+    result, log = import_workers('bulk-import', batch_size=500)
+    assert result == {'imported': 3, 'skipped': []}
+    # Skill lookup, then per batch: taken usernames, 3 inserts and 2 id lookups
+    assert log.count == 7
+
+
+def test_worker_import_inserts_are_multi_row_on_mysql(app):
+    _, log = import_workers('bulk-rewrite', batch_size=500)
+    inserts = [sql for _, sql, _ in log.statements if sql.lstrip().upper().startswith('INSERT')]
+    assert inserts
+    # PyMySQL only folds executemany into one multi-row INSERT when this matches
+    for sql in inserts:
+        assert RE_INSERT_VALUES.match(sql), sql
@@ -0,0 +1,77 @@
+import cache
+import invalidation
+import kv_server
+
+
+def test_kv_clear_only_removes_its_own_keys():
+    server = kv_server.serve_in_background()
+    try:
+        host, port = server.server_address
+        client = cache.KVClient(f"{host}:{port}")
+        profiles = cache.KVBackend(client, prefix='skillhive:profiles:')
+        for index in range(1200):
+            profiles.set(f"user:{index}", {'user_id': index}, 60)
+        client.execute('SET', 'skillhive:other:user:1', '{}')
+        client.execute('SET', 'unrelated', 'kept')
+
+        profiles.clear()
+
+        assert profiles.get('user:1') == (False, None)
+        assert client.execute('GET', 'skillhive:other:user:1') == b'{}'
+        assert client.execute('GET', 'unrelated') == b'kept'
+        assert client.execute('DBSIZE') == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_shared_kv_cache_is_not_cleared_by_the_bus():
+    # Deletes on a shared server are already seen by every process
+    bus = invalidation.InvalidationBus(use_db=True)
+    shared = cache.Cache(cache.KVBackend(prefix='skillhive:test:'), name='shared')
+    bus.register(shared)
+    assert 'shared' not in bus.stats()['caches']
+    assert shared.listeners == []
+
+
+def local_cache():
+    return cache.Cache(cache.LocalBackend(), name='test')
+
+
+def test_invalidating_another_key_does_not_void_a_load():
+    profiles = local_cache()
+    bucket = hash('user:1') % cache.GENERATION_BUCKETS
+    other = next(key for key in (f"user:{index}" for index in range(2, 100))
+                 if hash(key) % cache.GENERATION_BUCKETS != bucket)
+    profiles.get('user:1')
+    profiles.invalidate(other)
+    profiles.set('user:1', {'user_id': 1})
+    assert profiles.get('user:1') == (True, {'user_id': 1})
+    assert profiles.stats()['stale_sets'] == 0
+
+
+def test_invalidating_the_key_during_a_load_skips_the_set():
+    profiles = local_cache()
+    profiles.get('user:1')
+    profiles.invalidate('user:1')
+    profiles.set('user:1', {'user_id': 1, 'first_name': 'stale'})
+    assert profiles.get('user:1') == (False, None)
+    assert profiles.stats()['stale_sets'] == 1
+
+
+def test_clear_during_a_load_skips_the_set():
+    profiles = local_cache()
+    profiles.get('user:1')
+    profiles.clear()
+    profiles.set('user:1', {'user_id': 1})
+    assert profiles.stats()['stale_sets'] == 1
+
+
+def test_misses_without_a_set_do_not_accumulate():
+    profiles = local_cache()
+    for index in range(cache.MAX_PENDING_MISSES * 4):
+        assert profiles.read_through(f"user:{index}", lambda: None) is None
+    assert profiles._pending() == {}
+    for index in range(cache.MAX_PENDING_MISSES * 4):
+        profiles.get(f"user:{index}")
+    assert len(profiles._pending()) == cache.MAX_PENDING_MISSES
@@ -0,0 +1,68 @@
+import pytest
+
+import changes
+from db import create_connection
+import recommend
+
+# The change feed must not hand out a cursor past a seq whose transaction has
+# not committed yet. SQLite runs one write transaction at a time, so the
+# interleaving is staged with explicit seqs: the first transaction took seq
+# base + 1, the second took base + 2 and committed first.
+
+
+@pytest.fixture
+def cursor(app):
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    yield cursor
+    cursor.close()
+    connection.close()
+
+
+def _commit_change(seq, age_seconds=0):
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""INSERT INTO Change_Log (seq, entity, entity_id, op, created_at)
+                          VALUES (%s, 'skill_type', %s, 'update', NOW() - INTERVAL %s SECOND)""",
+                       (seq, seq, age_seconds))
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def _feed(cursor, since):
+    return changes.read_changes(cursor, since, 'admin')
+
+
+def test_cursor_waits_for_uncommitted_seq(cursor):
+    base = changes.visible_seq(cursor)
+    _commit_change(base + 2)
+
+    early = _feed(cursor, base)
+    assert early['changes'] == [] and early['cursor'] == base
+
+    _commit_change(base + 1)
+    late = _feed(cursor, base)
+    assert [change['version'] for change in late['changes']] == [base + 1, base + 2]
+    assert late['cursor'] == base + 2
+
+
+def test_old_gap_is_skipped(cursor):
+    base = changes.visible_seq(cursor)
+    # base + 1 rolled back long ago
+    _commit_change(base + 2, age_seconds=changes.CHANGE_LOG_GAP_SECONDS + 10)
+    assert _feed(cursor, base)['cursor'] == base + 2
+
+
+def test_recommend_refresh_stops_before_gap(cursor):
+    recommend.index.refresh(cursor)
+    base = recommend.index.cursor
+    _commit_change(base + 2)
+    recommend.index.refresh(cursor)
+    assert recommend.index.cursor == base
+
+    _commit_change(base + 1)
+    recommend.index.refresh(cursor)
+    assert recommend.index.cursor == base + 2
@@ -0,0 +1,42 @@
+from datetime import date
+
+import numpy as np
+
+import demand
+
+# Snapshots hold one row per (skill, pincode) pair with requests, not a dense grid.
+
+
+def _model():
+    model = demand.DemandModel(window_weeks=4)
+    model._skills = {10: 0, 20: 1, 30: 2}
+    model._pincodes = {f"6000{i:02d}": i for i in range(50)}
+    model._skill_names = {10: 'Plumbing', 20: 'Electrical', 30: 'Painting'}
+    last_week = demand._week(date.today()) - 1
+    model._requests = {'request_id': np.arange(5, dtype=np.int64),
+                       'skill': np.array([0, 0, 1, 2, 0], np.int32),
+                       'pincode': np.array([3, 3, 7, 49, 8], np.int32),
+                       'hour': np.array([9, 10, 9, -1, 30], np.int16),
+                       'week': np.full(5, last_week, np.int32),
+                       'completed': np.array([True, False, False, False, True])}
+    return model
+
+
+def test_snapshot_is_sized_by_observed_pairs():
+    snapshot = _model().snapshot()
+    assert snapshot['demand'].shape == snapshot['forecast'].shape == (4, demand.HOURS_PER_WEEK)
+    assert snapshot['pair_skill'].tolist() == [0, 0, 1, 2]
+    assert snapshot['pair_pincode'].tolist() == [3, 8, 7, 49]
+
+
+def test_report_selects_pairs():
+    snapshot = _model().snapshot()
+    report = demand.demand_report(snapshot, skill_type_id=10)
+    assert [(area['pincode'], area['requests'], area['unmet']) for area in report['areas']] == \
+        [('600003', 2.0, 1.0), ('600008', 1.0, 0.0)]
+    assert sum(map(sum, report['hour_of_week']['demand'])) == 3.0
+
+    legacy = demand.demand_report(snapshot, pincode='600049')
+    # A request with only a request_date counts 1/24 in each hour of its Monday
+    assert legacy['hour_of_week']['demand'][0] == [0.04] * 24
+    assert demand.demand_report(snapshot, skill_type_id=99)['areas'] == []
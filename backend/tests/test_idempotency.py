@@ -0,0 +1,90 @@
+import uuid
+
+from blueprints import work_requests
+from db import create_connection
+import idempotency
+
+# Idempotency-Key claims across a crash between the write and the stored response,
+# and a retry taking over a claim while the first attempt is still running.
+
+
+def _work_request_body(user_id):
+    return {'user_id': user_id, 'skill_type_id': 1, 'description': 'Broken switch', 'request_date': '2026-02-01',
+            'location': 'Home', 'city': 'Chennai', 'pincode': '600001'}
+
+
+def _request_count(user_id):
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) AS n FROM Work_Request WHERE user_id = %s", (user_id,))
+        return cursor.fetchone()['n']
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def _age_claims(seconds):
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("UPDATE Idempotency_Key SET created_at = NOW() - INTERVAL %s SECOND", (seconds,))
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def test_replay_returns_stored_response(client, seed):
+    user_id = seed.user()
+    headers = {'Idempotency-Key': str(uuid.uuid4())}
+    first = client.post('/api/work-requests', json=_work_request_body(user_id), headers=headers)
+    again = client.post('/api/work-requests', json=_work_request_body(user_id), headers=headers)
+    assert first.status_code == again.status_code == 201
+    assert again.headers['Idempotent-Replayed'] == 'true'
+    assert _request_count(user_id) == 1
+
+
+def test_claim_kept_when_process_dies_after_commit(client, seed, monkeypatch):
+    user_id = seed.user()
+    headers = {'Idempotency-Key': str(uuid.uuid4())}
+    # The write commits but the response is never stored
+    monkeypatch.setattr(idempotency, 'complete', lambda *args: None)
+    assert client.post('/api/work-requests', json=_work_request_body(user_id), headers=headers).status_code == 201
+    monkeypatch.undo()
+    _age_claims(idempotency.IDEMPOTENCY_LOCK_SECONDS + 60)
+
+    retry = client.post('/api/work-requests', json=_work_request_body(user_id), headers=headers)
+    assert retry.status_code == 409, retry.get_json()
+    assert 'Retry-After' not in retry.headers
+    assert _request_count(user_id) == 1
+
+
+def test_abandoned_uncommitted_claim_is_taken_over(client, seed):
+    user_id = seed.user()
+    key = str(uuid.uuid4())
+    hashed = idempotency.key_hash(key, 'POST', '/api/work-requests')
+    body = client.application.json.dumps(_work_request_body(user_id)).encode()
+    assert idempotency.claim(hashed, idempotency.body_hash(body))[0] == idempotency.CLAIMED
+    _age_claims(idempotency.IDEMPOTENCY_LOCK_SECONDS + 60)
+
+    retry = client.post('/api/work-requests', data=body, content_type='application/json',
+                        headers={'Idempotency-Key': key})
+    assert retry.status_code == 201, retry.get_json()
+    assert _request_count(user_id) == 1
+
+
+def test_write_rolls_back_when_claim_was_taken_over(client, seed, monkeypatch):
+    user_id = seed.user()
+    record = work_requests.changes.record_for_request
+
+    def taken_over(cursor, *args):
+        # A retry freed the claim while this request ran (rolled back with the write)
+        cursor.execute("DELETE FROM Idempotency_Key")
+        return record(cursor, *args)
+
+    monkeypatch.setattr(work_requests.changes, 'record_for_request', taken_over)
+    response = client.post('/api/work-requests', json=_work_request_body(user_id),
+                           headers={'Idempotency-Key': str(uuid.uuid4())})
+    assert response.status_code == 500
+    assert _request_count(user_id) == 0
@@ -0,0 +1,44 @@
+from db import create_connection
+import presence
+
+# Presence entries cache a worker's skills; changing them must not leave accept
+# trusting the old ones.
+
+
+def test_accept_sees_updated_skills(client, seed):
+    user_id, worker_id = seed.user(), seed.worker(skill_ids=[1])
+    assert client.post(f"/api/workers/{worker_id}/heartbeat", json={}).status_code == 200
+
+    response = client.put(f"/api/workers/{worker_id}", json={
+        'first_name': 'Test', 'last_name': 'Worker', 'city': 'Chennai', 'pincode': '600001',
+        'experience_years': 3, 'phone_number1': '9000000001', 'skill_ids': [2]})
+    assert response.status_code == 200, response.get_json()
+
+    request_id = seed.work_request(user_id, skill_type_id=1)
+    response = client.post(f"/api/work-requests/{request_id}/accept",
+                           json={'workerId': worker_id, 'timeSlot': 'Morning', 'arrivalTime': '10:00'})
+    assert response.status_code == 400, response.get_json()
+
+
+def test_profile_edit_keeps_unwritten_status(client, seed, monkeypatch):
+    worker_id = seed.worker(skill_ids=[1])
+    # Hold the write-behind flush until after the profile edit
+    monkeypatch.setattr(presence.flusher, 'wake', lambda: None)
+    assert client.put(f"/api/workers/{worker_id}/status", json={'status': 'Leave'}).status_code == 200
+    response = client.put(f"/api/workers/{worker_id}", json={
+        'first_name': 'Test', 'last_name': 'Worker', 'city': 'Chennai', 'pincode': '600001',
+        'experience_years': 3, 'phone_number1': '9000000001', 'skill_ids': [1, 2]})
+    assert response.status_code == 200, response.get_json()
+
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        presence.table.flush(connection)
+        cursor.execute("SELECT available_status FROM Skill_Worker WHERE login_id = %s", (worker_id,))
+        assert cursor.fetchone()['available_status'] == 'Leave'
+    finally:
+        cursor.close()
+        connection.close()
+    assert presence.table.get(worker_id) is None
+    entry = client.post(f"/api/workers/{worker_id}/heartbeat", json={}).get_json()
+    assert entry['status'] == 'Leave'
@@ -0,0 +1,15 @@
+import purge
+
+# The User cascade before the history steps were added
+OLD_USER_STEPS = ['Notification', 'Feedback', 'Work_Request', 'User', 'Login']
+
+
+def test_job_queued_under_the_old_steps_resumes_at_its_table():
+    steps = purge.PURGE_STEPS['User']
+    for old_index, table in enumerate(OLD_USER_STEPS):
+        job = {'step': old_index, 'current_table': table}
+        assert steps[purge._resume_index(steps, job)][0] == table
+
+
+def test_pending_job_starts_at_the_first_step():
+    assert purge._resume_index(purge.PURGE_STEPS['Worker'], {'step': 0, 'current_table': None}) == 0
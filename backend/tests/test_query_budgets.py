@@ -0,0 +1,36 @@
+from query_budget import assert_endpoint_budget
+
+# Statement budgets for the write endpoints the dashboards hit most. A budget
+# failing means an endpoint now issues more statements than it used to; look
+# for a query added in a loop before raising the number.
+
+
+def test_accept_budget(client, seed):
+    # The worker is not in the presence table yet, so this includes loading them
+    user_id, worker_id = seed.user(), seed.worker()
+    request_id = seed.work_request(user_id)
+    response = assert_endpoint_budget(client, 'post', f"/api/work-requests/{request_id}/accept", 8,
+                                      json={'workerId': worker_id, 'timeSlot': 'Morning', 'arrivalTime': '10:00'})
+    assert response.status_code == 200, response.get_json()
+
+
+def test_cancel_budget(client, seed):
+    user_id = seed.user()
+    request_id = seed.work_request(user_id)
+    response = assert_endpoint_budget(client, 'post', f"/api/work-requests/{request_id}/cancel", 4,
+                                      json={'userId': user_id})
+    assert response.status_code == 200, response.get_json()
+
+
+def test_update_worker_budget(client, seed):
+    worker_id = seed.worker(skill_ids=[1, 2])
+    response = assert_endpoint_budget(client, 'put', f"/api/workers/{worker_id}", 7, json={
+        'first_name': 'Renamed', 'last_name': 'Worker', 'city': 'Chennai', 'pincode': '600001',
+        'experience_years': 4, 'phone_number1': '9000000001', 'skill_ids': [2, 3]})
+    assert response.status_code == 200, response.get_json()
+
+
+def test_delete_worker_budget(client, seed):
+    worker_id = seed.worker()
+    response = assert_endpoint_budget(client, 'delete', f"/api/admin/workers/{worker_id}", 5)
+    assert response.status_code == 202, response.get_json()
@@ -0,0 +1,51 @@
+import db
+from db import create_connection
+
+RATING_COLUMNS = ('rating_count', 'rating_sum', 'avg_rating')
+
+
+def rated_worker(client, seed, ratings):
+    worker_id = seed.worker()
+    for rating in ratings:
+        user_id = seed.user()
+        request_id = seed.work_request(user_id)
+        accepted = client.post(f"/api/work-requests/{request_id}/accept", json={'workerId': worker_id})
+        assert accepted.status_code == 200, accepted.get_json()
+        completed = client.post(f"/api/work-requests/{request_id}/complete", json={'workerId': worker_id})
+        assert completed.status_code == 200, completed.get_json()
+        feedback = client.post('/api/feedback', json={'request_id': request_id, 'rating': rating})
+        assert feedback.status_code == 201, feedback.get_json()
+    return worker_id
+
+
+def stored_rating(worker_id):
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join(RATING_COLUMNS)} FROM Skill_Worker WHERE login_id = %s", (worker_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def test_init_db_backfills_ratings_when_it_adds_the_columns(client, seed):
+    worker_id = rated_worker(client, seed, [5, 4])
+    assert stored_rating(worker_id) == {'rating_count': 2, 'rating_sum': 9, 'avg_rating': 4.5}
+
+    # Back to the schema from before the aggregate existed
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '%avg_rating%'")
+        for row in cursor.fetchall():
+            cursor.execute(f"DROP INDEX {row['name']}")
+        for column in RATING_COLUMNS:
+            cursor.execute(f"ALTER TABLE Skill_Worker DROP COLUMN {column}")
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
+
+    db.init_db()
+    assert stored_rating(worker_id) == {'rating_count': 2, 'rating_sum': 9, 'avg_rating': 4.5}
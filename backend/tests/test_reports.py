@@ -0,0 +1,83 @@
+import reports
+from db import create_connection
+
+
+def insert_stale_job(cursor, status):
+    cursor.execute("""INSERT INTO Report_Job (report, params, params_hash, status, created_at, updated_at, expires_at)
+                      VALUES ('stats', '{}', %s, %s, NOW() - INTERVAL 2 HOUR, NOW() - INTERVAL 2 HOUR,
+                              NOW() + INTERVAL 1 HOUR)""", (f"stale-{status}", status))
+    return cursor.lastrowid
+
+
+def job_status(cursor, job_id):
+    cursor.execute("SELECT status FROM Report_Job WHERE job_id = %s", (job_id,))
+    return cursor.fetchone()['status']
+
+
+def test_heartbeat_keeps_long_running_jobs_alive(app):
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        held = insert_stale_job(cursor, 'Running')
+        orphaned = insert_stale_job(cursor, 'Queued')
+        connection.commit()
+
+        runner = reports.ReportRunner()
+        runner._jobs.add(held)
+        assert runner.touch_jobs() == 1
+
+        reports.expire_jobs(cursor)
+        connection.commit()
+        assert job_status(cursor, held) == 'Running'
+        assert job_status(cursor, orphaned) == 'Failed'
+    finally:
+        cursor.close()
+        connection.close()
+
+
+
+def test_running_job_outlives_its_expiry(app):
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""INSERT INTO Report_Job (report, params, params_hash, status, created_at, updated_at, expires_at)
+                          VALUES ('stats', '{}', 'long-running', 'Running', NOW() - INTERVAL 20 MINUTE, NOW(),
+                                  NOW() - INTERVAL 10 MINUTE)""")
+        running = cursor.lastrowid
+        cursor.execute("""INSERT INTO Report_Job (report, params, params_hash, status, created_at, updated_at, expires_at)
+                          VALUES ('stats', '{}', 'finished', 'Done', NOW() - INTERVAL 20 MINUTE,
+                                  NOW() - INTERVAL 15 MINUTE, NOW() - INTERVAL 5 MINUTE)""")
+        finished = cursor.lastrowid
+        connection.commit()
+
+        reports.expire_jobs(cursor)
+        connection.commit()
+        assert job_status(cursor, running) == 'Running'
+        cursor.execute("SELECT COUNT(*) AS n FROM Report_Job WHERE job_id = %s", (finished,))
+        assert cursor.fetchone()['n'] == 0
+
+        # The heartbeat keeps it visible to polls until it finishes
+        runner = reports.ReportRunner()
+        runner._jobs.add(running)
+        assert runner.touch_jobs() == 1
+        connection.rollback()
+        assert reports.get_job(cursor, running)['status'] == 'Running'
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def test_table_report_limits_rows_in_sql(app, monkeypatch):
+    monkeypatch.setattr(reports, 'REPORT_MAX_ROWS', 2)
+    connection = create_connection(readonly=False)
+    cursor = connection.cursor()
+    try:
+        statements = []
+        execute = cursor.execute
+        monkeypatch.setattr(cursor, 'execute', lambda query, args=None: statements.append(query) or execute(query, args))
+        result = reports.REPORTS['workers'](cursor, {})
+        assert result['row_count'] <= 2
+        assert statements[-1].rstrip().endswith('LIMIT %s')
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,53 @@
+import time
+
+from db import create_connection
+from scheduler import LeaderLock, Scheduler
+
+# A job that outlasts the SQLite lease must not let another process become leader.
+
+
+def _scheduler(name, lease_seconds):
+    scheduler = Scheduler(enabled=False)
+    scheduler.lock = LeaderLock(name, lease_seconds)
+    scheduler.lock.holder = 'leader:1'
+    other = LeaderLock(name, lease_seconds)
+    other.holder = 'other:2'
+    return scheduler, other
+
+
+def test_lease_renewed_while_job_runs(app):
+    scheduler, other = _scheduler('test-long-job', lease_seconds=1)
+    taken_over = []
+
+    def slow_job():
+        time.sleep(2.5)
+        taken_over.append(other.acquire())
+
+    scheduler.register('slow', slow_job, interval=3600, initial_delay=0)
+    assert scheduler.lock.acquire()
+    scheduler.run_due_jobs()
+    assert taken_over == [False]
+
+
+def test_stops_when_lease_lost_between_jobs(app):
+    scheduler, _ = _scheduler('test-lost-lease', lease_seconds=30)
+    ran = []
+
+    def lose_lease():
+        ran.append('first')
+        connection = create_connection(readonly=False)
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""UPDATE Scheduler_Lease SET holder = 'other:2', expires_at = NOW() + INTERVAL 60 SECOND
+                              WHERE name = 'test-lost-lease'""")
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+
+    scheduler.register('first', lose_lease, interval=3600, initial_delay=0)
+    scheduler.register('second', lambda: ran.append('second'), interval=3600, initial_delay=1)
+    assert scheduler.lock.acquire()
+    scheduler.run_due_jobs(now=scheduler.jobs['second'].next_run)
+    assert ran == ['first']
+    assert not scheduler.is_leader
@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+import search
+
+
+def collect(client, url, args, limit=2):
+    """Every result of a paginated search, following next_cursor to the end."""
+    results, cursor = [], None
+    while True:
+        page = client.get(url, query_string=dict(args, limit=limit, **({'cursor': cursor} if cursor else {})))
+        assert page.status_code == 200, page.get_json()
+        body = page.get_json()
+        results.extend(body['results'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return results
+
+
+def test_search_pages_cover_every_match_once(client, seed):
+    # Equal and near-equal scores, which a float cursor splits unreliably
+    worker_ids = [seed.worker() for _ in range(7)]
+    names = {'first_name': 'Zephyrine', 'last_name': 'Worker', 'city': 'Chennai', 'pincode': '600001'}
+    for index, worker_id in enumerate(worker_ids):
+        area = 'Zephyrine Nagar' if index % 2 else 'Anna Nagar'
+        assert client.put(f"/api/workers/{worker_id}", json=dict(names, area=area)).status_code == 200
+
+    results = collect(client, '/api/admin/search/workers', {'q': 'zephyrine'})
+    assert sorted(row['login_id'] for row in results) == sorted(worker_ids)
+    scores = [row['score'] for row in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_directory_pages_cover_every_worker_once(client, seed):
+    worker_ids = {seed.worker(skill_ids=[4]) for _ in range(5)}
+    results = collect(client, '/api/workers/search', {'skill_type_id': 4, 'sort': 'experience'})
+    assert worker_ids <= {row['login_id'] for row in results}
+    assert len(results) == len({row['worker_id'] for row in results})
+
+
+def test_search_rejects_a_malformed_cursor(client):
+    response = client.get('/api/admin/search/workers?q=zephyrine&cursor=bm90LWpzb24')
+    assert response.status_code == 400
+
+
+def test_cursor_carries_the_sort_value_exactly():
+    for value in (Decimal('0.000001'), Decimal('12.345678'), 1e-06, 4.33, 7):
+        decoded, row_id = search.decode_cursor(search.encode_cursor(value, 42))
+        assert decoded == Decimal(str(value)) and row_id == 42
+        assert search.decode_cursor(search.encode_cursor(value, 42), 'sqlite')[0] == float(value)
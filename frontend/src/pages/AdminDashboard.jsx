@@ -955,6 +955,7 @@ const AdminDashboard = ({ admin, onLogout }) => {
               <option className="text-black" value="Accepted">Accepted</option>
               <option className="text-black" value="Completed">Completed</option>
               <option className="text-black" value="Cancelled">Cancelled</option>
+              <option className="text-black" value="Expired">Expired</option>
             </select>
             <input 
               type="text" 
@@ -799,6 +799,7 @@ const UserDashboard = ({ user, onLogout }) => {
                                 request.status === 'Accepted' ? 'bg-green-500 bg-opacity-20 text-green-200' :
                                 request.status === 'Completed' ? 'bg-blue-500 bg-opacity-20 text-blue-200' :
                                 request.status === 'Cancelled' ? 'bg-red-500 bg-opacity-20 text-red-200' :
+                                request.status === 'Expired' ? 'bg-orange-500 bg-opacity-20 text-orange-200' :
                                 'bg-gray-500 bg-opacity-20 text-gray-200'
                               } glass`}>
                                 {request.status}
@@ -822,6 +823,9 @@ const UserDashboard = ({ user, onLogout }) => {
                               {request.status === 'Cancelled' && (
                                 <span className="text-red-400 text-xs">Cancelled</span>
                               )}
+                              {request.status === 'Expired' && (
+                                <span className="text-orange-400 text-xs">Expired</span>
+                              )}
                             </td>
                           </motion.tr>
                         ))}
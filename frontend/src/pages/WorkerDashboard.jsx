@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { motion } from 'framer-motion';
-import { getWorker, updateWorker, updateWorkerAvailability, updateWorkerStatus, getWorkerNotifications, getWorkerSkills, getWorkerWorkRequests, getAvailableWorkRequests, acceptWorkRequest, declineWorkRequest, completeWorkRequest, getWorkerFeedback, setWorkerArrivalTime, getSkillTypes } from '../services/api';
+import { getWorker, updateWorker, updateWorkerAvailability, updateWorkerStatus, sendWorkerHeartbeat, getWorkerNotifications, getWorkerSkills, getWorkerWorkRequests, getAvailableWorkRequests, acceptWorkRequest, declineWorkRequest, completeWorkRequest, getWorkerFeedback, setWorkerArrivalTime, getSkillTypes } from '../services/api';
 
 const WorkerDashboard = ({ worker, onLogout }) => {
   const [workerData, setWorkerData] = useState(null);
@@ -101,6 +101,30 @@ const WorkerDashboard = ({ worker, onLogout }) => {
     fetchData();
   }, [worker.login_id]);
 
+  // Heartbeat so the backend knows this worker is online; the server says when to send the next one
+  useEffect(() => {
+    if (!worker || !worker.login_id) return;
+    let timer;
+    let cancelled = false;
+    const beat = async () => {
+      let delay = 30;
+      try {
+        const response = await sendWorkerHeartbeat(worker.login_id);
+        delay = response.data?.next_heartbeat_seconds || delay;
+      } catch (err) {
+        console.error('Heartbeat failed:', err);
+      }
+      if (!cancelled) {
+        timer = setTimeout(beat, delay * 1000);
+      }
+    };
+    beat();
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [worker.login_id]);
+
   // Fetch specific data when tab changes
   const fetchTabData = useCallback(async () => {
     if (loading || !worker || !worker.login_id) return;
@@ -231,6 +255,25 @@ const WorkerDashboard = ({ worker, onLogout }) => {
     }
   };
 
+  // Transition endpoints return the updated request and how it moved between the
+  // assigned and available lists, so patch local state instead of refetching both
+  const applyTransition = (data) => {
+    const row = data && data.work_request;
+    if (!row) return;
+    const byDate = (a, b) => new Date(b.request_date) - new Date(a.request_date);
+    const patch = (setList, change) => {
+      if (change === 'added') {
+        setList(prev => [row, ...prev.filter(r => r.request_id !== row.request_id)].sort(byDate));
+      } else if (change === 'removed') {
+        setList(prev => prev.filter(r => r.request_id !== row.request_id));
+      } else if (change === 'updated') {
+        setList(prev => prev.map(r => (r.request_id === row.request_id ? row : r)));
+      }
+    };
+    patch(setWorkRequests, data.lists?.assigned);
+    patch(setAvailableRequests, data.lists?.available);
+  };
+
   const handleSetArrivalTime = async (requestId) => {
     setSelectedRequestIdForArrival(requestId);
     setShowArrivalTimeModal(true);
@@ -238,22 +281,10 @@ const WorkerDashboard = ({ worker, onLogout }) => {
 
   const handleConfirmArrivalTime = async () => {
     try {
-      await setWorkerArrivalTime(worker.login_id, selectedRequestIdForArrival, arrivalTime);
+      const response = await setWorkerArrivalTime(worker.login_id, selectedRequestIdForArrival, arrivalTime);
       alert('Arrival time set successfully!');
       
-      // Refresh the requests
-      try {
-        const [assignedResponse, availableResponse] = await Promise.all([
-          getWorkerWorkRequests(worker.login_id),
-          getAvailableWorkRequests(worker.login_id)
-        ]);
-        setWorkRequests(assignedResponse.data);
-        setAvailableRequests(availableResponse.data);
-      } catch (err) {
-        console.error('Failed to refresh work requests:', err);
-        const errorMessage = err.response?.data?.error || err.message || 'Unknown error';
-        setError(`Failed to refresh work requests: ${errorMessage}.`);
-      }
+      applyTransition(response.data);
       
       // Close the modal and reset state
       setShowArrivalTimeModal(false);
@@ -288,21 +319,9 @@ const WorkerDashboard = ({ worker, onLogout }) => {
   const handleConfirmAccept = async () => {
     try {
       setAcceptingRequestId(selectedRequestId);
-      await acceptWorkRequest(worker.login_id, selectedRequestId, timeSlot);
+      const response = await acceptWorkRequest(worker.login_id, selectedRequestId, timeSlot);
       
-      // Refresh the available requests and assigned requests
-      try {
-        const [assignedResponse, availableResponse] = await Promise.all([
-          getWorkerWorkRequests(worker.login_id),
-          getAvailableWorkRequests(worker.login_id)
-        ]);
-        setWorkRequests(assignedResponse.data);
-        setAvailableRequests(availableResponse.data);
-      } catch (err) {
-        console.error('Failed to refresh work requests:', err);
-        const errorMessage = err.response?.data?.error || err.message || 'Unknown error';
-        setError(`Failed to refresh work requests: ${errorMessage}.`);
-      }
+      applyTransition(response.data);
       
       alert('Work request accepted successfully!');
       // Close the modal and reset state
@@ -320,21 +339,9 @@ const WorkerDashboard = ({ worker, onLogout }) => {
   const handleDeclineRequest = async (requestId) => {
     try {
       setDecliningRequestId(requestId);
-      await declineWorkRequest(worker.login_id, requestId);
+      const response = await declineWorkRequest(worker.login_id, requestId);
       
-      // Refresh the available requests and assigned requests
-      try {
-        const [assignedResponse, availableResponse] = await Promise.all([
-          getWorkerWorkRequests(worker.login_id),
-          getAvailableWorkRequests(worker.login_id)
-        ]);
-        setWorkRequests(assignedResponse.data);
-        setAvailableRequests(availableResponse.data);
-      } catch (err) {
-        console.error('Failed to refresh work requests:', err);
-        const errorMessage = err.response?.data?.error || err.message || 'Unknown error';
-        setError(`Failed to refresh work requests: ${errorMessage}.`);
-      }
+      applyTransition(response.data);
       
       alert('Work request declined successfully!');
     } catch (err) {
@@ -354,21 +361,9 @@ const WorkerDashboard = ({ worker, onLogout }) => {
   const handleConfirmComplete = async () => {
     try {
       setCompletingRequestId(selectedRequestIdForCompletion);
-      await completeWorkRequest(worker.login_id, selectedRequestIdForCompletion, amount);
+      const response = await completeWorkRequest(worker.login_id, selectedRequestIdForCompletion, amount);
       
-      // Refresh the available requests and assigned requests
-      try {
-        const [assignedResponse, availableResponse] = await Promise.all([
-          getWorkerWorkRequests(worker.login_id),
-          getAvailableWorkRequests(worker.login_id)
-        ]);
-        setWorkRequests(assignedResponse.data);
-        setAvailableRequests(availableResponse.data);
-      } catch (err) {
-        console.error('Failed to refresh work requests:', err);
-        const errorMessage = err.response?.data?.error || err.message || 'Unknown error';
-        setError(`Failed to refresh work requests: ${errorMessage}.`);
-      }
+      applyTransition(response.data);
       
       alert('Work request completed successfully!');
       // Close the modal and reset state
@@ -92,6 +92,25 @@ const WorkerDashboard = ({ worker, onLogout }) => {
     }
   };
 
+  // Transition endpoints return the updated request and how it moved between the
+  // assigned and available lists, so patch local state instead of refetching both
+  const applyTransition = (data) => {
+    const row = data && data.work_request;
+    if (!row) return;
+    const byDate = (a, b) => new Date(b.request_date) - new Date(a.request_date);
+    const patch = (setList, change) => {
+      if (change === 'added') {
+        setList(prev => [row, ...prev.filter(r => r.request_id !== row.request_id)].sort(byDate));
+      } else if (change === 'removed') {
+        setList(prev => prev.filter(r => r.request_id !== row.request_id));
+      } else if (change === 'updated') {
+        setList(prev => prev.map(r => (r.request_id === row.request_id ? row : r)));
+      }
+    };
+    patch(setWorkRequests, data.lists?.assigned);
+    patch(setAvailableRequests, data.lists?.available);
+  };
+
   const handleAcceptRequest = async (requestId) => {
     // Show the time slot modal instead of directly accepting
     setSelectedRequestId(requestId);
@@ -100,14 +119,8 @@ const WorkerDashboard = ({ worker, onLogout }) => {
 
   const handleConfirmAccept = async () => {
     try {
-      await acceptWorkRequest(worker.login_id, selectedRequestId, timeSlot);
-      // Refresh the available requests and assigned requests
-      const [assignedResponse, availableResponse] = await Promise.all([
-        getWorkerWorkRequests(worker.login_id),
-        getAvailableWorkRequests(worker.login_id)
-      ]);
-      setWorkRequests(assignedResponse.data);
-      setAvailableRequests(availableResponse.data);
+      const response = await acceptWorkRequest(worker.login_id, selectedRequestId, timeSlot);
+      applyTransition(response.data);
       alert('Work request accepted successfully!');
       // Close the modal and reset state
       setShowTimeSlotModal(false);
@@ -120,14 +133,8 @@ const WorkerDashboard = ({ worker, onLogout }) => {
 
   const handleDeclineRequest = async (requestId) => {
     try {
-      await declineWorkRequest(worker.login_id, requestId);
-      // Refresh the available requests and assigned requests
-      const [assignedResponse, availableResponse] = await Promise.all([
-        getWorkerWorkRequests(worker.login_id),
-        getAvailableWorkRequests(worker.login_id)
-      ]);
-      setWorkRequests(assignedResponse.data);
-      setAvailableRequests(availableResponse.data);
+      const response = await declineWorkRequest(worker.login_id, requestId);
+      applyTransition(response.data);
       alert('Work request declined successfully!');
     } catch (err) {
       setError('Failed to decline work request: ' + (err.response?.data?.error || err.message));
@@ -142,14 +149,8 @@ const WorkerDashboard = ({ worker, onLogout }) => {
 
   const handleConfirmComplete = async () => {
     try {
-      await completeWorkRequest(worker.login_id, selectedRequestIdForCompletion, amount);
-      // Refresh the available requests and assigned requests
-      const [assignedResponse, availableResponse] = await Promise.all([
-        getWorkerWorkRequests(worker.login_id),
-        getAvailableWorkRequests(worker.login_id)
-      ]);
-      setWorkRequests(assignedResponse.data);
-      setAvailableRequests(availableResponse.data);
+      const response = await completeWorkRequest(worker.login_id, selectedRequestIdForCompletion, amount);
+      applyTransition(response.data);
       alert('Work request completed successfully!');
       // Close the modal and reset state
       setShowCompleteModal(false);
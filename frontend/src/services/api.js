@@ -29,6 +29,33 @@ api.interceptors.response.use(
   }
 );
 
+// Writes that create rows send an Idempotency-Key, so they can use a short timeout
+// and be retried: the server replays the first response instead of writing twice
+const IDEMPOTENT_TIMEOUT_MS = 5000;
+const IDEMPOTENT_RETRIES = 2;
+
+const newIdempotencyKey = () =>
+  (window.crypto && window.crypto.randomUUID)
+    ? window.crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
+const postIdempotent = async (url, data) => {
+  const headers = { 'Idempotency-Key': newIdempotencyKey() };
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await api.post(url, data, { headers, timeout: IDEMPOTENT_TIMEOUT_MS });
+    } catch (error) {
+      // Retry timeouts, dropped connections, server errors and "still in progress"
+      const status = error.response && error.response.status;
+      const retryable = !error.response || status === 409 || status >= 500;
+      if (!retryable || attempt >= IDEMPOTENT_RETRIES) {
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 300 * 2 ** attempt));
+    }
+  }
+};
+
 // Authentication
 export const login = (username, password, role) => {
   console.log('Attempting login with:', { username, role });
@@ -41,11 +68,11 @@ export const adminLogin = (username, password) => {
 };
 
 export const registerUser = (userData) => {
-  return api.post('/register/user', userData);
+  return postIdempotent('/register/user', userData);
 };
 
 export const registerWorker = (workerData) => {
-  return api.post('/register/worker', workerData);
+  return postIdempotent('/register/worker', workerData);
 };
 
 // User APIs
@@ -59,7 +86,7 @@ export const updateUser = (userId, userData) => {
 };
 
 export const createWorkRequest = (requestData) => {
-  return api.post('/work-requests', requestData);
+  return postIdempotent('/work-requests', requestData);
 };
 
 export const getUserWorkRequests = (userId) => {
@@ -88,6 +115,14 @@ export const updateWorkerStatus = (workerId, status) => {
   return api.put(`/workers/${workerId}/status`, { status });
 };
 
+export const sendWorkerHeartbeat = (workerId, status) => {
+  return api.post(`/workers/${workerId}/heartbeat`, status ? { status } : {});
+};
+
+export const getRecommendedWorkers = (requestId, k = 10) => {
+  return api.get(`/work-requests/${requestId}/recommendations`, { params: { k } });
+};
+
 export const getWorkerFeedback = (workerId) => {
   return api.get(`/feedback/worker/${workerId}`);
 };
@@ -129,7 +164,7 @@ export const getAvailableWorkRequests = (workerId) => {
 };
 
 export const acceptWorkRequest = (workerId, requestId, timeSlot, arrivalTime) => {
-  return api.post(`/work-requests/${requestId}/accept`, { workerId, timeSlot, arrivalTime });
+  return postIdempotent(`/work-requests/${requestId}/accept`, { workerId, timeSlot, arrivalTime });
 };
 
 export const declineWorkRequest = (workerId, requestId) => {
@@ -137,7 +172,7 @@ export const declineWorkRequest = (workerId, requestId) => {
 };
 
 export const completeWorkRequest = (workerId, requestId, amount) => {
-  return api.post(`/work-requests/${requestId}/complete`, { workerId, amount });
+  return postIdempotent(`/work-requests/${requestId}/complete`, { workerId, amount });
 };
 
 export const cancelWorkRequest = (requestId, userId) => {
@@ -162,7 +197,7 @@ export const markNotificationAsRead = (notificationId) => {
 
 // Feedback
 export const submitFeedback = (feedbackData) => {
-  return api.post('/feedback', feedbackData);
+  return postIdempotent('/feedback', feedbackData);
 };
 
 export const getFeedbackForRequest = (requestId) => {